@@ -1,5 +1,6 @@
 import { app, HttpRequest, HttpResponseInit, InvocationContext } from '@azure/functions';
 import { createClient } from '@supabase/supabase-js';
+import { CircuitOpenError, FlowPaymentRequest, getFlowClient } from '../shared/flowClient';
 
 /**
  * Azure Function to create Flow payment
@@ -10,93 +11,6 @@ interface CreatePaymentRequest {
   orderId: number;
 }
 
-interface FlowPaymentRequest {
-  commerceOrder: string;
-  subject: string;
-  currency: string;
-  amount: number;
-  email: string;
-  urlConfirmation: string;
-  urlReturn: string;
-}
-
-interface FlowPaymentResponse {
-  url: string;
-  token: string;
-  flowOrder: number;
-}
-
-/**
- * Generates Flow API signature using HMAC-SHA256
- */
-async function generateFlowSignature(params: Record<string, string | number>): Promise<string> {
-  const secret = process.env.FLOW_SECRET_KEY;
-  if (!secret) {
-    throw new Error('FLOW_SECRET_KEY not configured');
-  }
-
-  // Sort params alphabetically and concatenate
-  const sortedKeys = Object.keys(params).sort();
-  const data = sortedKeys.map((key) => `${key}${params[key]}`).join('');
-
-  // Generate HMAC-SHA256 signature
-  const crypto = await import('crypto');
-  const hmac = crypto.createHmac('sha256', secret);
-  hmac.update(data);
-  return hmac.digest('hex');
-}
-
-/**
- * Calls Flow API to create payment session
- */
-async function createFlowPayment(paymentData: FlowPaymentRequest): Promise<FlowPaymentResponse> {
-  const apiKey = process.env.FLOW_API_KEY;
-  const apiUrl = process.env.FLOW_API_URL || 'https://sandbox.flow.cl/api';
-
-  if (!apiKey) {
-    throw new Error('FLOW_API_KEY not configured');
-  }
-
-  // Prepare params for signature
-  const params = {
-    apiKey,
-    commerceOrder: paymentData.commerceOrder,
-    subject: paymentData.subject,
-    currency: paymentData.currency,
-    amount: paymentData.amount,
-    email: paymentData.email,
-    urlConfirmation: paymentData.urlConfirmation,
-    urlReturn: paymentData.urlReturn,
-  };
-
-  // Generate signature
-  const signature = await generateFlowSignature(params);
-
-  // Build form data
-  const formData = new URLSearchParams();
-  Object.entries(params).forEach(([key, value]) => {
-    formData.append(key, value.toString());
-  });
-  formData.append('s', signature);
-
-  // Call Flow API
-  const response = await fetch(`${apiUrl}/payment/create`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/x-www-form-urlencoded',
-    },
-    body: formData.toString(),
-  });
-
-  if (!response.ok) {
-    const errorText = await response.text();
-    console.error('Flow API error:', errorText);
-    throw new Error(`Flow API error: ${response.status} - ${errorText}`);
-  }
-
-  return await response.json();
-}
-
 export async function createFlowPaymentHandler(
   request: HttpRequest,
   context: InvocationContext,
@@ -213,10 +127,11 @@ export async function createFlowPaymentHandler(
 
     context.log('💳 Creating Flow payment...');
 
-    // Create Flow payment
-    const flowResponse = await createFlowPayment(paymentData);
+    // Create Flow payment (pooled client with deadline and circuit breaker)
+    const flowClient = getFlowClient();
+    const flowResponse = await flowClient.createPayment(paymentData);
 
-    context.log('✅ Flow payment created:', flowResponse.flowOrder);
+    context.log('✅ Flow payment created:', flowResponse.flowOrder, flowClient.getMetrics());
 
     // Save Flow data to order
     const { error: updateError } = await supabase
@@ -247,7 +162,8 @@ export async function createFlowPaymentHandler(
   } catch (error) {
     context.error('❌ Error in create-flow-payment:', error);
     return {
-      status: 500,
+      // Flow is failing: tell the client to retry later instead of a generic 500
+      status: error instanceof CircuitOpenError ? 503 : 500,
       headers: { ...corsHeaders, 'Content-Type': 'application/json' },
       body: JSON.stringify({
         success: false,
@@ -0,0 +1,156 @@
+import { app, InvocationContext, Timer } from '@azure/functions';
+import {
+  createSupabaseAdminClient,
+  logPaymentAudit,
+  mapPaymentMethod,
+  NonRetryableError,
+  processFlowNotification,
+} from '../shared/flowPaymentProcessor';
+
+/**
+ * Flow Webhook Worker for Azure Functions
+ * Drains flow_webhook_queue (filled by flow-webhook) and applies each
+ * notification to its order
+ *
+ * - Claims jobs in batches with FOR UPDATE SKIP LOCKED (claim_flow_webhook_jobs),
+ *   so overlapping runs never process the same notification twice
+ * - Transient failures are retried with exponential backoff + jitter
+ * - Jobs that exhaust their attempts (or can never succeed) end as 'failed'
+ *   and are recorded in payment_audit_log
+ *
+ * NOTE: Timer triggers are not available in Static Web Apps managed functions;
+ * deploy the api/ folder as a standalone Function App linked to the static web app.
+ */
+
+interface FlowWebhookJob {
+  id: number;
+  flow_token: string;
+  commerce_order: string | null;
+  payload: Record<string, string>;
+  attempts: number;
+}
+
+const BATCH_SIZE = parseInt(process.env.FLOW_QUEUE_BATCH_SIZE || '10');
+const MAX_ATTEMPTS = parseInt(process.env.FLOW_QUEUE_MAX_ATTEMPTS || '8');
+const BASE_BACKOFF_SECONDS = 15;
+const MAX_BACKOFF_SECONDS = 60 * 60;
+
+/**
+ * Exponential backoff with full jitter: random(0, min(max, base * 2^attempts))
+ */
+function nextAttemptAt(attempts: number): string {
+  const ceiling = Math.min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempts);
+  const delaySeconds = Math.max(BASE_BACKOFF_SECONDS, Math.random() * ceiling);
+  return new Date(Date.now() + delaySeconds * 1000).toISOString();
+}
+
+/**
+ * Records a job that will not be retried in payment_audit_log
+ */
+async function auditFailedJob(
+  supabase: any,
+  job: FlowWebhookJob,
+  errorMessage: string,
+  context: InvocationContext,
+): Promise<void> {
+  const orderId = parseInt(job.commerce_order ?? '');
+  if (isNaN(orderId)) {
+    return;
+  }
+
+  await logPaymentAudit(
+    supabase,
+    orderId,
+    job.payload['flowOrder'] || 'unknown',
+    'webhook_failed',
+    job.payload['amount'] || '0',
+    mapPaymentMethod(job.payload['paymentMethod']),
+    { success: false, processed: 0, errors: [errorMessage] },
+    context,
+  );
+}
+
+export async function flowWebhookWorker(timer: Timer, context: InvocationContext): Promise<void> {
+  const supabase = createSupabaseAdminClient();
+
+  const { data: jobs, error: claimError } = await supabase.rpc('claim_flow_webhook_jobs', {
+    p_batch_size: BATCH_SIZE,
+  });
+
+  if (claimError) {
+    context.error('❌ Error claiming webhook jobs:', claimError);
+    return;
+  }
+
+  if (!jobs || jobs.length === 0) {
+    return;
+  }
+
+  context.log(`📥 Processing ${jobs.length} queued Flow notifications`);
+
+  // Sequential on purpose: two notifications for the same order must not race
+  for (const job of jobs as FlowWebhookJob[]) {
+    try {
+      const orderStatus = await processFlowNotification(supabase, job.payload, context);
+
+      const { error: doneError } = await supabase
+        .from('flow_webhook_queue')
+        .update({
+          status: 'done',
+          locked_at: null,
+          last_error: null,
+          processed_at: new Date().toISOString(),
+        })
+        .eq('id', job.id);
+
+      if (doneError) {
+        // Job stays 'processing' and is reclaimed after the lock timeout;
+        // processing is idempotent for already-paid orders
+        context.error(`❌ Error completing job ${job.id}:`, doneError);
+      } else {
+        context.log(`✅ Job ${job.id} done (order ${job.commerce_order} → ${orderStatus})`);
+      }
+    } catch (error: any) {
+      const errorMessage = error?.message || 'Unknown error';
+      const giveUp = error instanceof NonRetryableError || job.attempts >= MAX_ATTEMPTS;
+
+      context.error(
+        `❌ Job ${job.id} failed (attempt ${job.attempts}/${MAX_ATTEMPTS}):`,
+        errorMessage,
+      );
+
+      const { error: failError } = await supabase
+        .from('flow_webhook_queue')
+        .update(
+          giveUp
+            ? {
+                status: 'failed',
+                locked_at: null,
+                last_error: errorMessage,
+                processed_at: new Date().toISOString(),
+              }
+            : {
+                status: 'pending',
+                locked_at: null,
+                last_error: errorMessage,
+                next_attempt_at: nextAttemptAt(job.attempts),
+              },
+        )
+        .eq('id', job.id);
+
+      if (failError) {
+        context.error(`❌ Error rescheduling job ${job.id}:`, failError);
+      }
+
+      if (giveUp) {
+        await auditFailedJob(supabase, job, errorMessage, context);
+      }
+    }
+  }
+}
+
+app.timer('flow-webhook-worker', {
+  // Every 15 seconds (NCRONTAB: second minute hour day month weekday)
+  schedule: '*/15 * * * * *',
+  handler: flowWebhookWorker,
+});
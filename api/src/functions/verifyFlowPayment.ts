@@ -0,0 +1,170 @@
+import { app, HttpRequest, HttpResponseInit, InvocationContext } from '@azure/functions';
+import { CircuitOpenError, getFlowClient } from '../shared/flowClient';
+import {
+  createSupabaseAdminClient,
+  mapFlowStatus,
+  NonRetryableError,
+  processFlowNotification,
+  TERMINAL_ORDER_STATUSES,
+} from '../shared/flowPaymentProcessor';
+
+/**
+ * Azure Function to verify a Flow payment from the payment callback page
+ * Replaces the verify-flow-payment Supabase Edge Function (removed)
+ *
+ * - Short-circuits when the webhook already resolved the order (no Flow call)
+ * - Otherwise asks Flow for the status through the shared Flow client and
+ *   applies it with the same processing as the webhook worker
+ */
+
+interface VerifyPaymentRequest {
+  token: string;
+}
+
+export async function verifyFlowPaymentHandler(
+  request: HttpRequest,
+  context: InvocationContext,
+): Promise<HttpResponseInit> {
+  context.log('📝 Verify payment request received');
+
+  // CORS headers
+  const corsHeaders = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+  };
+
+  // Handle CORS preflight
+  if (request.method === 'OPTIONS') {
+    return { status: 200, headers: corsHeaders, body: 'OK' };
+  }
+
+  const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
+  try {
+    const { token } = (await request.json()) as VerifyPaymentRequest;
+
+    if (!token) {
+      return {
+        status: 400,
+        headers: jsonHeaders,
+        body: JSON.stringify({ success: false, error: 'token is required' }),
+      };
+    }
+
+    const supabase = createSupabaseAdminClient();
+
+    // Short-circuit: the webhook may already have resolved this payment
+    const { data: knownOrder } = await supabase
+      .from('orders')
+      .select('id, status, payment_method')
+      .eq('flow_token', token)
+      .maybeSingle();
+
+    if (knownOrder && TERMINAL_ORDER_STATUSES.includes(knownOrder.status)) {
+      context.log(`ℹ️ Order ${knownOrder.id} already ${knownOrder.status}, skipping Flow API call`);
+      return {
+        status: 200,
+        headers: jsonHeaders,
+        body: JSON.stringify({
+          success: true,
+          orderId: knownOrder.id,
+          status: knownOrder.status,
+          paymentMethod: knownOrder.payment_method,
+        }),
+      };
+    }
+
+    // Get payment status from Flow (retried with jitter, bounded by deadline)
+    const flowClient = getFlowClient();
+    const flowStatus = await flowClient.getPaymentStatus(token);
+
+    context.log('✅ Flow response:', flowStatus, flowClient.getMetrics());
+
+    // Still pending (or unchanged): the callback page polls this endpoint, so
+    // don't rewrite the order or add an audit row on every attempt
+    const flowOrderStatus = mapFlowStatus(String(flowStatus.status));
+    if (knownOrder && (flowOrderStatus === 'pending' || flowOrderStatus === knownOrder.status)) {
+      return {
+        status: 200,
+        headers: jsonHeaders,
+        body: JSON.stringify({
+          success: true,
+          orderId: knownOrder.id,
+          status: knownOrder.status,
+          flowStatus: flowStatus.status,
+        }),
+      };
+    }
+
+    const params: Record<string, string> = {
+      token,
+      flowOrder: String(flowStatus.flowOrder),
+      status: String(flowStatus.status),
+      commerceOrder: String(flowStatus.commerceOrder),
+      amount: String(flowStatus.amount),
+    };
+    if (flowStatus.paymentMethod !== undefined) {
+      params['paymentMethod'] = String(flowStatus.paymentMethod);
+    }
+
+    const orderId = parseInt(flowStatus.commerceOrder);
+    let orderStatus: string;
+
+    try {
+      orderStatus = await processFlowNotification(supabase, params, context);
+    } catch (error) {
+      if (error instanceof NonRetryableError) {
+        throw error;
+      }
+
+      // Lost the race with the webhook worker: report whatever it applied
+      const { data: current } = await supabase
+        .from('orders')
+        .select('status')
+        .eq('id', orderId)
+        .single();
+
+      if (!current) {
+        throw error;
+      }
+      orderStatus = current.status;
+    }
+
+    return {
+      status: 200,
+      headers: jsonHeaders,
+      body: JSON.stringify({
+        success: true,
+        orderId,
+        status: orderStatus,
+        flowStatus: flowStatus.status,
+      }),
+    };
+  } catch (error) {
+    context.error('❌ Error in verify-flow-payment:', error);
+
+    let status = 500;
+    if (error instanceof NonRetryableError) {
+      status = error.message === 'Order not found' ? 404 : 400;
+    } else if (error instanceof CircuitOpenError) {
+      status = 503;
+    }
+
+    return {
+      status,
+      headers: jsonHeaders,
+      body: JSON.stringify({
+        success: false,
+        error: error.message || 'Internal server error',
+      }),
+    };
+  }
+}
+
+app.http('verify-flow-payment', {
+  methods: ['POST', 'OPTIONS'],
+  authLevel: 'anonymous',
+  handler: verifyFlowPaymentHandler,
+  route: 'verify-flow-payment',
+});
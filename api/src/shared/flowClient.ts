@@ -0,0 +1,380 @@
+import * as crypto from 'crypto';
+import * as http from 'http';
+import * as https from 'https';
+
+/**
+ * Flow.cl API client shared by all Azure Functions
+ *
+ * One instance lives per Function App worker (see getFlowClient), so:
+ * - Connections to Flow are pooled with keep-alive agents (capped by maxConcurrent)
+ * - Every call has a deadline; a slow Flow can't pin function instances
+ * - Idempotent status calls are retried with jittered exponential backoff
+ * - A circuit breaker fails fast while Flow is down
+ * - Latency of every call is kept for metrics
+ */
+
+export interface FlowClientOptions {
+  apiUrl: string;
+  apiKey: string;
+  secretKey: string;
+  /** Max time per HTTP attempt (ms) */
+  timeoutMs?: number;
+  /** Max time for a call including retries (ms) */
+  deadlineMs?: number;
+  /** Retries for idempotent calls (getStatus) */
+  maxRetries?: number;
+  /** Max open sockets to Flow per worker */
+  maxConcurrent?: number;
+  /** Consecutive failures that open the circuit */
+  breakerThreshold?: number;
+  /** Time the circuit stays open before a trial call (ms) */
+  breakerCooldownMs?: number;
+}
+
+export interface FlowPaymentRequest {
+  commerceOrder: string;
+  subject: string;
+  currency: string;
+  amount: number;
+  email: string;
+  urlConfirmation: string;
+  urlReturn: string;
+}
+
+export interface FlowPaymentResponse {
+  url: string;
+  token: string;
+  flowOrder: number;
+}
+
+export interface FlowPaymentStatus {
+  flowOrder: number;
+  commerceOrder: string;
+  requestDate: string;
+  status: number; // 1=pending, 2=approved, 3=rejected, 4=cancelled
+  subject: string;
+  currency: string;
+  amount: number;
+  payer: string;
+  paymentMethod?: number;
+}
+
+export type CircuitState = 'closed' | 'open' | 'half-open';
+
+export interface FlowClientMetrics {
+  calls: number;
+  failures: number;
+  retries: number;
+  rejectedByBreaker: number;
+  p50Ms: number;
+  p95Ms: number;
+  maxMs: number;
+  circuit: CircuitState;
+}
+
+/**
+ * Error returned by Flow or raised while talking to it
+ */
+export class FlowApiError extends Error {
+  constructor(
+    message: string,
+    readonly status?: number,
+    readonly retryable = false,
+  ) {
+    super(message);
+    this.name = 'FlowApiError';
+  }
+}
+
+/**
+ * Raised without calling Flow while the circuit is open
+ */
+export class CircuitOpenError extends FlowApiError {
+  constructor() {
+    super('Flow API circuit is open, try again later', 503, true);
+    this.name = 'CircuitOpenError';
+  }
+}
+
+/**
+ * Signs Flow params: HMAC-SHA256 over alphabetically sorted key+value pairs
+ */
+export function signFlowParams(params: Record<string, string | number>, secret: string): string {
+  const sortedKeys = Object.keys(params).sort();
+  const data = sortedKeys.map((key) => `${key}${params[key]}`).join('');
+
+  return crypto.createHmac('sha256', secret).update(data).digest('hex');
+}
+
+const LATENCY_WINDOW = 200;
+const RETRY_BASE_DELAY_MS = 200;
+const RETRY_MAX_DELAY_MS = 2000;
+
+export class FlowClient {
+  private readonly timeoutMs: number;
+  private readonly deadlineMs: number;
+  private readonly maxRetries: number;
+  private readonly breakerThreshold: number;
+  private readonly breakerCooldownMs: number;
+  private readonly agent: http.Agent;
+  private readonly transport: typeof http | typeof https;
+
+  // Circuit breaker state
+  private consecutiveFailures = 0;
+  private openedAt = 0;
+  private trialInFlight = false;
+
+  // Metrics
+  private latencies: number[] = [];
+  private counters = { calls: 0, failures: 0, retries: 0, rejectedByBreaker: 0 };
+
+  constructor(private readonly options: FlowClientOptions) {
+    this.timeoutMs = options.timeoutMs ?? 5000;
+    this.deadlineMs = options.deadlineMs ?? 12000;
+    this.maxRetries = options.maxRetries ?? 2;
+    this.breakerThreshold = options.breakerThreshold ?? 5;
+    this.breakerCooldownMs = options.breakerCooldownMs ?? 30000;
+
+    const isHttps = new URL(options.apiUrl).protocol === 'https:';
+    const agentOptions = {
+      keepAlive: true,
+      maxSockets: options.maxConcurrent ?? 10,
+      maxFreeSockets: 4,
+    };
+    this.transport = isHttps ? https : http;
+    this.agent = isHttps ? new https.Agent(agentOptions) : new http.Agent(agentOptions);
+  }
+
+  /**
+   * Creates a payment session (not idempotent: never retried)
+   */
+  async createPayment(paymentData: FlowPaymentRequest): Promise<FlowPaymentResponse> {
+    const params = this.signed({ ...paymentData });
+    const body = new URLSearchParams(params).toString();
+
+    return this.call<FlowPaymentResponse>('POST', '/payment/create', body, 0);
+  }
+
+  /**
+   * Gets payment status by token (idempotent: retried with jitter)
+   */
+  async getPaymentStatus(token: string): Promise<FlowPaymentStatus> {
+    const query = new URLSearchParams(this.signed({ token })).toString();
+
+    return this.call<FlowPaymentStatus>(
+      'GET',
+      `/payment/getStatus?${query}`,
+      null,
+      this.maxRetries,
+    );
+  }
+
+  /**
+   * Snapshot of latency and failure metrics for this worker
+   */
+  getMetrics(): FlowClientMetrics {
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    const percentile = (p: number) =>
+      sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))] : 0;
+
+    return {
+      ...this.counters,
+      p50Ms: Math.round(percentile(0.5)),
+      p95Ms: Math.round(percentile(0.95)),
+      maxMs: Math.round(sorted[sorted.length - 1] ?? 0),
+      circuit: this.circuitState(),
+    };
+  }
+
+  /**
+   * Closes pooled connections (tests and shutdown)
+   */
+  destroy(): void {
+    this.agent.destroy();
+  }
+
+  private signed(params: Record<string, string | number>): Record<string, string> {
+    const withKey = { apiKey: this.options.apiKey, ...params };
+    const result: Record<string, string> = {};
+    for (const [key, value] of Object.entries(withKey)) {
+      result[key] = value.toString();
+    }
+    result['s'] = signFlowParams(withKey, this.options.secretKey);
+    return result;
+  }
+
+  private circuitState(): CircuitState {
+    if (this.consecutiveFailures < this.breakerThreshold) {
+      return 'closed';
+    }
+    return Date.now() - this.openedAt >= this.breakerCooldownMs ? 'half-open' : 'open';
+  }
+
+  private async call<T>(
+    method: 'GET' | 'POST',
+    path: string,
+    body: string | null,
+    retries: number,
+  ): Promise<T> {
+    const deadline = Date.now() + this.deadlineMs;
+
+    for (let attempt = 0; ; attempt++) {
+      const state = this.circuitState();
+      if (state === 'open' || (state === 'half-open' && this.trialInFlight)) {
+        this.counters.rejectedByBreaker++;
+        throw new CircuitOpenError();
+      }
+
+      const isTrial = state === 'half-open';
+      this.trialInFlight = isTrial;
+      const remaining = deadline - Date.now();
+
+      try {
+        const result = await this.send<T>(method, path, body, Math.min(this.timeoutMs, remaining));
+        this.consecutiveFailures = 0;
+        return result;
+      } catch (error) {
+        const flowError =
+          error instanceof FlowApiError ? error : new FlowApiError(String(error), undefined, true);
+
+        if (flowError.retryable) {
+          this.consecutiveFailures++;
+          if (this.consecutiveFailures >= this.breakerThreshold) {
+            this.openedAt = Date.now();
+          }
+        }
+
+        // Full jitter: random(0, min(max, base * 2^attempt))
+        const delay =
+          Math.random() * Math.min(RETRY_MAX_DELAY_MS, RETRY_BASE_DELAY_MS * 2 ** attempt);
+        const canRetry =
+          flowError.retryable &&
+          attempt < retries &&
+          this.circuitState() === 'closed' &&
+          Date.now() + delay < deadline;
+
+        if (!canRetry) {
+          throw flowError;
+        }
+
+        this.counters.retries++;
+        await new Promise((resolve) => setTimeout(resolve, delay));
+      } finally {
+        if (isTrial) {
+          this.trialInFlight = false;
+        }
+      }
+    }
+  }
+
+  private send<T>(
+    method: 'GET' | 'POST',
+    path: string,
+    body: string | null,
+    timeoutMs: number,
+  ): Promise<T> {
+    const startTime = performance.now();
+    const url = new URL(`${this.options.apiUrl.replace(/\/$/, '')}${path}`);
+
+    return new Promise<T>((resolve, reject) => {
+      let settled = false;
+      const finish = (error: FlowApiError | null, value?: T) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(timer);
+        this.counters.calls++;
+        this.latencies.push(performance.now() - startTime);
+        if (this.latencies.length > LATENCY_WINDOW) {
+          this.latencies.shift();
+        }
+        if (error) {
+          this.counters.failures++;
+          reject(error);
+        } else {
+          resolve(value as T);
+        }
+      };
+
+      const request = this.transport.request(
+        url,
+        {
+          method,
+          agent: this.agent,
+          headers: body
+            ? {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Content-Length': Buffer.byteLength(body),
+              }
+            : { Accept: 'application/json' },
+        },
+        (response) => {
+          const chunks: Buffer[] = [];
+          response.on('data', (chunk: Buffer) => chunks.push(chunk));
+          response.on('error', (err) => finish(new FlowApiError(err.message, undefined, true)));
+          response.on('end', () => {
+            const status = response.statusCode ?? 0;
+            const text = Buffer.concat(chunks).toString('utf8');
+
+            if (status < 200 || status >= 300) {
+              // 5xx and 429 are Flow-side and worth retrying; 4xx are our fault
+              const retryable = status >= 500 || status === 429;
+              finish(new FlowApiError(`Flow API error: ${status} - ${text}`, status, retryable));
+              return;
+            }
+
+            try {
+              finish(null, JSON.parse(text) as T);
+            } catch {
+              finish(new FlowApiError(`Invalid JSON from Flow API: ${text}`, status, false));
+            }
+          });
+        },
+      );
+
+      // Deadline for the whole attempt, including time queued for a pooled socket
+      const timer = setTimeout(() => {
+        request.destroy();
+        finish(new FlowApiError(`Flow API timeout after ${timeoutMs}ms`, undefined, true));
+      }, timeoutMs);
+
+      request.on('error', (err) => finish(new FlowApiError(err.message, undefined, true)));
+
+      if (body) {
+        request.write(body);
+      }
+      request.end();
+    });
+  }
+}
+
+let sharedClient: FlowClient | null = null;
+
+/**
+ * Returns the Flow client for this worker, configured from Function App settings
+ * Reused across invocations so pooled connections and breaker state survive
+ */
+export function getFlowClient(): FlowClient {
+  if (sharedClient) {
+    return sharedClient;
+  }
+
+  const apiKey = process.env.FLOW_API_KEY;
+  const secretKey = process.env.FLOW_SECRET_KEY;
+
+  if (!apiKey) {
+    throw new Error('FLOW_API_KEY not configured');
+  }
+  if (!secretKey) {
+    throw new Error('FLOW_SECRET_KEY not configured');
+  }
+
+  sharedClient = new FlowClient({
+    apiUrl: process.env.FLOW_API_URL || 'https://sandbox.flow.cl/api',
+    apiKey,
+    secretKey,
+    timeoutMs: parseInt(process.env.FLOW_TIMEOUT_MS || '5000'),
+    maxConcurrent: parseInt(process.env.FLOW_MAX_CONCURRENT || '10'),
+  });
+
+  return sharedClient;
+}
@@ -0,0 +1,391 @@
+import { InvocationContext } from '@azure/functions';
+import { createClient, SupabaseClient } from '@supabase/supabase-js';
+
+/**
+ * Flow payment processing shared by the webhook and the queue worker
+ *
+ * flow-webhook only verifies the signature and enqueues the notification;
+ * flow-webhook-worker calls processFlowNotification for every queued job.
+ */
+
+/**
+ * Error that will not go away by retrying (bad token, amount mismatch, ...)
+ * The worker moves these jobs straight to 'failed' instead of backing off
+ */
+export class NonRetryableError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'NonRetryableError';
+  }
+}
+
+/**
+ * Order statuses Flow can't move an order out of: a late or retried
+ * notification for these orders is ignored
+ */
+export const TERMINAL_ORDER_STATUSES = ['paid', 'failed', 'cancelled', 'refunded'];
+
+export interface StockResult {
+  success: boolean;
+  processed: number;
+  errors: string[];
+}
+
+/**
+ * Creates Supabase admin client from Function App settings
+ */
+export function createSupabaseAdminClient(): SupabaseClient {
+  const supabaseUrl = process.env.SUPABASE_URL;
+  const supabaseKey = process.env.SUPABASE_SERVICE_ROLE_KEY;
+
+  if (!supabaseUrl || !supabaseKey) {
+    throw new Error('Supabase credentials not configured');
+  }
+
+  return createClient(supabaseUrl, supabaseKey);
+}
+
+/**
+ * Maps Flow payment method codes to readable strings
+ */
+export function mapPaymentMethod(code?: string): string {
+  const methods: Record<string, string> = {
+    '1': 'Webpay',
+    '2': 'Servipag',
+    '3': 'Multicaja',
+    '4': 'Khipu',
+    '9': 'Todos los Medios',
+  };
+  return code ? methods[code] || 'Desconocido' : 'Desconocido';
+}
+
+/**
+ * Maps a Flow payment status (1=pending, 2=approved, 3=rejected,
+ * 4=cancelled) to our order status
+ */
+export function mapFlowStatus(status?: string): string {
+  switch (status) {
+    case '2':
+      return 'paid';
+    case '3':
+      return 'failed';
+    case '4':
+      return 'cancelled';
+    default:
+      return 'pending';
+  }
+}
+
+/**
+ * Validates payment amount matches order total
+ */
+function validatePaymentAmount(flowAmount: string, orderAmount: number): boolean {
+  const flowAmountNum = parseFloat(flowAmount);
+  // Allow small floating point differences (1 CLP tolerance)
+  const tolerance = 1;
+  return Math.abs(flowAmountNum - orderAmount) <= tolerance;
+}
+
+/**
+ * Checks if sufficient stock exists for all order items
+ */
+async function checkStockAvailability(
+  supabase: any,
+  orderId: number,
+  context: InvocationContext,
+): Promise<{ available: boolean; details: any[] }> {
+  try {
+    // Get order items with product stock info
+    const { data: orderItems, error: itemsError } = await supabase
+      .from('order_items')
+      .select(
+        `
+        product_id,
+        quantity,
+        products:product_id (stock_quantity, name)
+      `,
+      )
+      .eq('order_id', orderId);
+
+    if (itemsError || !orderItems) {
+      context.error('Error fetching order items for stock check:', itemsError);
+      return { available: false, details: [] };
+    }
+
+    const stockDetails = orderItems.map((item: any) => ({
+      productId: item.product_id,
+      productName: item.products?.name || 'Unknown',
+      requested: item.quantity,
+      available: item.products?.stock_quantity || 0,
+      sufficient: (item.products?.stock_quantity || 0) >= item.quantity,
+    }));
+
+    const allSufficient = stockDetails.every((detail: any) => detail.sufficient);
+
+    if (!allSufficient) {
+      const insufficient = stockDetails.filter((detail: any) => !detail.sufficient);
+      context.warn(`⚠️ Insufficient stock for order ${orderId}:`, insufficient);
+    }
+
+    return { available: allSufficient, details: stockDetails };
+  } catch (error) {
+    context.error('Error checking stock availability:', error);
+    return { available: false, details: [] };
+  }
+}
+
+/**
+ * Reduces product stock after successful payment
+ */
+async function reduceProductStock(
+  supabase: any,
+  orderId: number,
+  context: InvocationContext,
+): Promise<StockResult> {
+  const errors: string[] = [];
+  let processed = 0;
+
+  try {
+    // Get order items
+    const { data: orderItems, error: itemsError } = await supabase
+      .from('order_items')
+      .select('product_id, quantity, products:product_id (name)')
+      .eq('order_id', orderId);
+
+    if (itemsError || !orderItems) {
+      throw new Error(`Error fetching order items: ${itemsError?.message}`);
+    }
+
+    // Reduce stock for each product
+    for (const item of orderItems) {
+      try {
+        const { error: stockError } = await supabase.rpc('reduce_product_stock', {
+          p_product_id: item.product_id,
+          p_quantity: item.quantity,
+        });
+
+        if (stockError) {
+          const errorMsg = `Failed to reduce stock for product ${item.product_id} (${item.products?.name}): ${stockError.message}`;
+          context.error(errorMsg);
+          errors.push(errorMsg);
+        } else {
+          processed++;
+          context.log(
+            `✅ Stock reduced for product ${item.product_id} (${item.products?.name}): -${item.quantity} units`,
+          );
+        }
+      } catch (err: any) {
+        const errorMsg = `Exception reducing stock for product ${item.product_id}: ${err.message}`;
+        context.error(errorMsg);
+        errors.push(errorMsg);
+      }
+    }
+
+    return { success: errors.length === 0, processed, errors };
+  } catch (error: any) {
+    const errorMsg = `Error in reduceProductStock: ${error.message}`;
+    context.error(errorMsg);
+    return { success: false, processed, errors: [errorMsg] };
+  }
+}
+
+/**
+ * Logs audit entry for payment processing
+ */
+export async function logPaymentAudit(
+  supabase: any,
+  orderId: number,
+  flowOrderId: string,
+  status: string,
+  amount: string,
+  paymentMethod: string,
+  stockResult: StockResult,
+  context: InvocationContext,
+): Promise<void> {
+  try {
+    const auditEntry = {
+      order_id: orderId,
+      flow_order_id: flowOrderId,
+      status: status,
+      amount: parseFloat(amount),
+      payment_method: paymentMethod,
+      stock_processed: stockResult.processed,
+      stock_success: stockResult.success,
+      stock_errors: stockResult.errors,
+      processed_at: new Date().toISOString(),
+    };
+
+    const { error } = await supabase.from('payment_audit_log').insert(auditEntry);
+
+    if (error) {
+      // Log the ACTUAL error for debugging
+      context.error('❌ FAILED to insert payment audit:', {
+        error: error.message,
+        details: error.details,
+        hint: error.hint,
+        auditEntry: auditEntry,
+      });
+    } else {
+      context.log('✅ Payment audit logged successfully:', auditEntry);
+    }
+  } catch (err) {
+    context.error('Error logging payment audit:', err);
+    // Non-critical, don't throw
+  }
+}
+
+/**
+ * Applies a verified Flow notification to the order
+ * Throws NonRetryableError for bad data and Error for transient failures
+ *
+ * @returns Resulting order status
+ */
+export async function processFlowNotification(
+  supabase: SupabaseClient,
+  params: Record<string, string>,
+  context: InvocationContext,
+): Promise<string> {
+  // Extract webhook data
+  const token = params['token'];
+  const flowOrder = params['flowOrder'];
+  const status = params['status']; // 1=pending, 2=approved, 3=rejected, 4=cancelled
+  const commerceOrder = params['commerceOrder'];
+  const paymentMethod = params['paymentMethod'];
+  const amount = params['amount'];
+
+  if (!token || !commerceOrder) {
+    throw new NonRetryableError('Missing required webhook data');
+  }
+
+  // Find order by commerce order ID (our order.id)
+  const orderId = parseInt(commerceOrder);
+  const { data: order, error: orderError } = await supabase
+    .from('orders')
+    .select('*')
+    .eq('id', orderId)
+    .maybeSingle();
+
+  if (orderError) {
+    throw new Error(`Error fetching order ${orderId}: ${orderError.message}`);
+  }
+
+  if (!order) {
+    context.error('❌ Order not found:', orderId);
+    throw new NonRetryableError('Order not found');
+  }
+
+  context.log('📋 Order found:', {
+    orderId: order.id,
+    status: order.status,
+    total: order.total_amount,
+    flowToken: order.flow_token ? '✓' : '✗',
+  });
+
+  // Verify flow_token matches
+  if (order.flow_token !== token) {
+    context.error('❌ Token mismatch');
+    throw new NonRetryableError('Token mismatch');
+  }
+
+  context.log('✅ Token verified');
+
+  // Validate payment amount (security check)
+  if (amount && !validatePaymentAmount(amount, order.total_amount)) {
+    context.error('❌ Amount mismatch:', {
+      flowAmount: amount,
+      orderAmount: order.total_amount,
+    });
+    throw new NonRetryableError('Payment amount does not match order total');
+  }
+
+  if (amount) {
+    context.log('✅ Amount validated:', amount);
+  }
+
+  const orderStatus = mapFlowStatus(status);
+
+  context.log('🔄 Processing status:', { flowStatus: status, orderStatus });
+
+  // Duplicate notification: nothing to update, reduce or audit again
+  if (orderStatus === order.status) {
+    context.log(`ℹ️ Order ${orderId} already ${order.status}, nothing to do`);
+    return order.status;
+  }
+
+  // Out-of-order notification (e.g. a retried 'pending' after 'paid'):
+  // the stock may already be reduced, so a terminal status is final
+  if (TERMINAL_ORDER_STATUSES.includes(order.status)) {
+    context.warn(`⚠️ Order ${orderId} is ${order.status}, ignoring ${orderStatus} notification`);
+    return order.status;
+  }
+
+  // Update order only if it is still in the status we read, so the Azure
+  // verifyFlowPayment function and the flow-webhook-worker queue worker can't
+  // both apply the payment
+  const { data: updatedRows, error: updateError } = await supabase
+    .from('orders')
+    .update({
+      status: orderStatus,
+      payment_method: mapPaymentMethod(paymentMethod),
+      payment_date: orderStatus === 'paid' ? new Date().toISOString() : null,
+      updated_at: new Date().toISOString(),
+    })
+    .eq('id', orderId)
+    .eq('status', order.status)
+    .select('id');
+
+  if (updateError) {
+    context.error('❌ Error updating order:', updateError);
+    throw new Error('Failed to update order');
+  }
+
+  if (!updatedRows || updatedRows.length === 0) {
+    // Retry later: the next attempt reads the new status and stops if it is final
+    throw new Error(`Order ${orderId} was updated concurrently`);
+  }
+
+  context.log('✅ Order status updated to:', orderStatus);
+
+  // Process stock reduction if payment successful
+  let stockResult: StockResult = { success: true, processed: 0, errors: [] };
+
+  // The order was not paid before (checked above), so stock is reduced once
+  if (orderStatus === 'paid') {
+    context.log(`🔄 Processing stock reduction for order ${orderId}...`);
+
+    // Verify stock availability before reducing
+    const stockCheck = await checkStockAvailability(supabase, orderId, context);
+
+    if (!stockCheck.available) {
+      const errorMsg = `Insufficient stock for order ${orderId}`;
+      context.error('❌', errorMsg, stockCheck.details);
+      // Don't throw - order is paid, but log the issue
+      stockResult = { success: false, processed: 0, errors: [errorMsg] };
+    } else {
+      context.log('✅ Stock availability confirmed:', stockCheck.details);
+
+      // Reduce stock
+      stockResult = await reduceProductStock(supabase, orderId, context);
+
+      if (stockResult.success) {
+        context.log(`✅ Stock reduced successfully: ${stockResult.processed} products`);
+      } else {
+        context.error(`❌ Stock reduction partially failed:`, stockResult.errors);
+      }
+    }
+  }
+
+  // Log audit entry
+  await logPaymentAudit(
+    supabase,
+    orderId,
+    flowOrder || 'unknown',
+    orderStatus,
+    amount || '0',
+    mapPaymentMethod(paymentMethod),
+    stockResult,
+    context,
+  );
+
+  return orderStatus;
+}
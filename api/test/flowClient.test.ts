@@ -0,0 +1,120 @@
+import { after, before, beforeEach, describe, it } from 'node:test';
+import * as assert from 'node:assert/strict';
+import { CircuitOpenError, FlowApiError, FlowClient } from '../src/shared/flowClient';
+import { FlowStandIn, startFlowStandIn } from './flowStandIn';
+
+const SECRET_KEY = 'test-secret';
+
+const paymentData = {
+  commerceOrder: '42',
+  subject: 'Orden #42 - Forja del Destino',
+  currency: 'CLP',
+  amount: 25990,
+  email: 'cliente@example.com',
+  urlConfirmation: 'http://localhost/api/flow-webhook',
+  urlReturn: 'http://localhost/api/payment-redirect',
+};
+
+describe('FlowClient', () => {
+  let standIn: FlowStandIn;
+  let client: FlowClient;
+
+  before(async () => {
+    standIn = await startFlowStandIn(SECRET_KEY);
+  });
+
+  after(async () => {
+    await standIn.close();
+  });
+
+  beforeEach(() => {
+    client?.destroy();
+    standIn.failNext(0);
+    standIn.setLatency(0);
+    client = new FlowClient({
+      apiUrl: standIn.url,
+      apiKey: 'test-api-key',
+      secretKey: SECRET_KEY,
+      timeoutMs: 200,
+      breakerThreshold: 3,
+      breakerCooldownMs: 60000,
+    });
+  });
+
+  it('should create payment with a signed request', async () => {
+    const response = await client.createPayment(paymentData);
+
+    assert.match(response.token, /^standin-/);
+    assert.ok(response.flowOrder > 0);
+  });
+
+  it('should get payment status for a created payment', async () => {
+    const { token } = await client.createPayment(paymentData);
+
+    const status = await client.getPaymentStatus(token);
+
+    assert.equal(status.commerceOrder, '42');
+    assert.equal(status.status, 2);
+    assert.equal(status.amount, 25990);
+  });
+
+  it('should retry status calls on 5xx', async () => {
+    const { token } = await client.createPayment(paymentData);
+    standIn.failNext(2, 503);
+
+    const status = await client.getPaymentStatus(token);
+
+    assert.equal(status.status, 2);
+    assert.equal(client.getMetrics().retries, 2);
+  });
+
+  it('should not retry payment creation', async () => {
+    standIn.failNext(1, 503);
+    const requestsBefore = standIn.requests;
+
+    await assert.rejects(client.createPayment(paymentData), FlowApiError);
+    assert.equal(standIn.requests - requestsBefore, 1);
+  });
+
+  it('should not retry client errors', async () => {
+    standIn.failNext(1, 400);
+
+    await assert.rejects(client.getPaymentStatus('unknown'), (error: FlowApiError) => {
+      assert.equal(error.status, 400);
+      assert.equal(error.retryable, false);
+      return true;
+    });
+    assert.equal(client.getMetrics().retries, 0);
+  });
+
+  it('should time out slow calls', async () => {
+    standIn.setLatency(500);
+
+    await assert.rejects(client.createPayment(paymentData), /timeout/);
+  });
+
+  it('should open the circuit after consecutive failures and fail fast', async () => {
+    standIn.failNext(10, 503);
+
+    for (let i = 0; i < 3; i++) {
+      await assert.rejects(client.createPayment(paymentData), FlowApiError);
+    }
+    const requestsBefore = standIn.requests;
+
+    await assert.rejects(client.createPayment(paymentData), CircuitOpenError);
+    assert.equal(standIn.requests, requestsBefore);
+    assert.equal(client.getMetrics().circuit, 'open');
+    assert.equal(client.getMetrics().rejectedByBreaker, 1);
+  });
+
+  it('should record latency metrics', async () => {
+    await client.createPayment(paymentData);
+    await client.createPayment(paymentData);
+
+    const metrics = client.getMetrics();
+
+    assert.equal(metrics.calls, 2);
+    assert.equal(metrics.failures, 0);
+    assert.ok(metrics.p95Ms >= metrics.p50Ms);
+  });
+});
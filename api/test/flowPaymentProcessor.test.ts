@@ -0,0 +1,149 @@
+import { beforeEach, describe, it } from 'node:test';
+import * as assert from 'node:assert/strict';
+import { InvocationContext } from '@azure/functions';
+import { SupabaseClient } from '@supabase/supabase-js';
+import { processFlowNotification } from '../src/shared/flowPaymentProcessor';
+
+type Row = Record<string, any>;
+
+/**
+ * In-memory stand-in for the few Supabase calls the processor makes:
+ * from(table).select/update/insert with eq filters, and rpc()
+ */
+class FakeSupabase {
+  tables: Record<string, Row[]> = { orders: [], order_items: [], payment_audit_log: [] };
+  rpcCalls: Array<{ name: string; args: Row }> = [];
+
+  from(table: string) {
+    return new FakeQuery(this.tables[table]);
+  }
+
+  async rpc(name: string, args: Row) {
+    this.rpcCalls.push({ name, args });
+    return { data: null, error: null };
+  }
+}
+
+class FakeQuery {
+  private filters: Array<[string, unknown]> = [];
+  private changes: Row | null = null;
+
+  constructor(private rows: Row[]) {}
+
+  select() {
+    return this;
+  }
+
+  eq(column: string, value: unknown) {
+    this.filters.push([column, value]);
+    return this;
+  }
+
+  update(changes: Row) {
+    this.changes = changes;
+    return this;
+  }
+
+  async insert(row: Row) {
+    this.rows.push(row);
+    return { data: null, error: null };
+  }
+
+  async maybeSingle() {
+    return { data: this.matching()[0] ?? null, error: null };
+  }
+
+  then(resolve: (result: { data: Row[]; error: null }) => void) {
+    const matching = this.matching();
+    if (this.changes) {
+      matching.forEach((row) => Object.assign(row, this.changes));
+    }
+    resolve({ data: matching, error: null });
+  }
+
+  private matching(): Row[] {
+    return this.rows.filter((row) =>
+      this.filters.every(([column, value]) => row[column] === value),
+    );
+  }
+}
+
+const context = {
+  log: () => {},
+  warn: () => {},
+  error: () => {},
+} as unknown as InvocationContext;
+
+const notification = (status: string) => ({
+  token: 'flow-token',
+  flowOrder: '9001',
+  status,
+  commerceOrder: '42',
+  paymentMethod: '1',
+  amount: '25990',
+});
+
+describe('processFlowNotification', () => {
+  let fake: FakeSupabase;
+  let supabase: SupabaseClient;
+
+  beforeEach(() => {
+    fake = new FakeSupabase();
+    fake.tables.orders.push({
+      id: 42,
+      status: 'pending',
+      total_amount: 25990,
+      flow_token: 'flow-token',
+    });
+    fake.tables.order_items.push({
+      order_id: 42,
+      product_id: 7,
+      quantity: 2,
+      products: { name: 'Lunora', stock_quantity: 10 },
+    });
+    supabase = fake as unknown as SupabaseClient;
+  });
+
+  it('should pay the order, reduce stock and audit once', async () => {
+    const status = await processFlowNotification(supabase, notification('2'), context);
+
+    assert.equal(status, 'paid');
+    assert.equal(fake.tables.orders[0].status, 'paid');
+    assert.equal(fake.rpcCalls.length, 1);
+    assert.equal(fake.tables.payment_audit_log.length, 1);
+  });
+
+  it('should ignore the same paid notification processed twice', async () => {
+    await processFlowNotification(supabase, notification('2'), context);
+    const paymentDate = fake.tables.orders[0].payment_date;
+
+    const status = await processFlowNotification(supabase, notification('2'), context);
+
+    assert.equal(status, 'paid');
+    assert.equal(fake.tables.orders[0].payment_date, paymentDate);
+    assert.equal(fake.rpcCalls.length, 1);
+    assert.equal(fake.tables.payment_audit_log.length, 1);
+  });
+
+  it('should not move a paid order back to pending', async () => {
+    await processFlowNotification(supabase, notification('2'), context);
+
+    const status = await processFlowNotification(supabase, notification('1'), context);
+
+    assert.equal(status, 'paid');
+    assert.equal(fake.tables.orders[0].status, 'paid');
+    assert.equal(fake.tables.payment_audit_log.length, 1);
+
+    // A later paid retry must not reduce the stock again
+    await processFlowNotification(supabase, notification('2'), context);
+    assert.equal(fake.rpcCalls.length, 1);
+  });
+
+  it('should not write anything for a pending notification of a pending order', async () => {
+    const status = await processFlowNotification(supabase, notification('1'), context);
+
+    assert.equal(status, 'pending');
+    assert.equal(fake.tables.orders[0].updated_at, undefined);
+    assert.equal(fake.tables.payment_audit_log.length, 0);
+  });
+});
@@ -0,0 +1,142 @@
+import * as http from 'http';
+import { AddressInfo } from 'net';
+import { signFlowParams } from '../src/shared/flowClient';
+
+/**
+ * Local stand-in for the Flow.cl API
+ * Implements /payment/create and /payment/getStatus with signature checks,
+ * plus knobs to inject latency and failures
+ *
+ * Usable from tests or standalone:
+ *   npm run build && node dist/test/flowStandIn.js
+ *   FLOW_API_URL=http://localhost:7072 npm start
+ */
+
+export interface FlowStandIn {
+  url: string;
+  /** Requests received (including failed ones) */
+  readonly requests: number;
+  /** Answer the next `count` requests with `status` */
+  failNext(count: number, status?: number): void;
+  /** Delay every response by `ms` */
+  setLatency(ms: number): void;
+  close(): Promise<void>;
+}
+
+function readBody(req: http.IncomingMessage): Promise<string> {
+  return new Promise((resolve) => {
+    const chunks: Buffer[] = [];
+    req.on('data', (chunk: Buffer) => chunks.push(chunk));
+    req.on('end', () => resolve(Buffer.concat(chunks).toString('utf8')));
+  });
+}
+
+function isSigned(params: URLSearchParams, secretKey: string): boolean {
+  const unsigned: Record<string, string> = {};
+  params.forEach((value, key) => {
+    if (key !== 's') unsigned[key] = value;
+  });
+  return signFlowParams(unsigned, secretKey) === params.get('s');
+}
+
+export async function startFlowStandIn(secretKey: string, port = 0): Promise<FlowStandIn> {
+  let requests = 0;
+  let latencyMs = 0;
+  let failures = { count: 0, status: 503 };
+  let nextFlowOrder = 1000;
+  const payments = new Map<string, { commerceOrder: string; amount: string; flowOrder: number }>();
+
+  const server = http.createServer(async (req, res) => {
+    requests++;
+    const url = new URL(req.url ?? '/', 'http://localhost');
+    const body = await readBody(req);
+
+    if (latencyMs > 0) {
+      await new Promise((resolve) => setTimeout(resolve, latencyMs));
+    }
+
+    const send = (status: number, payload: unknown) => {
+      res.writeHead(status, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify(payload));
+    };
+
+    if (failures.count > 0) {
+      failures.count--;
+      send(failures.status, { code: failures.status, message: 'Injected failure' });
+      return;
+    }
+
+    if (req.method === 'POST' && url.pathname === '/payment/create') {
+      const params = new URLSearchParams(body);
+      if (!isSigned(params, secretKey)) {
+        send(401, { code: 108, message: 'Invalid signature' });
+        return;
+      }
+
+      const flowOrder = nextFlowOrder++;
+      const token = `standin-${flowOrder}`;
+      payments.set(token, {
+        commerceOrder: params.get('commerceOrder') ?? '',
+        amount: params.get('amount') ?? '0',
+        flowOrder,
+      });
+      send(200, { url: `http://localhost/pay`, token, flowOrder });
+      return;
+    }
+
+    if (req.method === 'GET' && url.pathname === '/payment/getStatus') {
+      if (!isSigned(url.searchParams, secretKey)) {
+        send(401, { code: 108, message: 'Invalid signature' });
+        return;
+      }
+
+      const payment = payments.get(url.searchParams.get('token') ?? '');
+      if (!payment) {
+        send(400, { code: 105, message: 'Token not found' });
+        return;
+      }
+
+      send(200, {
+        flowOrder: payment.flowOrder,
+        commerceOrder: payment.commerceOrder,
+        requestDate: new Date().toISOString(),
+        status: 2,
+        subject: `Orden #${payment.commerceOrder}`,
+        currency: 'CLP',
+        amount: Number(payment.amount),
+        payer: 'standin@example.com',
+        paymentMethod: 1,
+      });
+      return;
+    }
+
+    send(404, { code: 404, message: 'Not found' });
+  });
+
+  await new Promise<void>((resolve) => server.listen(port, resolve));
+  const { port: boundPort } = server.address() as AddressInfo;
+
+  return {
+    url: `http://localhost:${boundPort}`,
+    get requests() {
+      return requests;
+    },
+    failNext(count: number, status = 503) {
+      failures = { count, status };
+    },
+    setLatency(ms: number) {
+      latencyMs = ms;
+    },
+    close() {
+      server.closeAllConnections?.();
+      return new Promise((resolve) => server.close(() => resolve()));
+    },
+  };
+}
+
+if (require.main === module) {
+  const secretKey = process.env.FLOW_SECRET_KEY || 'standin-secret';
+  startFlowStandIn(secretKey, parseInt(process.env.PORT || '7072')).then((standIn) =>
+    console.log(`Flow stand-in listening on ${standIn.url}`),
+  );
+}
@@ -0,0 +1,350 @@
+/**
+ * Storefront service worker
+ *
+ * Tiers:
+ * - shell: the built app (index.html, hashed JS/CSS, icons) precached under
+ *   the build hash; cache-first, and navigations outside the catalog get the
+ *   cached index.html. A new build installs a new shell cache and removes the
+ *   old one once every tab of the previous version is closed (no skipWaiting:
+ *   open tabs keep loading chunks of the version they started with).
+ * - pages: navigations to the prerendered catalog (/products, categories and
+ *   product pages, scripts/prerender-catalog.mjs) go to the network first, so
+ *   they get the static markup, transfer state and SEO of that page; the
+ *   response is kept for offline use, and the shell is the last fallback.
+ *   Per build, like the shell: the pages reference its hashed bundles.
+ * - data: catalog reads from Supabase (GET on the public product and category
+ *   views) and /assets/config.json; stale-while-revalidate, size-bounded LRU.
+ * - images: product images; stale-while-revalidate (revalidated at most once
+ *   a day), size-bounded LRU.
+ * - network only: cart, orders and payments (Supabase tables, /api, payment
+ *   pages), auth and Edge Functions. Never cached.
+ *
+ * Cache metrics (since this worker started) are answered to a
+ * { type: 'CACHE_METRICS' } message on the transferred port
+ * (ServiceWorkerService.refreshMetrics()).
+ *
+ * MANIFEST is written by scripts/build-service-worker.mjs after the build;
+ * with the placeholder below the worker does nothing.
+ */
+
+// @sw-manifest
+const MANIFEST = { version: 'dev', shell: [] };
+
+const SHELL_PREFIX = 'shell-';
+const SHELL_CACHE = `${SHELL_PREFIX}${MANIFEST.version}`;
+const PAGES_PREFIX = 'pages-';
+const INDEX_URL = '/index.html';
+
+// Routes with a prerendered page (or none, for products added after the build)
+const PRERENDERED_PATHS = /^\/products(\/|$)/;
+
+// Opaque (no-cors) responses hide their size; count each as this many bytes
+const OPAQUE_SIZE_ESTIMATE = 100 * 1024;
+
+const TIERS = {
+  pages: {
+    cacheName: `${PAGES_PREFIX}${MANIFEST.version}`,
+    maxBytes: 5 * 1024 * 1024,
+    revalidateAfterMs: 0,
+  },
+  data: {
+    cacheName: 'data-v1',
+    maxBytes: 5 * 1024 * 1024,
+    revalidateAfterMs: 0,
+  },
+  images: {
+    cacheName: 'images-v1',
+    maxBytes: 40 * 1024 * 1024,
+    revalidateAfterMs: 24 * 60 * 60 * 1000,
+  },
+};
+
+// Catalog views and tables the storefront reads anonymously
+const CATALOG_TABLES = new Set([
+  'products_list',
+  'products_full_public',
+  'products_in_category',
+  'categories',
+  'category_closure',
+]);
+
+// Customer data: always from the network
+const NETWORK_ONLY_TABLES = /^(cart_items|orders|order_items|payment|webhook)/;
+const NETWORK_ONLY_PATHS = /^\/(api|payment)(\/|$)|^\/payment-callback\.html$/;
+
+const metrics = {
+  shell: { hits: 0, misses: 0 },
+  // hits: served from the cache (offline), misses: served by the network
+  pages: { hits: 0, misses: 0, revalidations: 0, evictions: 0 },
+  data: { hits: 0, misses: 0, revalidations: 0, evictions: 0 },
+  images: { hits: 0, misses: 0, revalidations: 0, evictions: 0 },
+  networkOnly: 0,
+};
+
+// Per LRU tier: cache key → { size, cachedAt }, least recently used first
+// (rebuilt from the cache when the worker starts)
+const indexes = new Map();
+
+// ============================================================================
+// Lifecycle
+// ============================================================================
+
+self.addEventListener('install', (event) => {
+  if (MANIFEST.version === 'dev') return;
+
+  // cache: 'reload' skips the HTTP cache, which may hold files of the previous build
+  const requests = MANIFEST.shell.map((url) => new Request(url, { cache: 'reload' }));
+  event.waitUntil(caches.open(SHELL_CACHE).then((cache) => cache.addAll(requests)));
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter(
+              (name) =>
+                (name.startsWith(SHELL_PREFIX) && name !== SHELL_CACHE) ||
+                (name.startsWith(PAGES_PREFIX) && name !== TIERS.pages.cacheName),
+            )
+            .map((name) => caches.delete(name)),
+        ),
+      )
+      .then(() => self.clients.claim()),
+  );
+});
+
+self.addEventListener('message', (event) => {
+  if (event.data?.type === 'CACHE_METRICS' && event.ports[0]) {
+    event.waitUntil(cacheMetrics().then((result) => event.ports[0].postMessage(result)));
+  }
+});
+
+// ============================================================================
+// Routing
+// ============================================================================
+
+self.addEventListener('fetch', (event) => {
+  if (MANIFEST.version === 'dev') return;
+
+  const { request } = event;
+  const url = new URL(request.url);
+
+  if (isNetworkOnly(request, url)) {
+    metrics.networkOnly++;
+    return;
+  }
+
+  if (request.mode === 'navigate' && url.origin === self.location.origin) {
+    event.respondWith(
+      PRERENDERED_PATHS.test(url.pathname)
+        ? prerenderedPage(event, `${url.origin}${url.pathname}`)
+        : fromShell(INDEX_URL, request),
+    );
+  } else if (url.origin === self.location.origin && MANIFEST.shell.includes(url.pathname)) {
+    event.respondWith(fromShell(url.pathname, request));
+  } else if (isCatalogRead(url) || url.pathname === '/assets/config.json') {
+    event.respondWith(staleWhileRevalidate(event, 'data', dataCacheKey(request)));
+  } else if (request.destination === 'image') {
+    event.respondWith(staleWhileRevalidate(event, 'images', request.url));
+  }
+  // Anything else goes to the network as if there were no worker
+});
+
+function isNetworkOnly(request, url) {
+  if (request.method !== 'GET') return true;
+  if (url.origin === self.location.origin) return NETWORK_ONLY_PATHS.test(url.pathname);
+  if (/^\/(auth|functions)\/v1\//.test(url.pathname)) return true;
+
+  const table = url.pathname.match(/^\/rest\/v1\/([^/]+)/)?.[1];
+  return !!table && NETWORK_ONLY_TABLES.test(table);
+}
+
+function isCatalogRead(url) {
+  const table = url.pathname.match(/^\/rest\/v1\/([^/]+)$/)?.[1];
+  return !!table && CATALOG_TABLES.has(table);
+}
+
+/**
+ * PostgREST returns a different body for the same URL depending on Accept
+ * (.single()) and Prefer (count): both go into the cache key
+ */
+function dataCacheKey(request) {
+  const url = new URL(request.url);
+  const accept = request.headers.get('accept') ?? '';
+  const prefer = request.headers.get('prefer') ?? '';
+  url.searchParams.set('__sw', `${accept}|${prefer}`);
+  return url.toString();
+}
+
+// ============================================================================
+// Strategies
+// ============================================================================
+
+async function fromShell(path, request) {
+  const cached = await caches.match(path, { cacheName: SHELL_CACHE });
+  if (cached) {
+    metrics.shell.hits++;
+    return cached;
+  }
+  metrics.shell.misses++;
+  return fetch(request);
+}
+
+/**
+ * Network first, so a prerendered page is always the current one; the last
+ * page received when offline, and the shell (the app renders the route
+ * client-side) when offline without one or when the page can't be loaded
+ */
+async function prerenderedPage(event, key) {
+  const cache = await caches.open(TIERS.pages.cacheName);
+  try {
+    const response = await fetch(event.request);
+    if (response.ok) {
+      metrics.pages.misses++;
+      event.waitUntil(store('pages', cache, key, response.clone()));
+      return response;
+    }
+  } catch {
+    // Offline: fall back below
+  }
+
+  const cached = await cache.match(key);
+  if (cached) {
+    metrics.pages.hits++;
+    const index = await loadIndex('pages', cache);
+    const entry = index.get(key);
+    if (entry) touch(index, key, entry);
+    return cached;
+  }
+  return fromShell(INDEX_URL, event.request);
+}
+
+/**
+ * Answer from the cache when there is an entry and refresh it in the
+ * background; otherwise wait for the network. A failed network request
+ * falls back to whatever is cached (offline).
+ */
+async function staleWhileRevalidate(event, tierName, key) {
+  const tier = TIERS[tierName];
+  const cache = await caches.open(tier.cacheName);
+  const index = await loadIndex(tierName, cache);
+  const cached = await cache.match(key);
+  const entry = index.get(key);
+
+  if (cached && entry) {
+    metrics[tierName].hits++;
+    touch(index, key, entry);
+
+    if (Date.now() - entry.cachedAt >= tier.revalidateAfterMs) {
+      metrics[tierName].revalidations++;
+      event.waitUntil(
+        fetch(event.request)
+          .then((response) => store(tierName, cache, key, response))
+          .catch(() => {}),
+      );
+    }
+    return cached;
+  }
+
+  metrics[tierName].misses++;
+  try {
+    const response = await fetch(event.request);
+    event.waitUntil(store(tierName, cache, key, response.clone()));
+    return response;
+  } catch (error) {
+    if (cached) return cached;
+    throw error;
+  }
+}
+
+// ============================================================================
+// Size-bounded LRU
+// ============================================================================
+
+async function loadIndex(tierName, cache) {
+  if (!indexes.has(tierName)) {
+    indexes.set(
+      tierName,
+      (async () => {
+        const index = new Map();
+        // keys() lists entries in insertion order: a fair start for recency
+        for (const request of await cache.keys()) {
+          const response = await cache.match(request);
+          index.set(request.url, {
+            size: Number(response?.headers.get('sw-size')) || OPAQUE_SIZE_ESTIMATE,
+            cachedAt: Number(response?.headers.get('sw-cached-at')) || 0,
+          });
+        }
+        return index;
+      })(),
+    );
+  }
+  return indexes.get(tierName);
+}
+
+function touch(index, key, entry) {
+  index.delete(key);
+  index.set(key, entry);
+}
+
+async function store(tierName, cache, key, response) {
+  const ok = response.ok || response.type === 'opaque';
+  if (!ok || response.headers.get('cache-control')?.includes('no-store')) return;
+
+  const cachedAt = Date.now();
+  let size = OPAQUE_SIZE_ESTIMATE;
+  let stored = response;
+  if (response.type !== 'opaque') {
+    // Readable responses carry their size and age for the next worker start
+    const body = await response.blob();
+    size = body.size;
+    const headers = new Headers(response.headers);
+    headers.set('sw-size', String(size));
+    headers.set('sw-cached-at', String(cachedAt));
+    stored = new Response(body, {
+      status: response.status,
+      statusText: response.statusText,
+      headers,
+    });
+  }
+
+  const tier = TIERS[tierName];
+  if (size > tier.maxBytes) return;
+
+  const index = await loadIndex(tierName, cache);
+  await cache.put(key, stored);
+  touch(index, key, { size, cachedAt });
+
+  let total = 0;
+  for (const { size: entrySize } of index.values()) total += entrySize;
+  for (const [oldKey, { size: oldSize }] of index) {
+    if (total <= tier.maxBytes) break;
+    index.delete(oldKey);
+    await cache.delete(oldKey);
+    total -= oldSize;
+    metrics[tierName].evictions++;
+  }
+}
+
+// ============================================================================
+// Metrics
+// ============================================================================
+
+async function cacheMetrics() {
+  const tiers = { shell: { ...metrics.shell, entries: MANIFEST.shell.length } };
+  for (const tierName of Object.keys(TIERS)) {
+    const index = await loadIndex(tierName, await caches.open(TIERS[tierName].cacheName));
+    let bytes = 0;
+    for (const { size } of index.values()) bytes += size;
+    tiers[tierName] = {
+      ...metrics[tierName],
+      entries: index.size,
+      bytes,
+      maxBytes: TIERS[tierName].maxBytes,
+    };
+  }
+  return { version: MANIFEST.version, tiers, networkOnly: metrics.networkOnly };
+}
@@ -1711,7 +1711,7 @@ SELECT 'tags', COUNT(*) FROM tags;
 -- 
 -- NEXT STEPS:
 -- 1. Execute this seed data script
--- 2. Run migrate-products-to-db.mjs to insert 12 products
+-- 2. Run scripts/import-catalog.py scripts/catalog-seed.json to insert 12 products
 -- 3. The migration script will:
 --    - Insert products with material_id references
 --    - Create product_categories relationships (N:N)
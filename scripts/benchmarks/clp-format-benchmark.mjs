@@ -0,0 +1,114 @@
+#!/usr/bin/env node
+
+/**
+ * clp-format-benchmark.mjs
+ *
+ * Compares the previous ClpCurrencyPipe implementation (toString + regex
+ * thousands separator on every call) with formatClp from
+ * src/app/pipes/clp-format.ts over 1M values.
+ *
+ * Two workloads:
+ * - catalog: 1M lookups over a few hundred distinct prices, which is what
+ *   change detection does on the product list, cart and checkout
+ * - unique:  1M distinct values, the worst case for the LRU (every call misses)
+ *
+ * Both implementations must produce identical strings for every value; the
+ * script exits with an error otherwise.
+ *
+ * Usage:
+ *   npm run bench:currency
+ *   node scripts/benchmarks/clp-format-benchmark.mjs [--iterations=1000000]
+ */
+
+import { readFile } from 'node:fs/promises';
+import { performance } from 'node:perf_hooks';
+import ts from 'typescript';
+
+const ITERATIONS = Number(
+  process.argv.find((arg) => arg.startsWith('--iterations='))?.split('=')[1] ?? 1_000_000,
+);
+const DISTINCT_PRICES = 300;
+const RUNS = 5;
+
+// Load the app module as-is so the benchmark always measures the shipped code
+async function loadFormatter() {
+  const source = await readFile(new URL('../../src/app/pipes/clp-format.ts', import.meta.url), 'utf8');
+  const { outputText } = ts.transpileModule(source, {
+    compilerOptions: { module: ts.ModuleKind.ESNext, target: ts.ScriptTarget.ES2022 },
+  });
+  return import(`data:text/javascript;base64,${Buffer.from(outputText).toString('base64')}`);
+}
+
+// Previous ClpCurrencyPipe.transform / ProductList.formatPrice
+function regexFormat(value) {
+  if (value === null || value === undefined || isNaN(value)) {
+    return '';
+  }
+  const formatted = Math.round(value)
+    .toString()
+    .replace(/\B(?=(\d{3})+(?!\d))/g, '.');
+  return `$${formatted}`;
+}
+
+// Deterministic prices (CLP, multiples of 10) so runs are comparable
+function buildValues(count, distinct) {
+  let seed = 42;
+  const next = () => {
+    seed = (seed * 1103515245 + 12345) % 2 ** 31;
+    return seed;
+  };
+  const pool = Array.from({ length: distinct }, () => (next() % 200_000) * 10 + 990);
+  return Float64Array.from({ length: count }, (_, i) =>
+    distinct >= count ? pool[i] : pool[next() % distinct],
+  );
+}
+
+function measure(format, values) {
+  let sink = 0;
+  const timings = [];
+  for (let run = 0; run < RUNS; run++) {
+    const start = performance.now();
+    for (let i = 0; i < values.length; i++) {
+      sink += format(values[i]).length;
+    }
+    timings.push(performance.now() - start);
+  }
+  timings.sort((a, b) => a - b);
+  return { median: timings[Math.floor(RUNS / 2)], sink };
+}
+
+function verify(formatClp, values) {
+  for (const value of [...values, 0, -1500, 999, 1000, 2400.5, 1_234_567_890, NaN, null, undefined]) {
+    const expected = regexFormat(value);
+    const actual = formatClp(value);
+    if (actual !== expected) {
+      throw new Error(`formatClp(${value}) = "${actual}", expected "${expected}"`);
+    }
+  }
+}
+
+const { formatClp } = await loadFormatter();
+
+console.log(`📊 CLP formatting, ${ITERATIONS.toLocaleString('en')} values, median of ${RUNS} runs\n`);
+
+for (const [name, distinct] of [
+  ['catalog', DISTINCT_PRICES],
+  ['unique', ITERATIONS],
+]) {
+  const values = buildValues(ITERATIONS, distinct);
+  verify(formatClp, values.subarray(0, 10_000));
+
+  // Warm up both paths before measuring
+  measure(regexFormat, values.subarray(0, 10_000));
+  measure(formatClp, values.subarray(0, 10_000));
+
+  const before = measure(regexFormat, values);
+  const after = measure(formatClp, values);
+
+  console.log(`${name} (${distinct.toLocaleString('en')} distinct prices)`);
+  console.log(`  regex       ${before.median.toFixed(1).padStart(9)} ms`);
+  console.log(`  formatClp   ${after.median.toFixed(1).padStart(9)} ms`);
+  console.log(`  speedup     ${(before.median / after.median).toFixed(2).padStart(9)}x\n`);
+}
+
+console.log('✅ Outputs identical');
@@ -0,0 +1,76 @@
+#!/usr/bin/env node
+
+/**
+ * build-service-worker.mjs
+ *
+ * Writes the precache manifest into dist/shopping-cart/browser/sw.js:
+ * - shell: index.html, the hashed JS/CSS bundles, fonts and icons at the
+ *   root of the build (prerendered pages, /assets and /payment stay out)
+ * - version: hash of those files' contents, which names the shell cache
+ *
+ * Run last, after prerender and generate-config.sh: the config they inline
+ * into index.html is part of the hash, and any change to sw.js makes
+ * browsers install the new worker.
+ *
+ * Usage:
+ *   npm run build:prod && npm run build:sw
+ */
+
+import { createHash } from 'node:crypto';
+import { existsSync, readFileSync, readdirSync, statSync, writeFileSync } from 'node:fs';
+import { dirname, join, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+
+const __dirname = dirname(fileURLToPath(import.meta.url));
+const DIST_DIR = resolve(__dirname, '../dist/shopping-cart/browser');
+const SW_FILE = join(DIST_DIR, 'sw.js');
+
+// Root files that make up the app shell
+const SHELL_FILE = /\.(html|js|css|woff2?|ico|svg|png|webmanifest)$/;
+// Served by Azure or only used on specific pages
+const EXCLUDED = new Set(['sw.js', 'payment-callback.html', 'staticwebapp.config.json']);
+
+const MANIFEST_LINE = /^\/\/ @sw-manifest\nconst MANIFEST = .*;$/m;
+
+if (!existsSync(SW_FILE)) {
+  console.error(`❌ Error: ${SW_FILE} not found. Run npm run build:prod first.`);
+  process.exit(1);
+}
+
+const shellFiles = readdirSync(DIST_DIR)
+  .filter((name) => SHELL_FILE.test(name) && !EXCLUDED.has(name))
+  .filter((name) => statSync(join(DIST_DIR, name)).isFile())
+  .sort();
+
+if (!shellFiles.includes('index.html')) {
+  console.error('❌ Error: index.html is missing from the build output');
+  process.exit(1);
+}
+
+const hash = createHash('sha256');
+let totalBytes = 0;
+for (const name of shellFiles) {
+  const content = readFileSync(join(DIST_DIR, name));
+  hash.update(name).update(content);
+  totalBytes += content.length;
+}
+
+const manifest = {
+  version: hash.digest('hex').slice(0, 12),
+  shell: shellFiles.map((name) => `/${name}`),
+};
+
+const worker = readFileSync(SW_FILE, 'utf-8');
+if (!MANIFEST_LINE.test(worker)) {
+  console.error('❌ Error: manifest placeholder not found in sw.js');
+  process.exit(1);
+}
+writeFileSync(
+  SW_FILE,
+  worker.replace(MANIFEST_LINE, `// @sw-manifest\nconst MANIFEST = ${JSON.stringify(manifest)};`),
+);
+
+console.log(
+  `✅ Service worker ${manifest.version}: ${shellFiles.length} shell files ` +
+    `(${(totalBytes / 1024).toFixed(1)} KB precached)`,
+);
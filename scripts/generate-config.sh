@@ -38,6 +38,45 @@ sed -i.bak "s|\"environment\": \"development\"|\"environment\": \"${ENVIRONMENT}
 # Remove backup file
 rm "${CONFIG_FILE}.bak"
 
+# Add a content hash and inline the config into every app page (index.html and
+# prerendered catalog pages) so ConfigService starts without fetching config.json
+node - "$CONFIG_FILE" <<'NODE'
+const fs = require('node:fs');
+const path = require('node:path');
+const crypto = require('node:crypto');
+
+const configFile = process.argv[2];
+const config = JSON.parse(fs.readFileSync(configFile, 'utf8'));
+delete config.version;
+config.version = crypto.createHash('sha256').update(JSON.stringify(config)).digest('hex').slice(0, 12);
+fs.writeFileSync(configFile, JSON.stringify(config, null, 2) + '\n');
+
+const inline = `<script id="app-config" type="application/json">${JSON.stringify(config).replace(/</g, '\\u003C')}</script>`;
+const browserDir = path.dirname(path.dirname(configFile));
+let pages = 0;
+
+const walk = (dir) => {
+  for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+    const file = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      if (entry.name !== 'assets') walk(file);
+      continue;
+    }
+    if (!entry.name.endsWith('.html')) continue;
+
+    const html = fs.readFileSync(file, 'utf8');
+    if (!html.includes('<app-root')) continue;
+
+    const withoutPrevious = html.replace(/<script id="app-config"[^>]*>.*?<\/script>/s, '');
+    fs.writeFileSync(file, withoutPrevious.replace('</head>', `${inline}</head>`));
+    pages++;
+  }
+};
+walk(browserDir);
+
+console.log(`📦 Config ${config.version} inlined into ${pages} page(s)`);
+NODE
+
 echo "✅ Config generated successfully for ${ENVIRONMENT}"
 echo ""
 echo "📄 Generated configuration:"
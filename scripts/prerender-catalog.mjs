@@ -0,0 +1,428 @@
+#!/usr/bin/env node
+
+/**
+ * prerender-catalog.mjs
+ *
+ * Generates static HTML for the catalog after `npm run build:prod`:
+ * - /products                    (first page of the default listing)
+ * - /products/category/<slug>    (one per active category)
+ * - /products/<slug>             (one per available product)
+ *
+ * Each page is the built index.html with:
+ * - Title, description, canonical and Open Graph tags for the page
+ * - Static markup inside <app-root> so products paint before Angular boots
+ * - The queried rows embedded as Angular transfer state (<script id="ng-state">),
+ *   which ProductService reads instead of querying Supabase on first load
+ *
+ * Azure Static Web Apps serves <path>/index.html directly; routes without a
+ * file (search, filters, new products) fall back to the SPA as before.
+ *
+ * Incremental: rendered pages and their content hashes are kept in
+ * .prerender-cache/. Only pages whose data (or the app shell) changed are
+ * rendered again; pages of removed products are deleted. CI restores the
+ * cache between runs.
+ *
+ * Usage:
+ *   npm run build:prod
+ *   SUPABASE_URL=... SUPABASE_KEY=... node scripts/prerender-catalog.mjs [--force]
+ */
+
+import { createClient } from '@supabase/supabase-js';
+import { createHash } from 'crypto';
+import { existsSync, mkdirSync, readFileSync, rmSync, writeFileSync, cpSync } from 'fs';
+import { resolve, dirname, join } from 'path';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+
+const DIST_DIR = resolve(__dirname, '../dist/shopping-cart/browser');
+const CACHE_DIR = resolve(__dirname, '../.prerender-cache');
+const MANIFEST_PATH = join(CACHE_DIR, 'manifest.json');
+const SITE_URL = 'https://lumina.cl';
+
+// Must match ProductList.applyFilters() so ProductService recognizes the snapshot
+const DEFAULT_FILTERS = { minPrice: 0, maxPrice: 50000 };
+const DEFAULT_PAGINATION = { page: 0, pageSize: 12 };
+
+const force = process.argv.includes('--force');
+
+// ============================================================================
+// Load Configuration
+// ============================================================================
+
+let supabaseUrl, supabaseKey;
+
+try {
+  const configPath = resolve(__dirname, '../src/assets/config.local.json');
+  const config = JSON.parse(readFileSync(configPath, 'utf-8'));
+  supabaseUrl = config.supabase.url;
+  // Anon key is enough: the product views and categories are public
+  supabaseKey = config.supabase.anonKey;
+} catch (error) {
+  supabaseUrl = process.env.SUPABASE_URL;
+  supabaseKey = process.env.SUPABASE_KEY;
+}
+
+if (!supabaseUrl || !supabaseKey) {
+  console.error('❌ Error: Missing Supabase credentials');
+  console.error('Set SUPABASE_URL and SUPABASE_KEY environment variables');
+  process.exit(1);
+}
+
+const shellPath = join(DIST_DIR, 'index.html');
+if (!existsSync(shellPath)) {
+  console.error(`❌ Error: ${shellPath} not found. Run npm run build:prod first.`);
+  process.exit(1);
+}
+
+const supabase = createClient(supabaseUrl, supabaseKey);
+
+// ============================================================================
+// Data
+// ============================================================================
+
+async function fetchCatalog() {
+  const [productsResult, cardsResult, categoriesResult, closureResult] = await Promise.all([
+    supabase.from('products_full_public').select('*').eq('is_available', true).order('id'),
+    supabase.from('products_list').select('*').eq('is_available', true).order('id'),
+    supabase.from('categories').select('id, name, slug').eq('is_active', true).order('name'),
+    supabase.from('category_closure').select('ancestor_id, descendant_id'),
+  ]);
+
+  if (productsResult.error) throw productsResult.error;
+  if (cardsResult.error) throw cardsResult.error;
+  if (categoriesResult.error) throw categoriesResult.error;
+  if (closureResult.error) throw closureResult.error;
+
+  // Category id → ids of the category and all its subcategories
+  const subtrees = new Map();
+  for (const { ancestor_id, descendant_id } of closureResult.data) {
+    if (!subtrees.has(ancestor_id)) subtrees.set(ancestor_id, new Set());
+    subtrees.get(ancestor_id).add(descendant_id);
+  }
+
+  return {
+    // Full rows for product pages, products_list rows for listings (what the app queries)
+    products: productsResult.data,
+    cards: new Map(cardsResult.data.map((card) => [card.id, card])),
+    categories: categoriesResult.data.map((c) => ({ ...c, subtree: subtrees.get(c.id) })),
+  };
+}
+
+/**
+ * Same result ProductService.loadProducts() computes for these arguments:
+ * price range, paging and category (with its subcategories, as
+ * products_in_category) in the query, with products_list rows
+ */
+function listingFor({ products, cards }, filters, pagination, subtree) {
+  const matching = products.filter(
+    (p) =>
+      p.price >= filters.minPrice &&
+      p.price <= filters.maxPrice &&
+      // categories entries of products_full are { id, name, slug, parent_id }
+      (!subtree || p.categories.some((c) => subtree.has(c.id))),
+  );
+  const from = pagination.page * pagination.pageSize;
+  const page = matching.slice(from, from + pagination.pageSize).map((p) => cards.get(p.id));
+
+  return { filters, pagination, products: page, totalCount: matching.length };
+}
+
+// ============================================================================
+// HTML
+// ============================================================================
+
+function escapeHtml(value) {
+  return String(value ?? '')
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;');
+}
+
+/** JSON safe to embed in a <script> element (same escaping Angular uses) */
+function scriptJson(value) {
+  return JSON.stringify(value)
+    .replace(/</g, '\\u003C')
+    .replace(/>/g, '\\u003E')
+    .replace(/&/g, '\\u0026');
+}
+
+function formatPrice(price) {
+  return `$${Math.round(price)
+    .toString()
+    .replace(/\B(?=(\d{3})+(?!\d))/g, '.')}`;
+}
+
+// Same resolution as src/app/pipes/image-source.ts: self-hosted variant, Unsplash params or original
+function imageUrl(image, width) {
+  const variants = image?.variants;
+  if (variants?.widths?.length) {
+    const fit = variants.widths.find((w) => w >= width) ?? variants.widths.at(-1);
+    return `${variants.base}/${fit}.webp`;
+  }
+
+  const url = image?.image_url || '';
+  if (!url.includes('unsplash.com')) return url;
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}w=${width}&q=80&fm=webp`;
+}
+
+function primaryImageRow(product) {
+  return product.images.find((img) => img.is_primary) || product.images[0];
+}
+
+function primaryImage(product) {
+  return primaryImageRow(product)?.image_url || '';
+}
+
+function setMeta(html, attribute, key, value) {
+  const tag = `<meta ${attribute}="${key}" content="${escapeHtml(value)}" />`;
+  const pattern = new RegExp(`<meta\\s+${attribute}="${key}"\\s+content="[^"]*"\\s*/?>`);
+  return pattern.test(html) ? html.replace(pattern, tag) : html.replace('</head>', `${tag}\n</head>`);
+}
+
+function renderHead(html, seo) {
+  const url = `${SITE_URL}${seo.path}`;
+
+  html = html.replace(/<title>[^<]*<\/title>/, `<title>${escapeHtml(seo.title)}</title>`);
+  html = html.replace(
+    /<link\s+rel="canonical"\s+href="[^"]*"\s*\/?>/,
+    `<link rel="canonical" href="${url}" />`,
+  );
+
+  html = setMeta(html, 'name', 'description', seo.description);
+  html = setMeta(html, 'property', 'og:url', url);
+  html = setMeta(html, 'property', 'og:title', seo.title);
+  html = setMeta(html, 'property', 'og:description', seo.description);
+  html = setMeta(html, 'name', 'twitter:url', url);
+  html = setMeta(html, 'name', 'twitter:title', seo.title);
+  html = setMeta(html, 'name', 'twitter:description', seo.description);
+
+  if (seo.image) {
+    html = setMeta(html, 'property', 'og:image', seo.image);
+    html = setMeta(html, 'name', 'twitter:image', seo.image);
+  }
+
+  const extra = [PRERENDER_STYLES];
+  if (seo.schema) {
+    // Same data-schema-type SeoService uses, so it replaces this one on boot
+    extra.push(
+      `<script type="application/ld+json" data-schema-type="${seo.schema['@type']}">${scriptJson(seo.schema)}</script>`,
+    );
+  }
+  return html.replace('</head>', `${extra.join('\n')}\n</head>`);
+}
+
+// Minimal layout for the static markup (replaced by the app when it boots)
+const PRERENDER_STYLES = `<style>
+.prerender-catalog{max-width:1200px;margin:0 auto;padding:24px 16px}
+.prerender-grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(220px,1fr));gap:24px;list-style:none;padding:0}
+.prerender-grid img,.prerender-product img{width:100%;height:auto;aspect-ratio:1;object-fit:cover;border-radius:8px}
+.prerender-catalog a{color:inherit;text-decoration:none}
+.prerender-price{font-weight:600}
+</style>`;
+
+function renderProductCard(product, index) {
+  const image = product.primary_image;
+  // First card is the LCP element
+  const priority = index === 0 ? 'loading="eager" fetchpriority="high"' : 'loading="lazy"';
+  return `<li>
+<a href="/products/${escapeHtml(product.slug)}">
+<img src="${escapeHtml(imageUrl(image, 400))}" alt="${escapeHtml(product.name)}" width="400" height="400" ${priority} decoding="async" />
+<h2>${escapeHtml(product.name)}</h2>
+</a>
+<p class="prerender-price">${formatPrice(product.price)}</p>
+</li>`;
+}
+
+function renderListingBody(heading, listing) {
+  return `<main class="prerender-catalog">
+<h1>${escapeHtml(heading)}</h1>
+<ul class="prerender-grid">
+${listing.products.map(renderProductCard).join('\n')}
+</ul>
+</main>`;
+}
+
+function renderProductBody(product) {
+  return `<main class="prerender-catalog">
+<article class="prerender-product">
+<img src="${escapeHtml(imageUrl(primaryImageRow(product), 800))}" alt="${escapeHtml(product.name)}" width="800" height="800" fetchpriority="high" />
+<h1>${escapeHtml(product.name)}</h1>
+<p class="prerender-price">${formatPrice(product.price)}</p>
+<p>${escapeHtml(product.description)}</p>
+<a href="/products">Ver catálogo</a>
+</article>
+</main>`;
+}
+
+function renderPage(shell, page) {
+  let html = renderHead(shell, page.seo);
+  html = html.replace(/<app-root>\s*<\/app-root>/, `<app-root>${page.body}</app-root>`);
+  // Angular TransferState reads <script id="ng-state"> (APP_ID "ng")
+  const state = { catalog: page.snapshot };
+  return html.replace(
+    '</body>',
+    `<script id="ng-state" type="application/json">${scriptJson(state)}</script>\n</body>`,
+  );
+}
+
+// ============================================================================
+// Pages
+// ============================================================================
+
+function buildPages(catalog) {
+  const { products, categories } = catalog;
+  const pages = [];
+  const catalogListing = listingFor(catalog, DEFAULT_FILTERS, DEFAULT_PAGINATION);
+
+  pages.push({
+    path: '/products',
+    seo: {
+      path: '/products',
+      title: 'Lámparas de Diseño Minimalista | Catálogo Forja del Destino',
+      description:
+        'Descubre nuestra colección de lámparas de diseño minimalista impresas en 3D. Veladores, lámparas de mesa y más. Envío gratis en compras sobre $45.000.',
+    },
+    snapshot: { listing: catalogListing },
+    body: renderListingBody('Catálogo de Lámparas', catalogListing),
+  });
+
+  for (const category of categories) {
+    const listing = listingFor(
+      catalog,
+      { category: category.name, ...DEFAULT_FILTERS },
+      DEFAULT_PAGINATION,
+      category.subtree ?? new Set([category.id]),
+    );
+    // The app trusts a snapshot whose arguments match: an empty listing for a
+    // category that has products would show an empty page until the refresh
+    const hasProducts = products.some((p) => p.categories.some((c) => c.id === category.id));
+    if (hasProducts && listing.totalCount === 0) {
+      throw new Error(`Category ${category.slug} has products but its listing is empty`);
+    }
+    const path = `/products/category/${category.slug}`;
+    pages.push({
+      path,
+      seo: {
+        path,
+        title: `${category.name} | Catálogo Forja del Destino`,
+        description: `Lámparas de diseño minimalista impresas en 3D: ${category.name}.`,
+      },
+      snapshot: { listing, category: { slug: category.slug, name: category.name } },
+      body: renderListingBody(category.name, listing),
+    });
+  }
+
+  for (const product of products) {
+    const path = `/products/${product.slug}`;
+    const image = primaryImage(product);
+    pages.push({
+      path,
+      seo: {
+        path,
+        title: `${product.name} | Forja del Destino`,
+        description: product.short_description || product.description,
+        image,
+        schema: {
+          '@context': 'https://schema.org',
+          '@type': 'Product',
+          name: product.name,
+          image,
+          description: product.description,
+          brand: { '@type': 'Brand', name: 'Forja del Destino' },
+          offers: {
+            '@type': 'Offer',
+            url: `${SITE_URL}${path}`,
+            price: product.price.toString(),
+            priceCurrency: 'CLP',
+            availability:
+              product.stock_quantity > 0
+                ? 'https://schema.org/InStock'
+                : 'https://schema.org/OutOfStock',
+          },
+        },
+      },
+      // The product page shows the catalog behind the detail modal
+      snapshot: { listing: catalogListing, product },
+      body: renderProductBody(product),
+    });
+  }
+
+  return pages;
+}
+
+function hashOf(...parts) {
+  const hash = createHash('sha256');
+  for (const part of parts) hash.update(typeof part === 'string' ? part : JSON.stringify(part));
+  return hash.digest('hex').slice(0, 16);
+}
+
+function cacheFile(path) {
+  return join(CACHE_DIR, 'pages', path, 'index.html');
+}
+
+// ============================================================================
+// Main
+// ============================================================================
+
+async function main() {
+  console.log('🏗️  Prerendering catalog pages...\n');
+
+  const shell = readFileSync(shellPath, 'utf-8');
+  // The shell changes whenever the app is rebuilt (hashed bundle names)
+  const shellHash = hashOf(shell);
+
+  const previous = existsSync(MANIFEST_PATH)
+    ? JSON.parse(readFileSync(MANIFEST_PATH, 'utf-8'))
+    : { pages: {} };
+
+  const catalog = await fetchCatalog();
+  console.log(`📦 ${catalog.products.length} products, ${catalog.categories.length} categories`);
+
+  const pages = buildPages(catalog);
+  const manifest = { updatedAt: new Date().toISOString(), pages: {} };
+  let rendered = 0;
+  let reused = 0;
+
+  for (const page of pages) {
+    const hash = hashOf(shellHash, page.seo, page.snapshot, page.body);
+    const cached = previous.pages[page.path];
+    const file = cacheFile(page.path);
+
+    if (!force && cached?.hash === hash && existsSync(file)) {
+      manifest.pages[page.path] = cached;
+      reused++;
+      continue;
+    }
+
+    const generatedAt = new Date().toISOString();
+    page.snapshot = { generatedAt, ...page.snapshot };
+    mkdirSync(dirname(file), { recursive: true });
+    writeFileSync(file, renderPage(shell, page));
+    manifest.pages[page.path] = { hash, generatedAt };
+    rendered++;
+  }
+
+  // Products that are no longer available / categories removed
+  let removed = 0;
+  for (const path of Object.keys(previous.pages)) {
+    if (!manifest.pages[path]) {
+      rmSync(dirname(cacheFile(path)), { recursive: true, force: true });
+      removed++;
+    }
+  }
+
+  writeFileSync(MANIFEST_PATH, JSON.stringify(manifest, null, 2));
+  cpSync(join(CACHE_DIR, 'pages'), DIST_DIR, { recursive: true });
+
+  console.log(`✅ ${rendered} rendered, ${reused} unchanged, ${removed} removed`);
+  console.log(`📁 Copied ${pages.length} pages into ${DIST_DIR}`);
+}
+
+main().catch((error) => {
+  console.error('❌ Prerender failed:', error.message || error);
+  process.exit(1);
+});
@@ -0,0 +1,113 @@
+-- =====================================================
+-- Script 17: Crear Cola Durable de Webhooks de Flow
+-- Descripción: El webhook solo verifica la firma, encola la notificación y
+--              responde a Flow. Un worker (Azure Function con timer) procesa
+--              la cola en lotes con FOR UPDATE SKIP LOCKED y reintentos.
+-- Orden de ejecución: DECIMOSÉPTIMO
+-- =====================================================
+
+-- TABLA: flow_webhook_queue
+-- Notificaciones de Flow pendientes de procesar
+CREATE TABLE IF NOT EXISTS flow_webhook_queue (
+  id BIGSERIAL PRIMARY KEY,
+
+  -- Notificación original (ya verificada con HMAC)
+  flow_token VARCHAR(255) NOT NULL,
+  commerce_order VARCHAR(50),
+  payload JSONB NOT NULL,
+
+  -- Firma de Flow: notificaciones reenviadas traen la misma firma
+  dedupe_key VARCHAR(255) NOT NULL UNIQUE,
+
+  -- Estado del procesamiento
+  status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'done', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMPTZ,
+  last_error TEXT,
+
+  -- Timestamps
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  processed_at TIMESTAMPTZ
+);
+
+COMMENT ON TABLE flow_webhook_queue IS 'Cola durable de notificaciones de Flow.cl (procesada por flow-webhook-worker)';
+COMMENT ON COLUMN flow_webhook_queue.payload IS 'Parámetros del webhook tal como los envió Flow (incluye firma)';
+COMMENT ON COLUMN flow_webhook_queue.dedupe_key IS 'Firma HMAC de la notificación, evita encolar reintentos de Flow dos veces';
+COMMENT ON COLUMN flow_webhook_queue.status IS 'pending: por procesar, processing: tomada por un worker, done: procesada, failed: agotó reintentos';
+COMMENT ON COLUMN flow_webhook_queue.next_attempt_at IS 'No se procesa antes de esta fecha (backoff exponencial entre reintentos)';
+COMMENT ON COLUMN flow_webhook_queue.locked_at IS 'Momento en que un worker tomó el trabajo (para recuperar trabajos abandonados)';
+
+-- =====================================================
+-- ÍNDICES
+-- =====================================================
+
+-- Índice parcial para que el worker encuentre trabajos listos sin recorrer los procesados
+CREATE INDEX IF NOT EXISTS idx_flow_webhook_queue_ready
+  ON flow_webhook_queue(next_attempt_at, id)
+  WHERE status IN ('pending', 'processing');
+
+-- Índice para rastrear notificaciones de una orden
+CREATE INDEX IF NOT EXISTS idx_flow_webhook_queue_commerce_order
+  ON flow_webhook_queue(commerce_order);
+
+-- =====================================================
+-- RLS POLICIES
+-- =====================================================
+
+-- Solo el service role (Azure Functions) accede a la cola
+ALTER TABLE flow_webhook_queue ENABLE ROW LEVEL SECURITY;
+
+-- =====================================================
+-- FUNCIÓN: Tomar un lote de trabajos
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION claim_flow_webhook_jobs(
+  p_batch_size INTEGER DEFAULT 10,
+  p_lock_timeout_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF flow_webhook_queue
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE flow_webhook_queue q
+  SET
+    status = 'processing',
+    attempts = q.attempts + 1,
+    locked_at = NOW()
+  WHERE q.id IN (
+    SELECT id
+    FROM flow_webhook_queue
+    WHERE (status = 'pending' AND next_attempt_at <= NOW())
+       -- Trabajos de un worker que murió a mitad de camino
+       OR (status = 'processing' AND locked_at < NOW() - make_interval(secs => p_lock_timeout_seconds))
+    ORDER BY next_attempt_at, id
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING q.*;
+END;
+$$;
+
+COMMENT ON FUNCTION claim_flow_webhook_jobs IS 'Toma hasta p_batch_size notificaciones listas con FOR UPDATE SKIP LOCKED (workers concurrentes no se bloquean entre sí)';
+
+-- Solo el service role puede tomar trabajos
+REVOKE EXECUTE ON FUNCTION claim_flow_webhook_jobs(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'flow_webhook_queue') THEN
+    RAISE NOTICE '✓ Tabla flow_webhook_queue creada correctamente';
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'claim_flow_webhook_jobs') THEN
+    RAISE NOTICE '✓ Función claim_flow_webhook_jobs creada correctamente';
+  END IF;
+END $$;
@@ -0,0 +1,42 @@
+-- =====================================================
+-- Script 18: Habilitar Realtime en Orders
+-- Descripción: La página de retorno de pago escucha los cambios de estado de
+--              la orden (Supabase Realtime) en vez de re-verificar con Flow
+-- Orden de ejecución: DECIMOCTAVO
+-- =====================================================
+
+-- Publicar cambios de orders (Realtime respeta las políticas RLS de SELECT:
+-- cada usuario solo recibe eventos de sus propias órdenes)
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_publication_tables
+    WHERE pubname = 'supabase_realtime'
+      AND schemaname = 'public'
+      AND tablename = 'orders'
+  ) THEN
+    ALTER PUBLICATION supabase_realtime ADD TABLE orders;
+    RAISE NOTICE '✓ Tabla orders agregada a supabase_realtime';
+  END IF;
+END $$;
+
+-- =====================================================
+-- ÍNDICES
+-- =====================================================
+
+-- Búsqueda de la orden por token de Flow (página de retorno y verify-flow-payment)
+CREATE INDEX IF NOT EXISTS idx_orders_flow_token ON orders(flow_token);
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_publication_tables
+    WHERE pubname = 'supabase_realtime' AND tablename = 'orders'
+  ) THEN
+    RAISE NOTICE '✓ Realtime habilitado para orders';
+  END IF;
+END $$;
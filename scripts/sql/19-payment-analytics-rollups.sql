@@ -0,0 +1,466 @@
+-- =====================================================
+-- Script 19: Analítica de Pagos Incremental
+-- Descripción: Rollups por día y por hora (estado + método de pago)
+--              mantenidos en cada INSERT a payment_audit_log, partición
+--              mensual del log y vistas de resumen leyendo los rollups
+-- Orden de ejecución: DECIMONOVENO
+-- =====================================================
+
+-- payment_daily_summary agrupaba TODO payment_audit_log en cada consulta,
+-- así que se volvía más lenta cada día. Ahora:
+--   1. payment_audit_log se particiona por mes (processed_at)
+--   2. Un trigger por sentencia suma las filas nuevas a los rollups
+--   3. Las vistas leen los rollups (una fila por día/hora y estado/método)
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Particionar payment_audit_log por mes
+-- =====================================================
+
+-- Las vistas dependen de la tabla: se recrean al final
+DROP VIEW IF EXISTS payment_daily_summary;
+DROP VIEW IF EXISTS payment_stock_errors;
+
+ALTER TABLE payment_audit_log RENAME TO payment_audit_log_unpartitioned;
+
+-- Liberar el nombre del índice de la clave primaria para la tabla nueva
+ALTER TABLE payment_audit_log_unpartitioned
+  RENAME CONSTRAINT payment_audit_log_pkey TO payment_audit_log_unpartitioned_pkey;
+
+-- Conservar la secuencia de ids al eliminar la tabla antigua
+ALTER SEQUENCE payment_audit_log_id_seq OWNED BY NONE;
+
+CREATE TABLE payment_audit_log (
+  id BIGINT NOT NULL DEFAULT nextval('payment_audit_log_id_seq'),
+  order_id BIGINT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+
+  -- Información de Flow
+  flow_order_id VARCHAR(255),
+
+  -- Estado del pago
+  status VARCHAR(50) NOT NULL,
+
+  -- Monto del pago (para validación)
+  amount DECIMAL(12,2) NOT NULL,
+
+  -- Método de pago utilizado
+  payment_method VARCHAR(100),
+
+  -- Resultado del procesamiento de stock
+  stock_processed INTEGER DEFAULT 0,
+  stock_success BOOLEAN DEFAULT false,
+  stock_errors JSONB DEFAULT '[]',
+
+  -- Timestamps (processed_at es la clave de partición)
+  processed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  -- La clave primaria de una tabla particionada debe incluir la clave de partición
+  PRIMARY KEY (id, processed_at)
+) PARTITION BY RANGE (processed_at);
+
+ALTER SEQUENCE payment_audit_log_id_seq OWNED BY payment_audit_log.id;
+
+COMMENT ON TABLE payment_audit_log IS 'Registro de auditoría para pagos procesados desde Flow.cl (particionado por mes)';
+COMMENT ON COLUMN payment_audit_log.processed_at IS 'Fecha/hora de procesamiento del webhook (clave de partición mensual)';
+
+-- Partición por defecto: nunca se pierde un insert si falta la partición del mes
+CREATE TABLE IF NOT EXISTS payment_audit_log_default
+  PARTITION OF payment_audit_log DEFAULT;
+
+-- =====================================================
+-- FUNCIÓN: Crear particiones mensuales
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION create_payment_audit_partitions(
+  p_from DATE DEFAULT date_trunc('month', NOW())::date,
+  p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_month DATE;
+  v_next DATE;
+  v_partition TEXT;
+  v_created INTEGER := 0;
+BEGIN
+  FOR i IN 0..p_months_ahead LOOP
+    v_month := (date_trunc('month', p_from) + make_interval(months => i))::date;
+    v_next := (v_month + INTERVAL '1 month')::date;
+    v_partition := 'payment_audit_log_' || to_char(v_month, 'YYYY_MM');
+
+    IF NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = v_partition) THEN
+      IF EXISTS (
+        SELECT 1 FROM payment_audit_log_default
+        WHERE processed_at >= v_month AND processed_at < v_next
+      ) THEN
+        -- Filas del mes ya cayeron en la partición por defecto (no había
+        -- partición): CREATE ... PARTITION OF fallaría. Se mueven a una tabla
+        -- nueva que luego se adjunta. DELETE/INSERT directo en las particiones
+        -- no dispara el trigger de rollups de payment_audit_log.
+        EXECUTE format(
+          'CREATE TABLE %I (LIKE payment_audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+          v_partition
+        );
+        EXECUTE format(
+          'WITH moved AS (
+             DELETE FROM payment_audit_log_default
+             WHERE processed_at >= %L AND processed_at < %L
+             RETURNING *
+           )
+           INSERT INTO %I SELECT * FROM moved',
+          v_month,
+          v_next,
+          v_partition
+        );
+        EXECUTE format(
+          'ALTER TABLE payment_audit_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+          v_partition,
+          v_month,
+          v_next
+        );
+      ELSE
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF payment_audit_log FOR VALUES FROM (%L) TO (%L)',
+          v_partition,
+          v_month,
+          v_next
+        );
+      END IF;
+      v_created := v_created + 1;
+    END IF;
+  END LOOP;
+
+  RETURN v_created;
+END;
+$$;
+
+COMMENT ON FUNCTION create_payment_audit_partitions IS 'Crea las particiones mensuales de payment_audit_log desde p_from hasta p_months_ahead meses adelante, moviendo las filas del mes que hayan caído en la partición por defecto. Se ejecuta mensualmente con pg_cron (ver MANTENIMIENTO)';
+
+-- Crea tablas: solo el service role / pg_cron (sin esto, anon podía crear
+-- tablas sin límite vía RPC)
+REVOKE EXECUTE ON FUNCTION create_payment_audit_partitions(DATE, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- Particiones para todo el historial existente y los próximos 3 meses
+SELECT create_payment_audit_partitions(
+  COALESCE(
+    (SELECT date_trunc('month', MIN(processed_at))::date FROM payment_audit_log_unpartitioned),
+    date_trunc('month', NOW())::date
+  ),
+  COALESCE(
+    (SELECT (EXTRACT(YEAR FROM age(date_trunc('month', NOW()), date_trunc('month', MIN(processed_at)))) * 12
+           + EXTRACT(MONTH FROM age(date_trunc('month', NOW()), date_trunc('month', MIN(processed_at)))))::INTEGER
+     FROM payment_audit_log_unpartitioned),
+    0
+  ) + 3
+);
+
+-- Mover el historial
+INSERT INTO payment_audit_log (
+  id, order_id, flow_order_id, status, amount, payment_method,
+  stock_processed, stock_success, stock_errors, processed_at, created_at
+)
+SELECT
+  id, order_id, flow_order_id, status, amount, payment_method,
+  stock_processed, stock_success, stock_errors, COALESCE(processed_at, created_at, NOW()), created_at
+FROM payment_audit_log_unpartitioned;
+
+DROP TABLE payment_audit_log_unpartitioned;
+
+-- Índices (se crean en cada partición automáticamente)
+CREATE INDEX IF NOT EXISTS idx_payment_audit_order_id
+  ON payment_audit_log(order_id);
+
+CREATE INDEX IF NOT EXISTS idx_payment_audit_flow_order_id
+  ON payment_audit_log(flow_order_id);
+
+CREATE INDEX IF NOT EXISTS idx_payment_audit_processed_at
+  ON payment_audit_log(processed_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_payment_audit_stock_success
+  ON payment_audit_log(processed_at DESC)
+  WHERE stock_success = false;
+
+-- RLS (mismas políticas que script 15)
+ALTER TABLE payment_audit_log ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow insert from service role"
+  ON payment_audit_log
+  FOR INSERT
+  WITH CHECK (true);
+
+CREATE POLICY "Users can view own payment audit logs"
+  ON payment_audit_log
+  FOR SELECT
+  USING (
+    EXISTS (
+      SELECT 1 FROM orders
+      WHERE orders.id = payment_audit_log.order_id
+      AND orders.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "Only admins can update audit logs"
+  ON payment_audit_log
+  FOR UPDATE
+  USING (false);
+
+CREATE POLICY "No deletes allowed on audit logs"
+  ON payment_audit_log
+  FOR DELETE
+  USING (false);
+
+-- =====================================================
+-- PASO 2: Tablas de rollup
+-- =====================================================
+
+-- TABLA: payment_rollup_daily
+CREATE TABLE IF NOT EXISTS payment_rollup_daily (
+  day DATE NOT NULL,
+  status VARCHAR(50) NOT NULL,
+  payment_method VARCHAR(100) NOT NULL,
+  total_payments BIGINT NOT NULL DEFAULT 0,
+  total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+  stock_updates_successful BIGINT NOT NULL DEFAULT 0,
+  stock_updates_failed BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, status, payment_method)
+);
+
+COMMENT ON TABLE payment_rollup_daily IS 'Totales de payment_audit_log por día (UTC), estado y método de pago. Mantenida por trigger';
+
+-- TABLA: payment_rollup_hourly
+CREATE TABLE IF NOT EXISTS payment_rollup_hourly (
+  hour TIMESTAMPTZ NOT NULL,
+  status VARCHAR(50) NOT NULL,
+  payment_method VARCHAR(100) NOT NULL,
+  total_payments BIGINT NOT NULL DEFAULT 0,
+  total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+  stock_updates_successful BIGINT NOT NULL DEFAULT 0,
+  stock_updates_failed BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (hour, status, payment_method)
+);
+
+COMMENT ON TABLE payment_rollup_hourly IS 'Totales de payment_audit_log por hora, estado y método de pago. Mantenida por trigger';
+
+-- Solo service role / admins consultan analítica
+ALTER TABLE payment_rollup_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE payment_rollup_hourly ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Admins can view daily payment rollups"
+  ON payment_rollup_daily FOR SELECT
+  USING (auth.jwt() ->> 'role' = 'admin');
+
+CREATE POLICY "Admins can view hourly payment rollups"
+  ON payment_rollup_hourly FOR SELECT
+  USING (auth.jwt() ->> 'role' = 'admin');
+
+-- =====================================================
+-- FUNCIÓN: Sumar filas nuevas a los rollups
+-- =====================================================
+
+-- Trigger por sentencia con tabla de transición: un INSERT de N filas hace
+-- un solo upsert agregado por rollup (en vez de N upserts)
+CREATE OR REPLACE FUNCTION rollup_payment_audit_inserts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO payment_rollup_daily AS r (
+    day, status, payment_method,
+    total_payments, total_amount, stock_updates_successful, stock_updates_failed
+  )
+  SELECT
+    (processed_at AT TIME ZONE 'UTC')::date,
+    status,
+    COALESCE(payment_method, 'Desconocido'),
+    COUNT(*),
+    SUM(amount),
+    COUNT(*) FILTER (WHERE stock_success),
+    COUNT(*) FILTER (WHERE NOT stock_success)
+  FROM new_rows
+  GROUP BY 1, 2, 3
+  ON CONFLICT (day, status, payment_method) DO UPDATE SET
+    total_payments = r.total_payments + EXCLUDED.total_payments,
+    total_amount = r.total_amount + EXCLUDED.total_amount,
+    stock_updates_successful = r.stock_updates_successful + EXCLUDED.stock_updates_successful,
+    stock_updates_failed = r.stock_updates_failed + EXCLUDED.stock_updates_failed;
+
+  INSERT INTO payment_rollup_hourly AS r (
+    hour, status, payment_method,
+    total_payments, total_amount, stock_updates_successful, stock_updates_failed
+  )
+  SELECT
+    date_trunc('hour', processed_at),
+    status,
+    COALESCE(payment_method, 'Desconocido'),
+    COUNT(*),
+    SUM(amount),
+    COUNT(*) FILTER (WHERE stock_success),
+    COUNT(*) FILTER (WHERE NOT stock_success)
+  FROM new_rows
+  GROUP BY 1, 2, 3
+  ON CONFLICT (hour, status, payment_method) DO UPDATE SET
+    total_payments = r.total_payments + EXCLUDED.total_payments,
+    total_amount = r.total_amount + EXCLUDED.total_amount,
+    stock_updates_successful = r.stock_updates_successful + EXCLUDED.stock_updates_successful,
+    stock_updates_failed = r.stock_updates_failed + EXCLUDED.stock_updates_failed;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION rollup_payment_audit_inserts() IS 'Suma las filas insertadas en payment_audit_log a payment_rollup_daily y payment_rollup_hourly (el log es inmutable: solo INSERT)';
+
+DROP TRIGGER IF EXISTS trigger_rollup_payment_audit ON payment_audit_log;
+CREATE TRIGGER trigger_rollup_payment_audit
+  AFTER INSERT ON payment_audit_log
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION rollup_payment_audit_inserts();
+
+-- Backfill desde el historial (el trigger no existía cuando se movieron los datos)
+TRUNCATE payment_rollup_daily, payment_rollup_hourly;
+
+INSERT INTO payment_rollup_daily (
+  day, status, payment_method,
+  total_payments, total_amount, stock_updates_successful, stock_updates_failed
+)
+SELECT
+  (processed_at AT TIME ZONE 'UTC')::date,
+  status,
+  COALESCE(payment_method, 'Desconocido'),
+  COUNT(*),
+  SUM(amount),
+  COUNT(*) FILTER (WHERE stock_success),
+  COUNT(*) FILTER (WHERE NOT stock_success)
+FROM payment_audit_log
+GROUP BY 1, 2, 3;
+
+INSERT INTO payment_rollup_hourly (
+  hour, status, payment_method,
+  total_payments, total_amount, stock_updates_successful, stock_updates_failed
+)
+SELECT
+  date_trunc('hour', processed_at),
+  status,
+  COALESCE(payment_method, 'Desconocido'),
+  COUNT(*),
+  SUM(amount),
+  COUNT(*) FILTER (WHERE stock_success),
+  COUNT(*) FILTER (WHERE NOT stock_success)
+FROM payment_audit_log
+GROUP BY 1, 2, 3;
+
+-- =====================================================
+-- PASO 3: Vistas sobre los rollups
+-- =====================================================
+
+CREATE OR REPLACE VIEW payment_daily_summary AS
+SELECT
+  day as date,
+  SUM(total_payments) as total_payments,
+  SUM(total_amount) as total_amount,
+  COALESCE(SUM(total_payments) FILTER (WHERE status = 'paid'), 0) as successful_payments,
+  COALESCE(SUM(total_amount) FILTER (WHERE status = 'paid'), 0) as successful_amount,
+  SUM(stock_updates_successful) as stock_updates_successful,
+  SUM(stock_updates_failed) as stock_updates_failed
+FROM payment_rollup_daily
+GROUP BY day
+ORDER BY date DESC;
+
+COMMENT ON VIEW payment_daily_summary IS 'Resumen diario de pagos procesados con estadísticas de stock (lee payment_rollup_daily)';
+
+CREATE OR REPLACE VIEW payment_hourly_summary AS
+SELECT
+  hour,
+  SUM(total_payments) as total_payments,
+  SUM(total_amount) as total_amount,
+  COALESCE(SUM(total_payments) FILTER (WHERE status = 'paid'), 0) as successful_payments,
+  COALESCE(SUM(total_amount) FILTER (WHERE status = 'paid'), 0) as successful_amount,
+  SUM(stock_updates_successful) as stock_updates_successful,
+  SUM(stock_updates_failed) as stock_updates_failed
+FROM payment_rollup_hourly
+GROUP BY hour
+ORDER BY hour DESC;
+
+COMMENT ON VIEW payment_hourly_summary IS 'Resumen por hora de pagos procesados (lee payment_rollup_hourly)';
+
+-- Lista de filas individuales: no sale de un rollup, pero el índice parcial
+-- idx_payment_audit_stock_success solo contiene las filas con error
+CREATE OR REPLACE VIEW payment_stock_errors AS
+SELECT
+  pal.id,
+  pal.order_id,
+  pal.flow_order_id,
+  pal.status,
+  pal.amount,
+  pal.payment_method,
+  pal.stock_processed,
+  pal.stock_errors,
+  pal.processed_at,
+  o.user_id,
+  o.shipping_email
+FROM payment_audit_log pal
+JOIN orders o ON o.id = pal.order_id
+WHERE pal.stock_success = false
+ORDER BY pal.processed_at DESC;
+
+COMMENT ON VIEW payment_stock_errors IS 'Lista de pagos donde falló la reducción de stock (requiere atención)';
+
+COMMIT;
+
+-- =====================================================
+-- MANTENIMIENTO (obligatorio)
+-- =====================================================
+
+-- Las particiones existen hasta 3 meses adelante: hay que crear las
+-- siguientes cada mes (día 1, 03:00). Con pg_cron se programa aquí; sin
+-- pg_cron, habilitarlo (Supabase: Database → Extensions → pg_cron) y volver
+-- a ejecutar este bloque. Si igual se atrasa, las filas quedan en la
+-- partición por defecto y la función las mueve al crear el mes.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'payment-audit-partitions',
+      '0 3 1 * *',
+      'SELECT create_payment_audit_partitions()'
+    );
+    RAISE NOTICE '✓ Job pg_cron payment-audit-partitions programado';
+  ELSE
+    RAISE WARNING 'pg_cron no está habilitado: habilitarlo y volver a ejecutar este bloque, o ejecutar SELECT create_payment_audit_partitions() cada mes';
+  END IF;
+END $$;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_partitioned_table pt
+    JOIN pg_class c ON c.oid = pt.partrelid
+    WHERE c.relname = 'payment_audit_log'
+  ) THEN
+    RAISE NOTICE '✓ payment_audit_log particionada por mes';
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'payment_rollup_daily') THEN
+    RAISE NOTICE '✓ Tabla payment_rollup_daily creada correctamente';
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'payment_rollup_hourly') THEN
+    RAISE NOTICE '✓ Tabla payment_rollup_hourly creada correctamente';
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_rollup_payment_audit') THEN
+    RAISE NOTICE '✓ Trigger trigger_rollup_payment_audit creado correctamente';
+  END IF;
+END $$;
@@ -0,0 +1,244 @@
+-- =====================================================
+-- Script 20: Resumen de Items Desnormalizado en Orders
+-- Descripción: item_count e items (JSON) se guardan en orders y se mantienen
+--              con triggers sobre order_items, así orders_with_items deja de
+--              agrupar todas las órdenes en cada consulta
+-- Orden de ejecución: VIGÉSIMO
+-- =====================================================
+
+-- Antes: orders_with_items hacía LEFT JOIN + GROUP BY o.id sobre todas las
+-- órdenes, y getOrderById / getOrderByFlowId / get_user_orders filtraban
+-- encima de esa agregación. Ahora la vista es una proyección de orders y cada
+-- búsqueda usa directamente el índice correspondiente.
+-- Benchmark con 1M de órdenes: scripts/benchmarks/orders-summary-benchmark.sql
+
+BEGIN;
+
+-- =====================================================
+-- COLUMNAS
+-- =====================================================
+
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS item_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS items JSON NOT NULL DEFAULT '[]'::json;
+
+COMMENT ON COLUMN orders.item_count IS 'Cantidad de order_items (mantenida por trigger_order_items_summary_*)';
+COMMENT ON COLUMN orders.items IS 'Snapshot JSON de los order_items, ordenados por id (mantenido por trigger_order_items_summary_*)';
+
+-- =====================================================
+-- FUNCIÓN: Recalcular resumen de órdenes
+-- =====================================================
+
+-- Recalcula solo las órdenes indicadas (una orden tiene pocos items)
+CREATE OR REPLACE FUNCTION refresh_order_summaries(p_order_ids INTEGER[])
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  UPDATE orders o
+  SET
+    item_count = COALESCE(s.item_count, 0),
+    items = COALESCE(s.items, '[]'::json)
+  FROM unnest(p_order_ids) AS ids(order_id)
+  LEFT JOIN (
+    SELECT
+      oi.order_id,
+      COUNT(*) AS item_count,
+      json_agg(
+        json_build_object(
+          'id', oi.id,
+          'product_id', oi.product_id,
+          'product_name', oi.product_name,
+          'product_slug', oi.product_slug,
+          'product_image_url', oi.product_image_url,
+          'quantity', oi.quantity,
+          'unit_price', oi.unit_price,
+          'subtotal', oi.subtotal
+        ) ORDER BY oi.id
+      ) AS items
+    FROM order_items oi
+    WHERE oi.order_id = ANY(p_order_ids)
+    GROUP BY oi.order_id
+  ) s ON s.order_id = ids.order_id
+  WHERE o.id = ids.order_id;
+END;
+$$;
+
+COMMENT ON FUNCTION refresh_order_summaries IS 'Recalcula orders.item_count y orders.items para las órdenes indicadas';
+
+-- Solo la usan el trigger (corre como el dueño de la función) y el backfill:
+-- sin esto, anon podía reescribir items / item_count / updated_at de
+-- cualquier orden vía RPC
+REVOKE EXECUTE ON FUNCTION refresh_order_summaries(INTEGER[]) FROM PUBLIC, anon, authenticated;
+
+-- =====================================================
+-- TRIGGERS: order_items → orders
+-- =====================================================
+
+-- Triggers por sentencia: createOrder inserta todos los items en un solo
+-- INSERT, y cada orden afectada se recalcula una sola vez
+CREATE OR REPLACE FUNCTION sync_order_summary()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_order_ids INTEGER[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(DISTINCT order_id) INTO v_order_ids FROM new_items;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(DISTINCT order_id) INTO v_order_ids FROM old_items;
+  ELSE
+    SELECT array_agg(DISTINCT order_id) INTO v_order_ids
+    FROM (
+      SELECT order_id FROM new_items
+      UNION
+      SELECT order_id FROM old_items
+    ) changed;
+  END IF;
+
+  IF v_order_ids IS NOT NULL THEN
+    PERFORM refresh_order_summaries(v_order_ids);
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION sync_order_summary() IS 'Mantiene orders.item_count y orders.items cuando cambian order_items';
+
+-- Las tablas de transición exigen un trigger por evento
+DROP TRIGGER IF EXISTS trigger_order_items_summary_insert ON order_items;
+CREATE TRIGGER trigger_order_items_summary_insert
+  AFTER INSERT ON order_items
+  REFERENCING NEW TABLE AS new_items
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION sync_order_summary();
+
+DROP TRIGGER IF EXISTS trigger_order_items_summary_update ON order_items;
+CREATE TRIGGER trigger_order_items_summary_update
+  AFTER UPDATE ON order_items
+  REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION sync_order_summary();
+
+DROP TRIGGER IF EXISTS trigger_order_items_summary_delete ON order_items;
+CREATE TRIGGER trigger_order_items_summary_delete
+  AFTER DELETE ON order_items
+  REFERENCING OLD TABLE AS old_items
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION sync_order_summary();
+
+-- =====================================================
+-- BACKFILL
+-- =====================================================
+
+SELECT refresh_order_summaries(ARRAY(SELECT id FROM orders));
+
+-- =====================================================
+-- ÍNDICES
+-- =====================================================
+
+-- Historial del usuario: filtra por user_id y ordena por created_at DESC
+-- sin ordenar todas sus órdenes (get_user_orders)
+CREATE INDEX IF NOT EXISTS idx_orders_user_created
+  ON orders(user_id, created_at DESC);
+
+-- =====================================================
+-- VISTA: orders_with_items (sin GROUP BY)
+-- =====================================================
+
+-- Mismas columnas y tipos que el script 14: los filtros por id,
+-- flow_order_id y user_id llegan directo a los índices de orders
+CREATE OR REPLACE VIEW orders_with_items AS
+SELECT
+  o.id,
+  o.user_id,
+  o.flow_order_id,
+  o.status,
+  o.subtotal_amount,
+  o.shipping_amount,
+  o.total_amount,
+  o.shipping_name,
+  o.shipping_email,
+  o.shipping_phone,
+  o.shipping_address,
+  o.shipping_city,
+  o.shipping_region,
+  o.shipping_comuna,
+  o.payment_method,
+  o.payment_date,
+  o.created_at,
+  o.updated_at,
+  o.item_count::BIGINT as item_count,
+  o.items
+FROM orders o;
+
+COMMENT ON VIEW orders_with_items IS 'Órdenes con sus items como JSON (resumen desnormalizado en orders)';
+
+-- =====================================================
+-- FUNCIÓN: get_user_orders sobre orders
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION get_user_orders(
+  p_user_id UUID,
+  p_limit INTEGER DEFAULT 10,
+  p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  id INTEGER,
+  flow_order_id VARCHAR(50),
+  status VARCHAR(20),
+  total_amount INTEGER,
+  item_count BIGINT,
+  created_at TIMESTAMPTZ,
+  items JSON
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    o.id,
+    o.flow_order_id,
+    o.status,
+    o.total_amount,
+    o.item_count::BIGINT,
+    o.created_at,
+    o.items
+  FROM orders o
+  WHERE o.user_id = p_user_id
+  ORDER BY o.created_at DESC
+  LIMIT p_limit
+  OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_user_orders IS 'Obtiene órdenes del usuario con paginación (usa idx_orders_user_created)';
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+DECLARE
+  v_mismatches INTEGER;
+BEGIN
+  -- El resumen debe coincidir con order_items
+  SELECT COUNT(*) INTO v_mismatches
+  FROM orders o
+  WHERE o.item_count <> (SELECT COUNT(*) FROM order_items oi WHERE oi.order_id = o.id);
+
+  IF v_mismatches = 0 THEN
+    RAISE NOTICE '✓ Resumen de items sincronizado en todas las órdenes';
+  ELSE
+    RAISE WARNING '✗ % órdenes con item_count desincronizado', v_mismatches;
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_order_items_summary_insert') THEN
+    RAISE NOTICE '✓ Triggers de resumen de órdenes creados correctamente';
+  END IF;
+END $$;
@@ -0,0 +1,49 @@
+-- =====================================================
+-- Script 22: Habilitar Realtime en el Catálogo
+-- Descripción: El servidor SSR (src/server.ts) guarda el HTML de cada página
+--              del catálogo y lo descarta cuando cambian productos o categorías
+-- Orden de ejecución: VIGESIMOSEGUNDO
+-- =====================================================
+
+-- Con REPLICA IDENTITY FULL el evento UPDATE trae la fila anterior completa:
+-- si cambia el slug, el servidor también descarta la página del slug antiguo
+ALTER TABLE products REPLICA IDENTITY FULL;
+
+DO $$
+DECLARE
+  v_table TEXT;
+BEGIN
+  FOREACH v_table IN ARRAY ARRAY['products', 'categories', 'product_images', 'product_categories']
+  LOOP
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_publication_tables
+      WHERE pubname = 'supabase_realtime'
+        AND schemaname = 'public'
+        AND tablename = v_table
+    ) THEN
+      EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE %I', v_table);
+      RAISE NOTICE '✓ Tabla % agregada a supabase_realtime', v_table;
+    END IF;
+  END LOOP;
+END $$;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+DECLARE
+  v_published INTEGER;
+BEGIN
+  SELECT COUNT(*) INTO v_published
+  FROM pg_publication_tables
+  WHERE pubname = 'supabase_realtime'
+    AND schemaname = 'public'
+    AND tablename IN ('products', 'categories', 'product_images', 'product_categories');
+
+  IF v_published = 4 THEN
+    RAISE NOTICE '✓ Realtime habilitado para el catálogo';
+  ELSE
+    RAISE WARNING '✗ Solo % de 4 tablas del catálogo publicadas', v_published;
+  END IF;
+END $$;
@@ -0,0 +1,79 @@
+-- =====================================================
+-- Script 23: Variantes Optimizadas de Imágenes
+-- Descripción: Metadatos que escribe scripts/optimize-images.py (dimensiones,
+--              blurhash y variantes AVIF/WebP en Storage) y su exposición en
+--              el JSON de imágenes de products_full
+-- Orden de ejecución: VIGESIMOTERCERO
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PRODUCT_IMAGES
+-- =====================================================
+
+-- width, height y file_size_kb ya existen (script 04) pero nunca se llenaban
+ALTER TABLE product_images
+  ADD COLUMN IF NOT EXISTS blurhash TEXT,
+  ADD COLUMN IF NOT EXISTS variants JSONB,
+  ADD COLUMN IF NOT EXISTS optimized_from TEXT,
+  ADD COLUMN IF NOT EXISTS optimized_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN product_images.blurhash IS 'Placeholder blurhash (4x3 componentes) de la imagen original';
+COMMENT ON COLUMN product_images.variants IS 'Variantes en Storage: {"base": url, "widths": [..], "formats": ["avif","webp"]}, archivo = base/<ancho>.<formato>';
+COMMENT ON COLUMN product_images.optimized_from IS 'image_url procesada; si cambia, la imagen vuelve a quedar pendiente';
+
+-- =====================================================
+-- BUCKET DE STORAGE
+-- =====================================================
+
+-- Público: las variantes se sirven directo a los navegadores
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM information_schema.schemata WHERE schema_name = 'storage') THEN
+    INSERT INTO storage.buckets (id, name, public)
+    VALUES ('product-images', 'product-images', true)
+    ON CONFLICT (id) DO NOTHING;
+  END IF;
+END $$;
+
+-- =====================================================
+-- VISTA products_full
+-- =====================================================
+
+-- Se parte de la definición vigente (pg_get_viewdef) en vez de repetir la del
+-- script 11: solo se agregan claves al JSON de imágenes, las columnas de la
+-- vista no cambian y products_full_public no necesita recrearse
+DO $$
+DECLARE
+  v_definition TEXT;
+BEGIN
+  v_definition := pg_get_viewdef('products_full'::regclass);
+
+  IF v_definition LIKE '%''blurhash''%' THEN
+    RAISE NOTICE '✓ products_full ya expone los metadatos de imágenes';
+  ELSIF v_definition NOT LIKE '%''is_primary'', pi.is_primary)%' THEN
+    RAISE WARNING '✗ No se encontró el JSON de imágenes en products_full; actualizar la vista a mano';
+  ELSE
+    v_definition := replace(
+      v_definition,
+      '''is_primary'', pi.is_primary)',
+      '''is_primary'', pi.is_primary, ''width'', pi.width, ''height'', pi.height, '
+        || '''blurhash'', pi.blurhash, ''variants'', pi.variants)'
+    );
+    EXECUTE 'CREATE OR REPLACE VIEW products_full AS ' || v_definition;
+    RAISE NOTICE '✓ products_full actualizada con width, height, blurhash y variants';
+  END IF;
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- Imágenes pendientes de optimizar
+-- SELECT COUNT(*) FROM product_images WHERE optimized_from IS DISTINCT FROM image_url;
+
+-- Metadatos expuestos en la vista
+-- SELECT images FROM products_full_public LIMIT 1;
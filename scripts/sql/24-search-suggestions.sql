@@ -0,0 +1,100 @@
+-- =====================================================
+-- Script 24: Sugerencias de Búsqueda
+-- Descripción: RPC liviana para el autocompletado del catálogo (id, nombre,
+--              slug y miniatura) e índices trigram para los ILIKE de búsqueda
+-- Orden de ejecución: VIGESIMOCUARTO
+-- =====================================================
+
+-- El buscador del catálogo filtra con name/description ILIKE '%texto%'.
+-- El índice de texto completo del script 08 no sirve para ILIKE con comodín
+-- inicial; los índices trigram sí, tanto para el listado como para esta RPC.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- =====================================================
+-- ÍNDICES
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+  ON products USING gin (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_products_description_trgm
+  ON products USING gin (description gin_trgm_ops);
+
+-- =====================================================
+-- FUNCIÓN: Sugerencias para el autocompletado
+-- =====================================================
+
+-- Solo busca en el nombre: las sugerencias muestran nombres, y una coincidencia
+-- en la descripción no se entendería en la lista. Primero los nombres que
+-- empiezan con el texto, luego por similitud.
+-- SECURITY INVOKER: aplican las políticas RLS de products (solo disponibles)
+CREATE OR REPLACE FUNCTION search_product_suggestions(
+  p_query TEXT,
+  p_limit INTEGER DEFAULT 8
+)
+RETURNS TABLE (
+  id INTEGER,
+  name VARCHAR(255),
+  slug VARCHAR(255),
+  thumbnail JSONB
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public, extensions
+AS $$
+  -- Escapa los comodines de ILIKE que vengan en el texto del usuario
+  WITH q AS (
+    SELECT
+      trim(p_query) AS text,
+      replace(replace(replace(trim(p_query), '\', '\\'), '%', '\%'), '_', '\_') AS pattern
+  )
+  SELECT
+    p.id,
+    p.name,
+    p.slug,
+    (
+      -- Misma forma que los elementos de products_full.images, para que el
+      -- cliente use las mismas pipes de imágenes
+      SELECT jsonb_build_object(
+        'image_url', pi.image_url,
+        'alt_text', pi.alt_text,
+        'is_primary', pi.is_primary,
+        'width', pi.width,
+        'height', pi.height,
+        'blurhash', pi.blurhash,
+        'variants', pi.variants
+      )
+      FROM product_images pi
+      WHERE pi.product_id = p.id
+      ORDER BY pi.is_primary DESC, pi.display_order
+      LIMIT 1
+    ) AS thumbnail
+  FROM products p, q
+  WHERE p.is_available = true
+    AND q.text <> ''
+    AND p.name ILIKE '%' || q.pattern || '%'
+  ORDER BY
+    p.name ILIKE q.pattern || '%' DESC,
+    similarity(p.name, q.text) DESC,
+    p.name
+  LIMIT LEAST(GREATEST(p_limit, 1), 20);
+$$;
+
+COMMENT ON FUNCTION search_product_suggestions IS 'Autocompletado del catálogo: productos disponibles cuyo nombre contiene el texto, con su miniatura';
+
+GRANT EXECUTE ON FUNCTION search_product_suggestions(TEXT, INTEGER) TO anon, authenticated;
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- SELECT * FROM search_product_suggestions('lun');
+
+-- El listado debe usar los índices trigram:
+-- EXPLAIN SELECT id FROM products WHERE name ILIKE '%velora%' OR description ILIKE '%velora%';
@@ -0,0 +1,342 @@
+-- =====================================================
+-- Script 26: Agregados de Rating Incrementales
+-- Descripción: products.rating_sum / rating_count se actualizan con el delta
+--              de cada cambio en reviews en vez de recalcular AVG y COUNT
+--              sobre todas las reseñas del producto
+-- Orden de ejecución: VIGESIMOSEXTO
+-- =====================================================
+
+-- Antes: update_product_rating (script 10) hacía dos subconsultas sobre todas
+-- las reseñas aprobadas del producto por cada fila insertada, actualizada o
+-- borrada. Importar o moderar n reseñas de un producto costaba O(n²).
+--
+-- Ahora:
+-- - Trigger por fila: suma o resta la reseña que cambió (insert, delete,
+--   cambio de rating, aprobación / desaprobación, cambio de producto)
+-- - Moderación masiva: moderate_reviews() activa app.bulk_review_aggregates
+--   y los triggers por sentencia aplican un solo UPDATE por producto con los
+--   deltas agrupados de toda la sentencia
+-- - reconcile_product_ratings() compara los agregados con reviews por rangos
+--   de ids (scripts/reconcile-ratings.py recorre todo el catálogo en lotes)
+--
+-- average_rating y review_count se siguen escribiendo (las vistas y la app los
+-- leen), derivados de rating_sum / rating_count en el mismo UPDATE.
+
+BEGIN;
+
+-- =====================================================
+-- COLUMNAS
+-- =====================================================
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS rating_sum INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS rating_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE products DROP CONSTRAINT IF EXISTS products_rating_aggregates_check;
+ALTER TABLE products ADD CONSTRAINT products_rating_aggregates_check
+  CHECK (rating_count >= 0 AND rating_sum >= rating_count AND rating_sum <= rating_count * 5);
+
+COMMENT ON COLUMN products.rating_sum IS 'Suma de ratings de reseñas aprobadas (mantenida por trigger_reviews_rating_*)';
+COMMENT ON COLUMN products.rating_count IS 'Cantidad de reseñas aprobadas (mantenida por trigger_reviews_rating_*)';
+
+-- =====================================================
+-- FUNCIÓN: Aplicar deltas a products
+-- =====================================================
+
+-- Un UPDATE para todos los productos afectados; los deltas en cero no se
+-- escriben (cambios que no tocan reseñas aprobadas)
+CREATE OR REPLACE FUNCTION apply_product_rating_deltas(
+  p_product_ids INTEGER[],
+  p_sum_deltas INTEGER[],
+  p_count_deltas INTEGER[]
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  UPDATE products p
+  SET
+    rating_sum = p.rating_sum + d.sum_delta,
+    rating_count = p.rating_count + d.count_delta,
+    review_count = p.rating_count + d.count_delta,
+    average_rating = COALESCE(
+      ROUND((p.rating_sum + d.sum_delta)::NUMERIC / NULLIF(p.rating_count + d.count_delta, 0), 2),
+      0
+    )
+  FROM unnest(p_product_ids, p_sum_deltas, p_count_deltas) AS d(product_id, sum_delta, count_delta)
+  WHERE p.id = d.product_id
+    AND (d.sum_delta <> 0 OR d.count_delta <> 0);
+END;
+$$;
+
+COMMENT ON FUNCTION apply_product_rating_deltas IS 'Suma deltas a rating_sum / rating_count y recalcula average_rating y review_count';
+
+-- =====================================================
+-- TRIGGER POR FILA
+-- =====================================================
+
+-- SECURITY DEFINER: quien escribe la reseña no puede actualizar products (RLS)
+CREATE OR REPLACE FUNCTION apply_review_rating_delta()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_old_sum INTEGER := 0;
+  v_old_count INTEGER := 0;
+  v_new_sum INTEGER := 0;
+  v_new_count INTEGER := 0;
+BEGIN
+  -- Moderación masiva: los triggers por sentencia aplican los deltas
+  IF current_setting('app.bulk_review_aggregates', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    IF OLD.is_approved THEN
+      v_old_sum := OLD.rating;
+      v_old_count := 1;
+    END IF;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    IF NEW.is_approved THEN
+      v_new_sum := NEW.rating;
+      v_new_count := 1;
+    END IF;
+  END IF;
+
+  IF TG_OP = 'UPDATE' AND OLD.product_id = NEW.product_id THEN
+    PERFORM apply_product_rating_deltas(
+      ARRAY[NEW.product_id], ARRAY[v_new_sum - v_old_sum], ARRAY[v_new_count - v_old_count]
+    );
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM apply_product_rating_deltas(
+      ARRAY[OLD.product_id, NEW.product_id],
+      ARRAY[-v_old_sum, v_new_sum],
+      ARRAY[-v_old_count, v_new_count]
+    );
+  ELSIF TG_OP = 'INSERT' THEN
+    PERFORM apply_product_rating_deltas(ARRAY[NEW.product_id], ARRAY[v_new_sum], ARRAY[v_new_count]);
+  ELSE
+    PERFORM apply_product_rating_deltas(ARRAY[OLD.product_id], ARRAY[-v_old_sum], ARRAY[-v_old_count]);
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_review_rating_delta() IS 'Aplica a products el delta de rating de una reseña';
+
+-- =====================================================
+-- TRIGGERS POR SENTENCIA (moderación masiva)
+-- =====================================================
+
+-- Agrupa por producto todos los deltas de la sentencia: un UPDATE por
+-- producto sin importar cuántas reseñas cambiaron
+CREATE OR REPLACE FUNCTION apply_review_rating_deltas_bulk()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF current_setting('app.bulk_review_aggregates', true) IS DISTINCT FROM 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    PERFORM apply_product_rating_deltas(array_agg(product_id), array_agg(sum_delta), array_agg(count_delta))
+    FROM (
+      SELECT product_id, SUM(rating)::INTEGER AS sum_delta, COUNT(*)::INTEGER AS count_delta
+      FROM new_reviews
+      WHERE is_approved
+      GROUP BY product_id
+    ) d;
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM apply_product_rating_deltas(array_agg(product_id), array_agg(sum_delta), array_agg(count_delta))
+    FROM (
+      SELECT product_id, -SUM(rating)::INTEGER AS sum_delta, -COUNT(*)::INTEGER AS count_delta
+      FROM old_reviews
+      WHERE is_approved
+      GROUP BY product_id
+    ) d;
+  ELSE
+    PERFORM apply_product_rating_deltas(array_agg(product_id), array_agg(sum_delta), array_agg(count_delta))
+    FROM (
+      SELECT product_id, SUM(rating)::INTEGER AS sum_delta, SUM(n)::INTEGER AS count_delta
+      FROM (
+        SELECT product_id, rating, 1 AS n FROM new_reviews WHERE is_approved
+        UNION ALL
+        SELECT product_id, -rating, -1 FROM old_reviews WHERE is_approved
+      ) changes
+      GROUP BY product_id
+    ) d;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_review_rating_deltas_bulk() IS 'Aplica a products los deltas agrupados de una sentencia sobre reviews (con app.bulk_review_aggregates = on)';
+
+-- Reemplaza el recálculo completo del script 10
+DROP TRIGGER IF EXISTS update_product_rating_after_review_change ON reviews;
+DROP FUNCTION IF EXISTS update_product_rating();
+
+DROP TRIGGER IF EXISTS trigger_reviews_rating_row ON reviews;
+CREATE TRIGGER trigger_reviews_rating_row
+  AFTER INSERT OR UPDATE OF rating, is_approved, product_id OR DELETE ON reviews
+  FOR EACH ROW
+  EXECUTE FUNCTION apply_review_rating_delta();
+
+-- Las tablas de transición exigen un trigger por evento y no admiten lista
+-- de columnas: el de UPDATE corre en cualquier UPDATE, pero sin el modo masivo
+-- termina en la primera línea
+DROP TRIGGER IF EXISTS trigger_reviews_rating_bulk_insert ON reviews;
+CREATE TRIGGER trigger_reviews_rating_bulk_insert
+  AFTER INSERT ON reviews
+  REFERENCING NEW TABLE AS new_reviews
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION apply_review_rating_deltas_bulk();
+
+DROP TRIGGER IF EXISTS trigger_reviews_rating_bulk_update ON reviews;
+CREATE TRIGGER trigger_reviews_rating_bulk_update
+  AFTER UPDATE ON reviews
+  REFERENCING OLD TABLE AS old_reviews NEW TABLE AS new_reviews
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION apply_review_rating_deltas_bulk();
+
+DROP TRIGGER IF EXISTS trigger_reviews_rating_bulk_delete ON reviews;
+CREATE TRIGGER trigger_reviews_rating_bulk_delete
+  AFTER DELETE ON reviews
+  REFERENCING OLD TABLE AS old_reviews
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION apply_review_rating_deltas_bulk();
+
+-- =====================================================
+-- FUNCIÓN: Moderación masiva
+-- =====================================================
+
+-- Aprueba o rechaza varias reseñas en una sentencia con los triggers por
+-- sentencia. SECURITY INVOKER: las políticas de reviews (admin) deciden.
+-- Para importaciones, el mismo modo se activa a mano dentro de la transacción:
+--   SET LOCAL app.bulk_review_aggregates = 'on';
+CREATE OR REPLACE FUNCTION moderate_reviews(p_review_ids INTEGER[], p_approved BOOLEAN)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  PERFORM set_config('app.bulk_review_aggregates', 'on', true);
+
+  UPDATE reviews
+  SET is_approved = p_approved
+  WHERE id = ANY(p_review_ids)
+    AND is_approved IS DISTINCT FROM p_approved;
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+  PERFORM set_config('app.bulk_review_aggregates', 'off', true);
+  RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION moderate_reviews IS 'Aprueba / rechaza reseñas en lote actualizando cada producto una sola vez';
+
+-- =====================================================
+-- FUNCIÓN: Reconciliación por lotes
+-- =====================================================
+
+-- Compara rating_sum / rating_count de los productos con id en
+-- [p_from_id, p_to_id] contra las reseñas aprobadas y devuelve los que no
+-- coinciden. Con p_fix los corrige: antes bloquea el lote, así una reseña
+-- que entra mientras tanto espera y aplica su delta sobre el valor corregido.
+CREATE OR REPLACE FUNCTION reconcile_product_ratings(
+  p_from_id INTEGER,
+  p_to_id INTEGER,
+  p_fix BOOLEAN DEFAULT false
+)
+RETURNS TABLE (
+  product_id INTEGER,
+  stored_sum INTEGER,
+  stored_count INTEGER,
+  actual_sum INTEGER,
+  actual_count INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+#variable_conflict use_column
+BEGIN
+  IF p_fix THEN
+    PERFORM 1 FROM products WHERE id BETWEEN p_from_id AND p_to_id ORDER BY id FOR UPDATE;
+  END IF;
+
+  RETURN QUERY
+  WITH actual AS (
+    SELECT r.product_id, SUM(r.rating)::INTEGER AS rating_sum, COUNT(*)::INTEGER AS rating_count
+    FROM reviews r
+    WHERE r.product_id BETWEEN p_from_id AND p_to_id
+      AND r.is_approved = true
+    GROUP BY r.product_id
+  ),
+  mismatched AS (
+    SELECT
+      p.id AS product_id,
+      p.rating_sum AS stored_sum,
+      p.rating_count AS stored_count,
+      COALESCE(a.rating_sum, 0) AS actual_sum,
+      COALESCE(a.rating_count, 0) AS actual_count
+    FROM products p
+    LEFT JOIN actual a ON a.product_id = p.id
+    WHERE p.id BETWEEN p_from_id AND p_to_id
+      AND (p.rating_sum, p.rating_count, p.review_count)
+        IS DISTINCT FROM (COALESCE(a.rating_sum, 0), COALESCE(a.rating_count, 0), COALESCE(a.rating_count, 0))
+  ),
+  fixed AS (
+    UPDATE products p
+    SET
+      rating_sum = m.actual_sum,
+      rating_count = m.actual_count,
+      review_count = m.actual_count,
+      average_rating = COALESCE(ROUND(m.actual_sum::NUMERIC / NULLIF(m.actual_count, 0), 2), 0)
+    FROM mismatched m
+    WHERE p_fix AND p.id = m.product_id
+    RETURNING p.id
+  )
+  SELECT m.product_id, m.stored_sum, m.stored_count, m.actual_sum, m.actual_count
+  FROM mismatched m
+  ORDER BY m.product_id;
+END;
+$$;
+
+COMMENT ON FUNCTION reconcile_product_ratings IS 'Verifica (y con p_fix corrige) rating_sum / rating_count de un rango de productos contra reviews';
+
+-- Solo para mantenimiento (service role / postgres)
+REVOKE EXECUTE ON FUNCTION reconcile_product_ratings(INTEGER, INTEGER, BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION apply_product_rating_deltas(INTEGER[], INTEGER[], INTEGER[]) FROM PUBLIC, anon, authenticated;
+
+-- =====================================================
+-- BACKFILL
+-- =====================================================
+
+SELECT count(*) AS productos_corregidos
+FROM reconcile_product_ratings(0, (SELECT COALESCE(MAX(id), 0) FROM products), true);
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- Debe devolver 0 filas:
+-- SELECT * FROM reconcile_product_ratings(0, (SELECT MAX(id) FROM products));
+
+-- Moderación masiva (un UPDATE por producto):
+-- SELECT moderate_reviews(ARRAY(SELECT id FROM reviews WHERE NOT is_approved LIMIT 500), true);
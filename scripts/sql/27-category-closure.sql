@@ -0,0 +1,271 @@
+-- =====================================================
+-- Script 27: Tabla de Clausura de Categorías
+-- Descripción: category_closure guarda cada par ancestro / descendiente con
+--              su distancia, mantenida por triggers sobre categories.
+--              get_category_tree() entrega el árbol completo con conteos de
+--              productos y products_in_category lista una categoría con sus
+--              subcategorías en un solo join indexado
+-- Orden de ejecución: VIGESIMOSÉPTIMO
+-- =====================================================
+
+-- Antes: category_hierarchy recorría el árbol con un CTE recursivo en cada
+-- lectura, la app deducía las categorías de la página cargada y filtraba por
+-- categoría en memoria (solo la primera categoría de cada producto, sin
+-- subcategorías y con conteos por página).
+--
+-- Ahora:
+-- - category_closure: (ancestor_id, descendant_id, depth), incluida la fila
+--   (id, id, 0) de cada categoría. Insertar o mover una categoría solo toca
+--   las filas de su subárbol
+-- - get_category_tree(): todas las categorías visibles con profundidad,
+--   productos propios y productos del subárbol (ProductService la cachea)
+-- - products_in_category: products_full_public filtrable por in_category_id,
+--   con todos los productos de la categoría y sus subcategorías
+-- - category_hierarchy conserva sus columnas, ahora leídas de la clausura
+
+BEGIN;
+
+-- =====================================================
+-- TABLA
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS category_closure (
+  ancestor_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+  descendant_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+  depth INTEGER NOT NULL CHECK (depth >= 0),
+  PRIMARY KEY (ancestor_id, descendant_id)
+);
+
+-- La PK sirve "descendientes de X"; este índice sirve "ancestros de X"
+CREATE INDEX IF NOT EXISTS idx_category_closure_descendant
+  ON category_closure (descendant_id, ancestor_id);
+
+COMMENT ON TABLE category_closure IS 'Clausura transitiva de categories.parent_id (mantenida por trigger_categories_closure)';
+COMMENT ON COLUMN category_closure.depth IS 'Distancia entre ancestro y descendiente (0 = la misma categoría)';
+
+-- La estructura del árbol es pública; solo los triggers escriben
+ALTER TABLE category_closure ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "category_closure_select_public" ON category_closure;
+CREATE POLICY "category_closure_select_public" ON category_closure
+  FOR SELECT
+  USING (true);
+
+-- =====================================================
+-- FUNCIÓN: Mantener la clausura
+-- =====================================================
+
+-- SECURITY DEFINER: category_closure no tiene políticas de escritura.
+-- Los borrados se propagan por ON DELETE CASCADE (parent_id también borra
+-- las subcategorías en cascada).
+CREATE OR REPLACE FUNCTION maintain_category_closure()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT NEW.id, NEW.id, 0
+    UNION ALL
+    SELECT cc.ancestor_id, NEW.id, cc.depth + 1
+    FROM category_closure cc
+    WHERE cc.descendant_id = NEW.parent_id;
+
+    RETURN NULL;
+  END IF;
+
+  -- UPDATE de parent_id: mover el subárbol completo
+  IF NEW.parent_id IS NOT DISTINCT FROM OLD.parent_id THEN
+    RETURN NULL;
+  END IF;
+
+  IF EXISTS (
+    SELECT 1 FROM category_closure
+    WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+  ) THEN
+    RAISE EXCEPTION 'La categoría % no puede quedar dentro de su propio subárbol (padre %)',
+      NEW.id, NEW.parent_id;
+  END IF;
+
+  -- Desconectar el subárbol de sus ancestros anteriores
+  DELETE FROM category_closure cc
+  WHERE cc.descendant_id IN (
+      SELECT descendant_id FROM category_closure WHERE ancestor_id = NEW.id
+    )
+    AND cc.ancestor_id IN (
+      SELECT ancestor_id FROM category_closure
+      WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id
+    );
+
+  -- Conectarlo bajo los ancestros del nuevo padre
+  INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+  SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+  FROM category_closure above
+  CROSS JOIN category_closure below
+  WHERE above.descendant_id = NEW.parent_id
+    AND below.ancestor_id = NEW.id;
+
+  RETURN NULL;
+END;
+$$;
+
+COMMENT ON FUNCTION maintain_category_closure() IS 'Mantiene category_closure al crear categorías o cambiar su parent_id';
+
+DROP TRIGGER IF EXISTS trigger_categories_closure ON categories;
+CREATE TRIGGER trigger_categories_closure
+  AFTER INSERT OR UPDATE OF parent_id ON categories
+  FOR EACH ROW
+  EXECUTE FUNCTION maintain_category_closure();
+
+-- =====================================================
+-- BACKFILL
+-- =====================================================
+
+TRUNCATE category_closure;
+
+INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE closure AS (
+  SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+  FROM categories
+
+  UNION ALL
+
+  SELECT cl.ancestor_id, c.id, cl.depth + 1
+  FROM closure cl
+  JOIN categories c ON c.parent_id = cl.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM closure;
+
+-- =====================================================
+-- VISTA: category_hierarchy (mismas columnas, sin recursión)
+-- =====================================================
+
+CREATE OR REPLACE VIEW category_hierarchy AS
+SELECT
+  c.id,
+  c.name,
+  c.slug,
+  c.parent_id,
+  c.display_order,
+  c.is_active,
+  a.level,
+  a.path,
+  a.full_path
+FROM categories c
+CROSS JOIN LATERAL (
+  SELECT
+    COUNT(*)::INTEGER AS level,
+    array_agg(cc.ancestor_id ORDER BY cc.depth DESC) AS path,
+    string_agg(anc.name::TEXT, ' > ' ORDER BY cc.depth DESC) AS full_path
+  FROM category_closure cc
+  JOIN categories anc ON anc.id = cc.ancestor_id
+  WHERE cc.descendant_id = c.id
+) a
+ORDER BY a.path;
+
+COMMENT ON VIEW category_hierarchy IS 'Hierarchical category tree with levels and full paths (from category_closure)';
+
+-- =====================================================
+-- FUNCIÓN: Árbol de categorías con conteos
+-- =====================================================
+
+-- Categorías activas cuyos ancestros también están activos, en orden de
+-- profundidad. product_count cuenta los productos disponibles asignados
+-- directamente; total_product_count los del subárbol sin repetir (un producto
+-- en dos subcategorías cuenta una vez).
+-- SECURITY INVOKER: aplican las políticas RLS de categories y products
+CREATE OR REPLACE FUNCTION get_category_tree()
+RETURNS TABLE (
+  id INTEGER,
+  name VARCHAR(100),
+  slug VARCHAR(100),
+  parent_id INTEGER,
+  display_order INTEGER,
+  depth INTEGER,
+  product_count INTEGER,
+  total_product_count INTEGER
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  WITH counts AS (
+    SELECT
+      cc.ancestor_id AS category_id,
+      COUNT(DISTINCT pc.product_id) FILTER (WHERE cc.depth = 0) AS product_count,
+      COUNT(DISTINCT pc.product_id) AS total_product_count
+    FROM category_closure cc
+    JOIN product_categories pc ON pc.category_id = cc.descendant_id
+    JOIN products p ON p.id = pc.product_id AND p.is_available = true
+    GROUP BY cc.ancestor_id
+  )
+  SELECT
+    c.id,
+    c.name,
+    c.slug,
+    c.parent_id,
+    c.display_order,
+    d.depth,
+    COALESCE(n.product_count, 0)::INTEGER,
+    COALESCE(n.total_product_count, 0)::INTEGER
+  FROM categories c
+  CROSS JOIN LATERAL (
+    SELECT
+      MAX(cc.depth)::INTEGER AS depth,
+      bool_and(anc.id IS NOT NULL) AS visible
+    FROM category_closure cc
+    LEFT JOIN categories anc ON anc.id = cc.ancestor_id AND anc.is_active = true
+    WHERE cc.descendant_id = c.id
+  ) d
+  LEFT JOIN counts n ON n.category_id = c.id
+  WHERE c.is_active = true
+    AND d.visible
+  ORDER BY d.depth, c.display_order, c.name;
+$$;
+
+COMMENT ON FUNCTION get_category_tree IS 'Árbol de categorías visibles con profundidad y conteo de productos propios y del subárbol';
+
+GRANT EXECUTE ON FUNCTION get_category_tree() TO anon, authenticated;
+
+-- =====================================================
+-- VISTA: products_in_category
+-- =====================================================
+
+-- Filtrar por in_category_id = X recorre la PK de category_closure
+-- (ancestor_id = X) y idx_product_categories_composite (category_id,
+-- product_id): un semi-join indexado, sin duplicar productos que están en
+-- varias subcategorías. Mismas columnas que products_full_public más
+-- in_category_id, así la app usa el mismo mapeo y paginación.
+CREATE OR REPLACE VIEW products_in_category AS
+SELECT
+  c.id AS in_category_id,
+  pf.*
+FROM categories c
+JOIN products_full_public pf ON pf.id IN (
+  SELECT pc.product_id
+  FROM category_closure cc
+  JOIN product_categories pc ON pc.category_id = cc.descendant_id
+  WHERE cc.ancestor_id = c.id
+);
+
+COMMENT ON VIEW products_in_category IS 'Productos disponibles de una categoría y sus subcategorías (filtrar por in_category_id)';
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- Cada categoría tiene su fila de profundidad 0 (debe devolver 0):
+-- SELECT count(*) FROM categories c
+-- WHERE NOT EXISTS (
+--   SELECT 1 FROM category_closure WHERE ancestor_id = c.id AND descendant_id = c.id AND depth = 0
+-- );
+
+-- SELECT * FROM get_category_tree();
+
+-- Debe usar category_closure_pkey e idx_product_categories_composite:
+-- EXPLAIN SELECT id, name FROM products_in_category WHERE in_category_id = 1 ORDER BY id LIMIT 12;
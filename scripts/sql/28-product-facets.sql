@@ -0,0 +1,178 @@
+-- =====================================================
+-- Script 28: Conteos por Faceta del Catálogo
+-- Descripción: get_product_facets() devuelve, para los filtros actuales del
+--              listado, cuántos productos hay por categoría, tag, material,
+--              tramo de precio y disponibilidad, en una sola pasada con
+--              GROUPING SETS
+-- Orden de ejecución: VIGESIMOCTAVO
+-- =====================================================
+
+-- Mostrar conteos en la barra de filtros con consultas count: 'exact' habría
+-- sido una consulta por cada valor de cada faceta. Esta función recorre una
+-- vez los productos que cumplen los filtros y agrupa todas las facetas juntas.
+--
+-- Conteos disyuntivos: los valores de una faceta se cuentan con todos los
+-- filtros salvo el de esa misma faceta (las otras categorías, los otros
+-- tramos de precio y "sin stock" muestran cuántos productos habría al
+-- cambiarlo). Por eso categoría, precio y stock no se filtran en el WHERE:
+-- cada producto lleva un indicador por filtro y cada conteo usa FILTER con
+-- los indicadores que le corresponden. Búsqueda y destacados sí filtran.
+--
+-- Facetas devueltas (facet, value, label, product_count):
+--   total     ''                 ''                 productos con todos los filtros
+--   category  id de categoría    nombre             incluye subcategorías (category_closure)
+--   tag       id de tag          nombre
+--   material  id de material     nombre
+--   price     límite inferior    "desde - hasta"    tramos de p_price_step
+--   stock     in_stock / out_of_stock
+
+BEGIN;
+
+-- =====================================================
+-- FUNCIÓN: Conteos por faceta
+-- =====================================================
+
+-- Mismos filtros que ProductService.loadProducts (la búsqueda usa el mismo
+-- ILIKE sobre nombre y descripción). SECURITY INVOKER: aplican las políticas
+-- RLS de products y de sus tablas relacionadas.
+CREATE OR REPLACE FUNCTION get_product_facets(
+  p_category_id INTEGER DEFAULT NULL,
+  p_min_price INTEGER DEFAULT NULL,
+  p_max_price INTEGER DEFAULT NULL,
+  p_search TEXT DEFAULT NULL,
+  p_in_stock BOOLEAN DEFAULT false,
+  p_featured BOOLEAN DEFAULT NULL,
+  p_price_step INTEGER DEFAULT 10000
+)
+RETURNS TABLE (
+  facet TEXT,
+  value TEXT,
+  label TEXT,
+  product_count INTEGER
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  WITH base AS (
+    -- Proyección mínima del catálogo con un indicador por filtro disyuntivo
+    SELECT
+      p.id,
+      p.material_id,
+      (p.price / GREATEST(p_price_step, 1)) * GREATEST(p_price_step, 1) AS price_bucket,
+      COALESCE(p.stock_quantity, 0) > 0 AS in_stock,
+      p_category_id IS NULL OR p.id IN (
+        SELECT pc.product_id
+        FROM category_closure cc
+        JOIN product_categories pc ON pc.category_id = cc.descendant_id
+        WHERE cc.ancestor_id = p_category_id
+      ) AS category_ok,
+      (p_min_price IS NULL OR p.price >= p_min_price)
+        AND (p_max_price IS NULL OR p.price <= p_max_price) AS price_ok,
+      NOT COALESCE(p_in_stock, false) OR COALESCE(p.stock_quantity, 0) > 0 AS stock_ok
+    FROM products p
+    WHERE p.is_available = true
+      AND (p_featured IS NULL OR p.is_featured = p_featured)
+      AND (
+        COALESCE(p_search, '') = ''
+        OR p.name ILIKE '%' || p_search || '%'
+        OR p.description ILIKE '%' || p_search || '%'
+      )
+  ),
+  memberships AS (
+    -- Una fila 'product' por producto (facetas de un solo valor) más una fila
+    -- por cada categoría (con sus ancestros, sin repetir) y cada tag
+    SELECT b.*, 'product' AS kind, NULL::INTEGER AS member_id
+    FROM base b
+    UNION ALL
+    SELECT DISTINCT b.*, 'category', cc.ancestor_id
+    FROM base b
+    JOIN product_categories pc ON pc.product_id = b.id
+    JOIN category_closure cc ON cc.descendant_id = pc.category_id
+    UNION ALL
+    SELECT b.*, 'tag', pt.tag_id
+    FROM base b
+    JOIN product_tags pt ON pt.product_id = b.id
+  ),
+  grouped AS (
+    SELECT
+      kind,
+      member_id,
+      material_id,
+      price_bucket,
+      in_stock,
+      GROUPING(member_id) AS by_member,
+      GROUPING(material_id) AS by_material,
+      GROUPING(price_bucket) AS by_price,
+      GROUPING(in_stock) AS by_stock,
+      COUNT(*) FILTER (WHERE category_ok AND price_ok AND stock_ok) AS all_filters,
+      COUNT(*) FILTER (WHERE price_ok AND stock_ok) AS without_category,
+      COUNT(*) FILTER (WHERE category_ok AND stock_ok) AS without_price,
+      COUNT(*) FILTER (WHERE category_ok AND price_ok) AS without_stock
+    FROM memberships
+    GROUP BY GROUPING SETS (
+      (kind, member_id),
+      (kind, material_id),
+      (kind, price_bucket),
+      (kind, in_stock)
+    )
+  ),
+  facets AS (
+    SELECT 'total' AS facet, '' AS value, all_filters AS product_count, NULL::INTEGER AS ref
+    FROM grouped WHERE kind = 'product' AND by_member = 0
+    UNION ALL
+    SELECT 'category', member_id::TEXT, without_category, member_id
+    FROM grouped WHERE kind = 'category' AND by_member = 0
+    UNION ALL
+    SELECT 'tag', member_id::TEXT, all_filters, member_id
+    FROM grouped WHERE kind = 'tag' AND by_member = 0
+    UNION ALL
+    SELECT 'material', material_id::TEXT, all_filters, material_id
+    FROM grouped WHERE kind = 'product' AND by_material = 0 AND material_id IS NOT NULL
+    UNION ALL
+    SELECT 'price', price_bucket::TEXT, without_price, price_bucket
+    FROM grouped WHERE kind = 'product' AND by_price = 0
+    UNION ALL
+    SELECT 'stock', CASE WHEN in_stock THEN 'in_stock' ELSE 'out_of_stock' END, without_stock, NULL
+    FROM grouped WHERE kind = 'product' AND by_stock = 0
+  )
+  SELECT
+    f.facet,
+    f.value,
+    COALESCE(
+      c.name::TEXT,
+      t.name::TEXT,
+      m.name::TEXT,
+      CASE f.facet
+        WHEN 'price' THEN f.ref || ' - ' || (f.ref + GREATEST(p_price_step, 1) - 1)
+        WHEN 'stock' THEN CASE f.value WHEN 'in_stock' THEN 'En stock' ELSE 'Sin stock' END
+        ELSE ''
+      END
+    ) AS label,
+    f.product_count::INTEGER
+  FROM facets f
+  LEFT JOIN categories c ON f.facet = 'category' AND c.id = f.ref
+  LEFT JOIN tags t ON f.facet = 'tag' AND t.id = f.ref
+  LEFT JOIN materials m ON f.facet = 'material' AND m.id = f.ref
+  WHERE f.product_count > 0 OR f.facet = 'total'
+  ORDER BY f.facet, f.product_count DESC, f.value;
+$$;
+
+COMMENT ON FUNCTION get_product_facets IS 'Conteos por categoría, tag, material, tramo de precio y stock para los filtros del catálogo (una pasada con GROUPING SETS)';
+
+GRANT EXECUTE ON FUNCTION get_product_facets(INTEGER, INTEGER, INTEGER, TEXT, BOOLEAN, BOOLEAN, INTEGER)
+  TO anon, authenticated;
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- SELECT * FROM get_product_facets();
+-- SELECT * FROM get_product_facets(p_min_price => 20000, p_max_price => 50000, p_in_stock => true);
+
+-- El total debe coincidir con el count del listado para los mismos filtros:
+-- SELECT count(*) FROM products_full_public
+-- WHERE is_available AND price BETWEEN 20000 AND 50000 AND stock_quantity > 0;
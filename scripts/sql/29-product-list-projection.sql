@@ -0,0 +1,120 @@
+-- =====================================================
+-- Script 29: Proyección Liviana para el Listado
+-- Descripción: products_list trae solo lo que muestra una tarjeta del
+--              catálogo; products_full_public queda para el detalle
+-- Orden de ejecución: VIGESIMONOVENO
+-- =====================================================
+
+-- Antes el listado, la búsqueda y el carrito leían products_full_public: cada
+-- fila armaba el JSON de todas las imágenes, categorías, tags y variantes
+-- aunque la tarjeta solo usa la imagen principal, la primera categoría y las
+-- tallas. Ahora:
+-- - products_list: columnas escalares de la tarjeta, la imagen principal como
+--   un objeto JSON (mismas claves que en products_full.images), el nombre de
+--   la categoría y las tallas disponibles como TEXT[]
+-- - products_in_category: se recrea sobre products_list (el listado por
+--   categoría usa la misma proyección)
+-- - ProductDetailModal pide la fila completa de products_full_public al abrir
+--
+-- description se mantiene: la búsqueda filtra por ella (ILIKE en el servidor y
+-- el refinamiento local de ProductService) y las páginas la usan para SEO.
+
+BEGIN;
+
+-- =====================================================
+-- VISTA products_list
+-- =====================================================
+
+CREATE OR REPLACE VIEW products_list AS
+SELECT
+  p.id,
+  p.name,
+  p.slug,
+  p.description,
+  p.price,
+  p.original_price,
+  p.stock_quantity,
+  p.average_rating,
+  p.review_count,
+  p.is_available,
+  p.is_featured,
+
+  -- Imagen principal (o la primera de la galería), con sus metadatos del
+  -- script 23 para srcset y blurhash
+  (
+    SELECT jsonb_build_object(
+      'image_url', pi.image_url,
+      'alt_text', pi.alt_text,
+      'is_primary', pi.is_primary,
+      'width', pi.width,
+      'height', pi.height,
+      'blurhash', pi.blurhash,
+      'variants', pi.variants
+    )
+    FROM product_images pi
+    WHERE pi.product_id = p.id
+    ORDER BY pi.is_primary DESC, pi.display_order
+    LIMIT 1
+  ) AS primary_image,
+
+  -- Categoría que muestra la tarjeta (la principal si la hay)
+  (
+    SELECT c.name
+    FROM product_categories pc
+    JOIN categories c ON c.id = pc.category_id
+    WHERE pc.product_id = p.id
+      AND c.is_active = true
+    ORDER BY pc.is_primary DESC, c.display_order, c.id
+    LIMIT 1
+  ) AS category_name,
+
+  -- Tallas de las variantes disponibles
+  (
+    SELECT COALESCE(array_agg(pv.size ORDER BY pv.id), '{}')
+    FROM product_variants pv
+    WHERE pv.product_id = p.id
+      AND pv.is_available = true
+      AND pv.size IS NOT NULL
+  ) AS variant_sizes
+
+FROM products p
+WHERE p.is_available = true;
+
+COMMENT ON VIEW products_list IS 'Proyección del catálogo para tarjetas y listados (productos disponibles); el detalle usa products_full_public';
+
+-- =====================================================
+-- VISTA products_in_category
+-- =====================================================
+
+-- Cambian sus columnas, así que CREATE OR REPLACE no alcanza
+DROP VIEW IF EXISTS products_in_category;
+
+-- Mismo semi-join del script 27, ahora sobre la proyección del listado
+CREATE VIEW products_in_category AS
+SELECT
+  c.id AS in_category_id,
+  pl.*
+FROM categories c
+JOIN products_list pl ON pl.id IN (
+  SELECT pc.product_id
+  FROM category_closure cc
+  JOIN product_categories pc ON pc.category_id = cc.descendant_id
+  WHERE cc.ancestor_id = c.id
+);
+
+COMMENT ON VIEW products_in_category IS 'Productos disponibles de una categoría y sus subcategorías (filtrar por in_category_id), con las columnas de products_list';
+
+COMMIT;
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+-- Tamaño promedio de una fila del listado frente al detalle:
+-- SELECT
+--   (SELECT avg(pg_column_size(l.*)) FROM products_list l) AS list_bytes,
+--   (SELECT avg(pg_column_size(f.*)) FROM products_full_public f) AS full_bytes;
+
+-- Ambas vistas deben listar los mismos productos (debe devolver 0):
+-- SELECT count(*) FROM products_full_public f
+-- WHERE NOT EXISTS (SELECT 1 FROM products_list l WHERE l.id = f.id);
@@ -0,0 +1,29 @@
+import { mergeApplicationConfig, ApplicationConfig } from '@angular/core';
+import { provideServerRendering, withRoutes } from '@angular/ssr';
+import { appConfig } from './app.config';
+import { serverRoutes } from './app.routes.server';
+import { SERVER_APP_CONFIG } from './core/config.service';
+import { AppConfig } from './core/config.model';
+
+/**
+ * Server rendering configuration
+ * Supabase settings come from the environment instead of /assets/config.json
+ */
+const serverConfig: ApplicationConfig = {
+  providers: [
+    provideServerRendering(withRoutes(serverRoutes)),
+    {
+      provide: SERVER_APP_CONFIG,
+      useFactory: (): AppConfig => ({
+        production: process.env['NODE_ENV'] === 'production',
+        supabase: {
+          url: process.env['SUPABASE_URL'] ?? '',
+          anonKey: process.env['SUPABASE_KEY'] ?? '',
+        },
+        environment: (process.env['APP_ENVIRONMENT'] as AppConfig['environment']) ?? 'production',
+      }),
+    },
+  ],
+};
+
+export const config = mergeApplicationConfig(appConfig, serverConfig);
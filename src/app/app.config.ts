@@ -6,6 +6,7 @@ import {
 } from '@angular/core';
 import { provideRouter } from '@angular/router';
 import { provideAnimationsAsync } from '@angular/platform-browser/animations/async';
+import { provideClientHydration, withEventReplay } from '@angular/platform-browser';
 import { provideHttpClient, withFetch } from '@angular/common/http';
 
 import { routes } from './app.routes';
@@ -13,7 +14,8 @@ import { ConfigService } from './core/config.service';
 
 /**
  * Initialize application configuration before bootstrap
- * Loads config from /assets/config.json or /assets/config.local.json
+ * Deployed pages carry the config inline, so this normally resolves without a request
+ * (see ConfigService for the cache and fetch fallbacks)
  */
 export function initializeApp(configService: ConfigService) {
   return (): Promise<void> => {
@@ -36,6 +38,8 @@ export const appConfig: ApplicationConfig = {
     provideRouter(routes), // Use path location strategy (Azure Static Web Apps handles routing)
     provideAnimationsAsync(),
     provideHttpClient(withFetch()),
+    // Reuses server-rendered DOM (build:ssr); ignored for the static and prerendered builds
+    provideClientHydration(withEventReplay()),
     {
       provide: APP_INITIALIZER,
       useFactory: initializeApp,
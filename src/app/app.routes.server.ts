@@ -0,0 +1,13 @@
+import { RenderMode, ServerRoute } from '@angular/ssr';
+
+/**
+ * Render modes for the SSR build (ng build --configuration production,ssr)
+ * Catalog routes are rendered per request (and cached per URL by server.ts);
+ * cart, checkout, auth and payment pages depend on the browser session.
+ */
+export const serverRoutes: ServerRoute[] = [
+  { path: 'products', renderMode: RenderMode.Server },
+  { path: 'products/category/:category', renderMode: RenderMode.Server },
+  { path: 'products/:slug', renderMode: RenderMode.Server },
+  { path: '**', renderMode: RenderMode.Client },
+];
@@ -9,6 +9,17 @@ export const routes: Routes = [
     loadComponent: () =>
       import('./components/product-list/product-list').then((m) => m.ProductList),
   },
+  // Catalog pages prerendered at build time (scripts/prerender-catalog.mjs)
+  {
+    path: 'products/category/:category',
+    loadComponent: () =>
+      import('./components/product-list/product-list').then((m) => m.ProductList),
+  },
+  {
+    path: 'products/:slug',
+    loadComponent: () =>
+      import('./components/product-list/product-list').then((m) => m.ProductList),
+  },
   {
     path: 'cart',
     loadComponent: () => import('./components/cart/cart').then((m) => m.Cart),
@@ -9,6 +9,7 @@ import { MatDividerModule } from '@angular/material/divider';
 import { CartService } from './services/cart.service';
 import { SupabaseService } from './services/supabase.service';
 import { SeoService } from './services/seo.service';
+import { ServiceWorkerService } from './services/service-worker.service';
 import { Footer } from './components/footer/footer';
 
 @Component({
@@ -34,6 +35,7 @@ export class App {
   private supabase = inject(SupabaseService);
   private router = inject(Router);
   private seoService = inject(SeoService);
+  private serviceWorker = inject(ServiceWorkerService);
 
   cartItemCount = this.cartService.itemCount;
   currentUser = this.supabase.currentUser$;
@@ -44,6 +46,9 @@ export class App {
     this.seoService.updateSeo();
     this.seoService.addOrganizationSchema();
     this.seoService.addWebSiteSchema();
+
+    // Offline-first caching of the app shell, catalog and images (public/sw.js)
+    this.serviceWorker.register();
   }
 
   toggleMobileMenu(): void {
@@ -10,7 +10,7 @@ import { MatBadgeModule } from '@angular/material/badge';
 import { MatTooltipModule } from '@angular/material/tooltip';
 import { CartService } from '../../services/cart.service';
 import { SupabaseService } from '../../services/supabase.service';
-import { OptimizedImagePipe } from '../../pipes/optimized-image.pipe';
+import { ResponsiveImagePipe } from '../../pipes/responsive-image.pipe';
 import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
 
 @Component({
@@ -26,7 +26,7 @@ import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
     MatDividerModule,
     MatBadgeModule,
     MatTooltipModule,
-    OptimizedImagePipe,
+    ResponsiveImagePipe,
     ClpCurrencyPipe,
   ],
   templateUrl: './cart.html',
@@ -14,6 +14,7 @@ import { MatSelectModule } from '@angular/material/select';
 import { CartService } from '../../services/cart.service';
 import { OrderService } from '../../services/order.service';
 import { CreateOrderRequest } from '../../models/order.model';
+import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
 
 /**
  * Chilean regions for shipping form
@@ -56,6 +57,7 @@ const CHILE_REGIONS = [
     MatDividerModule,
     MatSnackBarModule,
     MatSelectModule,
+    ClpCurrencyPipe,
   ],
   templateUrl: './checkout.page.html',
   styleUrl: './checkout.page.scss',
@@ -177,17 +179,6 @@ export class CheckoutPage {
     }
   }
 
-  /**
-   * Format price for display
-   */
-  formatPrice(price: number): string {
-    return new Intl.NumberFormat('es-CL', {
-      style: 'currency',
-      currency: 'CLP',
-      minimumFractionDigits: 0,
-    }).format(price);
-  }
-
   /**
    * Get form field error message
    */
@@ -1,4 +1,11 @@
-import { Component, inject, signal, ChangeDetectionStrategy, OnInit } from '@angular/core';
+import {
+  Component,
+  inject,
+  signal,
+  ChangeDetectionStrategy,
+  DestroyRef,
+  OnInit,
+} from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { Router, ActivatedRoute } from '@angular/router';
 import { MatCardModule } from '@angular/material/card';
@@ -7,16 +14,34 @@ import { MatIconModule } from '@angular/material/icon';
 import { MatProgressSpinnerModule } from '@angular/material/progress-spinner';
 import { OrderService } from '../../services/order.service';
 import { CartService } from '../../services/cart.service';
-import { ConfigService } from '../../core/config.service';
-import { Order } from '../../models/order.model';
+import { Order, OrderStatus, isTerminalOrderStatus } from '../../models/order.model';
+import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
+
+/**
+ * Fallback poll while waiting for the webhook: 1s, 2s, 4s, 8s, 16s (~31s total)
+ */
+const POLL_BASE_DELAY_MS = 1000;
+const POLL_MAX_ATTEMPTS = 5;
 
 /**
  * PaymentCallbackPage - Handles return from Flow payment
  * Shows payment status and clears cart on success
+ *
+ * The Flow webhook usually resolves the order before (or shortly after) the
+ * user lands here, so the page reads the order and waits for its realtime
+ * status change instead of re-verifying with Flow. Only when the order stays
+ * pending after the fallback poll does it ask the verify function.
  */
 @Component({
   selector: 'app-payment-callback',
-  imports: [CommonModule, MatCardModule, MatButtonModule, MatIconModule, MatProgressSpinnerModule],
+  imports: [
+    CommonModule,
+    MatCardModule,
+    MatButtonModule,
+    MatIconModule,
+    MatProgressSpinnerModule,
+    ClpCurrencyPipe,
+  ],
   templateUrl: './payment-callback.page.html',
   styleUrl: './payment-callback.page.scss',
   changeDetection: ChangeDetectionStrategy.OnPush,
@@ -26,7 +51,7 @@ export class PaymentCallbackPage implements OnInit {
   private route = inject(ActivatedRoute);
   private orderService = inject(OrderService);
   private cartService = inject(CartService);
-  private config = inject(ConfigService);
+  private destroyRef = inject(DestroyRef);
 
   // Local state
   readonly loading = signal(true);
@@ -86,60 +111,33 @@ export class PaymentCallbackPage implements OnInit {
   }
 
   /**
-   * Check payment status from Flow
-   * Calls Flow API to verify payment and update order
+   * Check payment status of the order paid with the given Flow token
+   * Reads the order first and only falls back to Flow verification when needed
    */
   private async checkPaymentStatus(flowToken: string): Promise<void> {
     try {
-      console.log('🔍 Verifying payment with Flow token:', flowToken);
-
-      const appConfig = this.config.getConfig();
-      const serviceRoleKey = appConfig.supabase.serviceRoleKey || appConfig.supabase.anonKey;
-
-      // Call Edge Function to verify payment with Flow API
-      const response = await fetch(
-        'https://owewtzddyykyraxkkorx.supabase.co/functions/v1/verify-flow-payment',
-        {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-            apikey: serviceRoleKey,
-            Authorization: `Bearer ${serviceRoleKey}`,
-          },
-          body: JSON.stringify({ token: flowToken }),
-        },
-      );
-
-      const result = await response.json();
+      const orderRef = await this.orderService.getOrderStatusByFlowToken(flowToken);
 
-      if (!result.success) {
-        throw new Error(result.error || 'Error al verificar el pago');
+      if (!orderRef) {
+        // Order not visible to this session - let the verify function resolve it
+        await this.verifyWithFlow(flowToken);
+        return;
       }
 
-      console.log('✅ Payment verified:', result);
+      let status = orderRef.status;
 
-      // Get updated order from database
-      const order = await this.orderService.getOrderById(result.orderId);
-
-      if (!order) {
-        throw new Error('No se pudo recuperar la información de la orden');
+      if (!isTerminalOrderStatus(status)) {
+        console.log('⏳ Waiting for payment confirmation of order:', orderRef.id);
+        status = await this.waitForTerminalStatus(orderRef.id);
       }
 
-      this.order.set(order);
-
-      // Update UI based on payment status
-      if (result.status === 'paid') {
-        this.status.set('success');
-        // Clear cart on successful payment
-        await this.cartService.clearCart();
-        this.orderService.clearCurrentOrder();
-      } else if (result.status === 'failed') {
-        this.status.set('failed');
-        this.errorMessage.set('El pago fue rechazado');
-      } else {
-        this.status.set('pending');
-        this.errorMessage.set('El pago está siendo procesado');
+      if (!isTerminalOrderStatus(status)) {
+        // Webhook hasn't arrived yet - ask Flow directly as last resort
+        await this.verifyWithFlow(flowToken);
+        return;
       }
+
+      await this.showOrder(orderRef.id, status);
     } catch (error) {
       console.error('❌ Error verifying payment:', error);
       this.status.set('unknown');
@@ -152,14 +150,105 @@ export class PaymentCallbackPage implements OnInit {
   }
 
   /**
-   * Format price for display
+   * Wait until the order reaches a terminal status
+   * Listens to realtime updates of the order row, with a bounded poll
+   * (exponential backoff) in case the realtime connection misses the change
+   * @returns Last known status (may still be 'pending' if nothing changed)
    */
-  formatPrice(price: number): string {
-    return new Intl.NumberFormat('es-CL', {
-      style: 'currency',
-      currency: 'CLP',
-      minimumFractionDigits: 0,
-    }).format(price);
+  private waitForTerminalStatus(orderId: number): Promise<OrderStatus> {
+    return new Promise((resolve) => {
+      let settled = false;
+      let attempt = 0;
+      let lastStatus: OrderStatus = 'pending';
+      let pollTimer: ReturnType<typeof setTimeout> | undefined;
+      let unsubscribe: () => void = () => undefined;
+
+      const finish = (status: OrderStatus) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(pollTimer);
+        unsubscribe();
+        resolve(status);
+      };
+
+      const poll = async () => {
+        if (settled) return;
+        lastStatus = (await this.orderService.getOrderStatus(orderId)) ?? lastStatus;
+
+        if (isTerminalOrderStatus(lastStatus) || ++attempt >= POLL_MAX_ATTEMPTS) {
+          finish(lastStatus);
+          return;
+        }
+
+        pollTimer = setTimeout(poll, POLL_BASE_DELAY_MS * 2 ** attempt);
+      };
+
+      unsubscribe = this.orderService.watchOrderStatus(orderId, (status) => {
+        lastStatus = status;
+        if (isTerminalOrderStatus(status)) {
+          finish(status);
+        }
+      });
+
+      this.destroyRef.onDestroy(() => finish(lastStatus));
+      pollTimer = setTimeout(poll, POLL_BASE_DELAY_MS);
+    });
+  }
+
+  /**
+   * Verify payment with Flow through the verify-flow-payment Azure Function
+   * The function short-circuits when the order is already resolved
+   */
+  private async verifyWithFlow(flowToken: string): Promise<void> {
+    console.log('🔍 Verifying payment with Flow token:', flowToken);
+
+    // Azure Function: verifies through the shared Flow client (pooled, with deadline)
+    const response = await fetch('/api/verify-flow-payment', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ token: flowToken }),
+    });
+
+    const result = await response.json();
+
+    if (!result.success) {
+      throw new Error(result.error || 'Error al verificar el pago');
+    }
+
+    console.log('✅ Payment verified:', result);
+
+    await this.showOrder(result.orderId, result.status);
+  }
+
+  /**
+   * Load the order once and update UI based on its payment status
+   */
+  private async showOrder(orderId: number, status: OrderStatus): Promise<void> {
+    const order = await this.orderService.getOrderById(orderId);
+
+    if (!order) {
+      throw new Error('No se pudo recuperar la información de la orden');
+    }
+
+    this.order.set(order);
+
+    if (status === 'paid') {
+      this.status.set('success');
+      // Clear cart on successful payment
+      await this.cartService.clearCart();
+      this.orderService.clearCurrentOrder();
+    } else if (status === 'failed') {
+      this.status.set('failed');
+      this.errorMessage.set('El pago fue rechazado');
+    } else if (status === 'cancelled') {
+      this.status.set('failed');
+      this.errorMessage.set('El pago fue cancelado');
+    } else {
+      this.status.set('pending');
+      this.errorMessage.set('El pago está siendo procesado');
+    }
   }
 
   /**
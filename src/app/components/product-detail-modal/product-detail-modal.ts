@@ -1,4 +1,11 @@
-import { Component, inject, signal, ChangeDetectionStrategy, HostListener } from '@angular/core';
+import {
+  Component,
+  inject,
+  signal,
+  computed,
+  ChangeDetectionStrategy,
+  HostListener,
+} from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { MatDialogModule, MatDialogRef, MAT_DIALOG_DATA } from '@angular/material/dialog';
 import { MatButtonModule } from '@angular/material/button';
@@ -9,15 +16,24 @@ import { MatSnackBar, MatSnackBarModule } from '@angular/material/snack-bar';
 import { MatMenuModule } from '@angular/material/menu';
 import { Router } from '@angular/router';
 import { CartService } from '../../services/cart.service';
+import { ProductService } from '../../services/product.service';
 import { Product } from '../../models/product.model';
+import { OptimizedImagePipe } from '../../pipes/optimized-image.pipe';
+import { ResponsiveImagePipe } from '../../pipes/responsive-image.pipe';
+import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
+import { formatClp } from '../../pipes/clp-format';
 
 export interface ProductDetailData {
   product: Product;
+  /** product already carries the full detail (e.g. opened from a /products/:slug URL) */
+  detailed?: boolean;
 }
 
 /**
  * Product detail modal component
  * Shows full product information in a dialog
+ * Opens with the catalog card's data and loads the full detail
+ * (gallery, tags, material) in the background
  */
 @Component({
   selector: 'app-product-detail-modal',
@@ -31,6 +47,9 @@ export interface ProductDetailData {
     MatBadgeModule,
     MatSnackBarModule,
     MatMenuModule,
+    OptimizedImagePipe,
+    ResponsiveImagePipe,
+    ClpCurrencyPipe,
   ],
   templateUrl: './product-detail-modal.html',
   styleUrl: './product-detail-modal.scss',
@@ -38,19 +57,49 @@ export interface ProductDetailData {
 export class ProductDetailModal {
   private dialogRef = inject(MatDialogRef<ProductDetailModal>);
   private cartService = inject(CartService);
+  private productService = inject(ProductService);
   private router = inject(Router);
   private snackBar = inject(MatSnackBar);
 
   // Inject dialog data
   data = inject<ProductDetailData>(MAT_DIALOG_DATA);
 
-  product = this.data.product;
-  selectedImage = signal<string>(this.product.image);
+  product = signal<Product>(this.data.product);
+  selectedImage = signal<string>(this.data.product.image);
   currentImageIndex = signal<number>(0);
 
   // Gallery images (including primary)
-  galleryImages = this.product.images || [];
-  hasGallery = this.galleryImages.length > 1;
+  galleryImages = computed(() => this.product().images ?? []);
+  hasGallery = computed(() => this.galleryImages().length > 1);
+
+  // Selected image with its metadata (dimensions, variants) when available
+  selectedSource = computed(
+    () =>
+      this.galleryImages().find((img) => img.image_url === this.selectedImage()) ??
+      this.product().primaryImage ??
+      this.selectedImage(),
+  );
+
+  constructor() {
+    if (!this.data.detailed) {
+      void this.loadDetail();
+    }
+  }
+
+  /**
+   * Replace the card data with the full product row
+   * On failure the modal keeps showing the card data
+   */
+  private async loadDetail(): Promise<void> {
+    const detail = await this.productService.getProductBySlug(this.data.product.slug);
+    if (!detail) return;
+
+    this.product().set(detail);
+    const index = this.galleryImages().findIndex((img) => img.image_url === this.selectedImage());
+    if (index !== -1) {
+      this.currentImageIndex.set(index);
+    }
+  }
 
   // Cart state
   cartItems = this.cartService.items;
@@ -59,13 +108,13 @@ export class ProductDetailModal {
   // Check if product is in cart
   isInCart = () => {
     const items = this.cartItems();
-    return items.some((item) => item.product.id === this.product.id);
+    return items.some((item) => item.product.id === this.product().id);
   };
 
   // Get quantity in cart
   getCartQuantity(): number {
     const items = this.cartItems();
-    const cartItem = items.find((item) => item.product.id === this.product.id);
+    const cartItem = items.find((item) => item.product.id === this.product().id);
     return cartItem?.quantity ?? 0;
   }
 
@@ -76,10 +125,7 @@ export class ProductDetailModal {
   }
 
   formatPrice(price: number): string {
-    const formatted = Math.round(price)
-      .toString()
-      .replace(/\B(?=(\d{3})+(?!\d))/g, '.');
-    return `$${formatted}`;
+    return formatClp(price);
   }
 
   calculateDiscount(originalPrice: number, currentPrice: number): number {
@@ -88,29 +134,29 @@ export class ProductDetailModal {
 
   selectImage(imageUrl: string): void {
     this.selectedImage.set(imageUrl);
-    const index = this.galleryImages.findIndex((img) => img.image_url === imageUrl);
+    const index = this.galleryImages().findIndex((img) => img.image_url === imageUrl);
     if (index !== -1) {
       this.currentImageIndex.set(index);
     }
   }
 
   nextImage(): void {
-    if (!this.hasGallery) return;
-    const nextIndex = (this.currentImageIndex() + 1) % this.galleryImages.length;
+    if (!this.hasGallery()) return;
+    const nextIndex = (this.currentImageIndex() + 1) % this.galleryImages().length;
     this.currentImageIndex.set(nextIndex);
-    this.selectedImage.set(this.galleryImages[nextIndex].image_url);
+    this.selectedImage.set(this.galleryImages()[nextIndex].image_url);
   }
 
   previousImage(): void {
-    if (!this.hasGallery) return;
+    if (!this.hasGallery()) return;
     const prevIndex =
-      (this.currentImageIndex() - 1 + this.galleryImages.length) % this.galleryImages.length;
+      (this.currentImageIndex() - 1 + this.galleryImages().length) % this.galleryImages().length;
     this.currentImageIndex.set(prevIndex);
-    this.selectedImage.set(this.galleryImages[prevIndex].image_url);
+    this.selectedImage.set(this.galleryImages()[prevIndex].image_url);
   }
 
   canNavigate(): boolean {
-    return this.hasGallery;
+    return this.hasGallery();
   }
 
   // Keyboard navigation
@@ -135,7 +181,7 @@ export class ProductDetailModal {
 
   // Quantity controls
   increaseQuantity(): void {
-    const maxStock = this.product.stockQuantity ?? 99;
+    const maxStock = this.product().stockQuantity ?? 99;
     if (this.quantity() < maxStock) {
       this.quantity.update((q) => q + 1);
     }
@@ -148,7 +194,7 @@ export class ProductDetailModal {
   }
 
   canIncrease(): boolean {
-    const maxStock = this.product.stockQuantity ?? 99;
+    const maxStock = this.product().stockQuantity ?? 99;
     return this.quantity() < maxStock;
   }
 
@@ -159,14 +205,14 @@ export class ProductDetailModal {
   addToCart(): void {
     const qty = this.quantity();
     for (let i = 0; i < qty; i++) {
-      this.cartService.addToCart(this.product);
+      this.cartService.addToCart(this.product());
     }
     // Reset quantity after adding
     this.quantity.set(1);
   }
 
   goToCart(): void {
-    this.dialogRef.close();
+    this.dialogRef.close('navigated');
     this.router.navigate(['/cart']);
   }
 
@@ -176,7 +222,7 @@ export class ProductDetailModal {
   }
 
   async copyProductLink(): Promise<void> {
-    const productUrl = `${window.location.origin}/products/${this.product.id}`;
+    const productUrl = `${window.location.origin}/products/${this.product().slug}`;
 
     try {
       await navigator.clipboard.writeText(productUrl);
@@ -217,14 +263,14 @@ export class ProductDetailModal {
 
   shareOnWhatsApp(): void {
     const text = encodeURIComponent(
-      `¡Mira este producto increíble! ${this.product.name} - ${this.formatPrice(this.product.price)}`,
+      `¡Mira este producto increíble! ${this.product().name} - ${this.formatPrice(this.product().price)}`,
     );
-    const url = encodeURIComponent(`${window.location.origin}/products/${this.product.id}`);
+    const url = encodeURIComponent(`${window.location.origin}/products/${this.product().slug}`);
     window.open(`https://wa.me/?text=${text}%20${url}`, '_blank');
   }
 
   shareOnFacebook(): void {
-    const url = encodeURIComponent(`${window.location.origin}/products/${this.product.id}`);
+    const url = encodeURIComponent(`${window.location.origin}/products/${this.product().slug}`);
     window.open(
       `https://www.facebook.com/sharer/sharer.php?u=${url}`,
       '_blank',
@@ -234,9 +280,9 @@ export class ProductDetailModal {
 
   shareOnTwitter(): void {
     const text = encodeURIComponent(
-      `¡Mira este producto increíble! ${this.product.name} - ${this.formatPrice(this.product.price)}`,
+      `¡Mira este producto increíble! ${this.product().name} - ${this.formatPrice(this.product().price)}`,
     );
-    const url = encodeURIComponent(`${window.location.origin}/products/${this.product.id}`);
+    const url = encodeURIComponent(`${window.location.origin}/products/${this.product().slug}`);
     window.open(
       `https://twitter.com/intent/tweet?text=${text}&url=${url}`,
       '_blank',
@@ -4,7 +4,8 @@ import { ProductService } from '../../services/product.service';
 import { CartService } from '../../services/cart.service';
 import { signal } from '@angular/core';
 import { Product } from '../../models/product.model';
-import { provideConfigMock } from '../../testing/test-helpers';
+import { provideAnimationsAsync } from '@angular/platform-browser/animations/async';
+import { provideConfigMock, getRouterTestingModules } from '../../testing/test-helpers';
 
 xdescribe('ProductList', () => {
   let component: ProductList;
@@ -52,9 +53,20 @@ xdescribe('ProductList', () => {
 
     productServiceMock = jasmine.createSpyObj(
       'ProductService',
-      ['loadProducts', 'getProductBySlug'],
+      [
+        'loadProducts',
+        'getProductBySlug',
+        'loadCategoryTree',
+        'loadFacets',
+        'prefetchPage',
+        'prefetchProductDetail',
+      ],
       {
         products: productsSignal.asReadonly(),
+        categoryNodes: signal([]).asReadonly(),
+        facets: signal(null).asReadonly(),
+        totalCountApproximate: signal(false).asReadonly(),
+        hasNextPage: signal(false).asReadonly(),
         loading: loadingSignal.asReadonly(),
         error: errorSignal.asReadonly(),
       },
@@ -113,3 +125,90 @@ xdescribe('ProductList', () => {
     expect(buttons.length).toBeGreaterThan(0);
   });
 });
+
+describe('ProductList card prefetch', () => {
+  let fixture: ComponentFixture<ProductList>;
+  let productServiceMock: jasmine.SpyObj<ProductService>;
+
+  const product: Product = {
+    id: 1,
+    name: 'Lunora',
+    slug: 'lunora',
+    description: 'Lámpara de mesa',
+    price: 25990,
+    image: 'https://test.com/lunora.jpg',
+    category: 'Lámpara de Mesa',
+    rating: 4.5,
+    reviewCount: 10,
+    sku: 'LUN-001',
+    stockQuantity: 3,
+    isAvailable: true,
+    isFeatured: false,
+  };
+
+  beforeEach(async () => {
+    productServiceMock = jasmine.createSpyObj(
+      'ProductService',
+      [
+        'loadProducts',
+        'loadFacets',
+        'loadCategoryTree',
+        'getCategoryNameBySlug',
+        'getProductBySlug',
+        'searchSuggestions',
+        'prefetchPage',
+        'prefetchProductDetail',
+      ],
+      {
+        products: signal([product]).asReadonly(),
+        categories: signal<string[]>([]).asReadonly(),
+        categoryNodes: signal([]).asReadonly(),
+        facets: signal(null).asReadonly(),
+        loading: signal(false).asReadonly(),
+        loadingMore: signal(false).asReadonly(),
+        error: signal<string | null>(null).asReadonly(),
+        totalCount: signal(1).asReadonly(),
+        totalCountApproximate: signal(false).asReadonly(),
+        currentPage: signal(0).asReadonly(),
+        pageSize: signal(12).asReadonly(),
+        totalPages: signal(1).asReadonly(),
+        hasNextPage: signal(false).asReadonly(),
+        hasPreviousPage: signal(false).asReadonly(),
+      },
+    );
+    productServiceMock.loadProducts.and.resolveTo();
+    productServiceMock.loadFacets.and.resolveTo(null);
+    productServiceMock.loadCategoryTree.and.resolveTo([]);
+
+    const cartServiceMock = jasmine.createSpyObj('CartService', ['addToCart'], {
+      items: signal([]).asReadonly(),
+    });
+
+    await TestBed.configureTestingModule({
+      imports: [ProductList, ...getRouterTestingModules()],
+      providers: [
+        provideConfigMock(),
+        provideAnimationsAsync('noop'),
+        { provide: ProductService, useValue: productServiceMock },
+        { provide: CartService, useValue: cartServiceMock },
+      ],
+    }).compileComponents();
+
+    fixture = TestBed.createComponent(ProductList);
+    fixture.detectChanges();
+  });
+
+  it('should prefetch the detail of a hovered card first', () => {
+    const card = fixture.nativeElement.querySelector('[data-testid="product-card-1"]');
+    card.dispatchEvent(new MouseEvent('mouseenter'));
+
+    expect(productServiceMock.prefetchProductDetail).toHaveBeenCalledWith('lunora', 'high');
+  });
+
+  it('should prefetch the detail of a focused card first', () => {
+    const card = fixture.nativeElement.querySelector('[data-testid="product-card-1"]');
+    card.dispatchEvent(new FocusEvent('focusin'));
+
+    expect(productServiceMock.prefetchProductDetail).toHaveBeenCalledWith('lunora', 'high');
+  });
+});
@@ -5,8 +5,12 @@ import {
   signal,
   computed,
   OnInit,
+  PLATFORM_ID,
+  ElementRef,
+  viewChild,
+  effect,
 } from '@angular/core';
-import { CommonModule } from '@angular/common';
+import { CommonModule, isPlatformBrowser } from '@angular/common';
 import { MatCardModule } from '@angular/material/card';
 import { MatButtonModule } from '@angular/material/button';
 import { MatIconModule } from '@angular/material/icon';
@@ -18,19 +22,55 @@ import { MatInputModule } from '@angular/material/input';
 import { MatExpansionModule } from '@angular/material/expansion';
 import { MatSliderModule } from '@angular/material/slider';
 import { MatBadgeModule } from '@angular/material/badge';
-import { MatDialog, MatDialogModule } from '@angular/material/dialog';
+import { MatDialog, MatDialogModule, MatDialogRef } from '@angular/material/dialog';
+import { MatAutocompleteModule } from '@angular/material/autocomplete';
+import { ScrollingModule } from '@angular/cdk/scrolling';
 import { FormsModule } from '@angular/forms';
 import { ActivatedRoute, Router } from '@angular/router';
-import { ProductService } from '../../services/product.service';
+import { takeUntilDestroyed } from '@angular/core/rxjs-interop';
+import { Subject, combineLatest, debounceTime, map, switchMap, tap } from 'rxjs';
+import {
+  FACET_PRICE_STEP,
+  ProductFilters,
+  ProductService,
+} from '../../services/product.service';
 import { CartService } from '../../services/cart.service';
 import { SeoService } from '../../services/seo.service';
+import { ResponsiveImagePipe } from '../../pipes/responsive-image.pipe';
 import { OptimizedImagePipe } from '../../pipes/optimized-image.pipe';
-import { SrcSetPipe } from '../../pipes/srcset.pipe';
-import { Product } from '../../models/product.model';
+import { ClpCurrencyPipe } from '../../pipes/clp-currency.pipe';
+import { ViewportEnterDirective } from '../../directives/viewport-enter.directive';
+import { formatClp } from '../../pipes/clp-format';
+import { Product, ProductSuggestion } from '../../models/product.model';
 import { ProductDetailModal } from '../product-detail-modal/product-detail-modal';
 
 type SortOption = 'featured' | 'price-asc' | 'price-desc' | 'rating';
 
+type StarIcon = 'star' | 'star_half' | 'star_border';
+
+/**
+ * Values a product card shows that are derived from the product
+ * Built once per product object instead of on every change detection pass
+ */
+interface ProductCardView {
+  product: Product;
+  stars: StarIcon[];
+  price: string;
+  originalPrice: string | null;
+}
+
+// Infinite scroll layout (mirrors .product-grid in product-list.scss)
+const GRID_GAP_PX = 24; // --spacing-lg
+const GRID_GAP_MOBILE_PX = 16; // --spacing-md, up to 768px
+const GRID_MIN_CARD_WIDTH_PX = 280;
+// Card height below the square image: rating, name (2 lines), prices, variants, actions
+const CARD_CONTENT_HEIGHT_PX = 260;
+// Start loading the next page this many rows before the end
+const PREFETCH_ROWS = 2;
+// Pause in typing before the listing and suggestions follow the search box
+const SEARCH_DEBOUNCE_MS = 250;
+const INFINITE_SCROLL_KEY = 'catalog-infinite-scroll';
+
 /**
  * Product list page component
  * Displays lamp catalog with filtering, sorting, and SEO optimization
@@ -53,8 +93,12 @@ type SortOption = 'featured' | 'price-asc' | 'price-desc' | 'rating';
     MatSliderModule,
     MatBadgeModule,
     MatDialogModule,
+    MatAutocompleteModule,
+    ScrollingModule,
+    ResponsiveImagePipe,
     OptimizedImagePipe,
-    SrcSetPipe,
+    ClpCurrencyPipe,
+    ViewportEnterDirective,
   ],
   templateUrl: './product-list.html',
   styleUrl: './product-list.scss',
@@ -66,6 +110,10 @@ export class ProductList implements OnInit {
   private route = inject(ActivatedRoute);
   private router = inject(Router);
   private dialog = inject(MatDialog);
+  private isBrowser = isPlatformBrowser(inject(PLATFORM_ID));
+
+  // Product opened from the URL (/products/:slug)
+  private openedSlug: string | null = null;
 
   // State signals
   selectedCategory = signal<string>('');
@@ -73,22 +121,116 @@ export class ProductList implements OnInit {
   priceRange = signal<{ min: number; max: number }>({ min: 0, max: 50000 });
   searchQuery = signal<string>('');
   showInStockOnly = signal<boolean>(false);
+  suggestions = signal<ProductSuggestion[]>([]);
+  private searchTerms = new Subject<string>();
 
   // Data from service (using database filtering)
   products = this.productService.products;
   categories = this.productService.categories;
+
+  facets = this.productService.facets;
+
+  // Category filter entries: subcategories indented under their parent, with
+  // counts for the other active filters (or catalog totals until facets load)
+  categoryOptions = computed(() => {
+    const nodes = this.productService.categoryNodes().filter((n) => n.totalProductCount > 0);
+    if (nodes.length === 0) {
+      return this.categories().map((name) => ({ name, depth: 0, count: null as number | null }));
+    }
+    const facets = this.facets();
+    const counts = new Map(facets?.category.map((f) => [f.label, f.count]));
+    return nodes.map((n) => ({
+      name: n.name,
+      depth: n.depth,
+      count: facets ? (counts.get(n.name) ?? 0) : n.totalProductCount,
+    }));
+  });
+
+  priceBuckets = computed(() => {
+    const range = this.priceRange();
+    return (this.facets()?.price ?? []).map((bucket) => {
+      const min = Number(bucket.value);
+      const max = min + FACET_PRICE_STEP - 1;
+      return { min, max, count: bucket.count, active: range.min === min && range.max === max };
+    });
+  });
+
+  inStockCount = computed(
+    () => this.facets()?.stock.find((f) => f.value === 'in_stock')?.count ?? null,
+  );
   loading = this.productService.loading;
   error = this.productService.error;
 
   // Pagination signals from service
   totalCount = this.productService.totalCount;
+  totalCountApproximate = this.productService.totalCountApproximate;
   currentPage = this.productService.currentPage;
   pageSize = this.productService.pageSize;
   totalPages = this.productService.totalPages;
   hasNextPage = this.productService.hasNextPage;
   hasPreviousPage = this.productService.hasPreviousPage;
+  loadingMore = this.productService.loadingMore;
+
+  // Card data, reused while the product object is the same
+  private cardViews = new WeakMap<Product, ProductCardView>();
+  cards = computed(() => this.products().map((product) => this.cardView(product)));
+
+  // Infinite scroll: only the rows near the viewport are rendered
+  infiniteScroll = signal(this.isBrowser && localStorage.getItem(INFINITE_SCROLL_KEY) === 'true');
+  private gridWidth = signal(0);
+  private gridElement = viewChild<ElementRef<HTMLElement>>('gridContainer');
+
+  columns = computed(() => {
+    const width = this.gridWidth();
+    // Same breakpoints as .product-grid
+    if (!this.isBrowser || window.innerWidth <= 480) return 1;
+    if (window.innerWidth <= 768) return 2;
+    return Math.max(1, Math.floor((width + GRID_GAP_PX) / (GRID_MIN_CARD_WIDTH_PX + GRID_GAP_PX)));
+  });
+
+  rowHeight = computed(() => {
+    const columns = this.columns();
+    const gap = this.isBrowser && window.innerWidth <= 768 ? GRID_GAP_MOBILE_PX : GRID_GAP_PX;
+    const cardWidth = (this.gridWidth() - gap * (columns - 1)) / columns;
+    // Rows keep the desktop bottom padding (.virtual-row)
+    return Math.round(Math.max(cardWidth, 0) + CARD_CONTENT_HEIGHT_PX + GRID_GAP_PX);
+  });
+
+  rows = computed(() => {
+    const columns = this.columns();
+    const cards = this.cards();
+    const rows: ProductCardView[][] = [];
+    for (let i = 0; i < cards.length; i += columns) {
+      rows.push(cards.slice(i, i + columns));
+    }
+    return rows;
+  });
 
   constructor() {
+    // Type-ahead search: one listing query and one suggestion query per pause
+    // in typing; switchMap drops suggestions for text that was replaced since
+    this.searchTerms
+      .pipe(
+        map((term) => term.trim()),
+        debounceTime(SEARCH_DEBOUNCE_MS),
+        tap(() => void this.applyFilters()),
+        switchMap((term) => this.productService.searchSuggestions(term)),
+        takeUntilDestroyed(),
+      )
+      .subscribe((suggestions) => this.suggestions.set(suggestions));
+
+    // Track the grid width for the infinite scroll layout
+    effect((onCleanup) => {
+      const element = this.gridElement()?.nativeElement;
+      if (!element || !this.isBrowser) return;
+
+      const observer = new ResizeObserver(([entry]) =>
+        this.gridWidth.set(entry.contentRect.width),
+      );
+      observer.observe(element);
+      onCleanup(() => observer.disconnect());
+    });
+
     // Set SEO for products page
     this.seoService.updateSeo({
       title: 'Lámparas de Diseño Minimalista | Catálogo Forja del Destino',
@@ -98,19 +240,44 @@ export class ProductList implements OnInit {
     });
   }
 
-  async ngOnInit(): Promise<void> {
-    // Read query params and apply category filter
-    this.route.queryParams.subscribe(async (params) => {
-      const category = params['category'];
-      if (category) {
-        this.selectedCategory.set(category);
-      } else {
-        // Clear category filter when no category in query params
-        this.selectedCategory.set('');
-      }
-      // Apply filters with database query
-      await this.applyFilters();
-    });
+  ngOnInit(): void {
+    if (this.isBrowser) {
+      void this.productService.loadCategoryTree();
+    }
+
+    // Category from /products/category/:category or ?category=, product from /products/:slug
+    // (the prerendered catalog pages use the path forms)
+    // switchMap drops a slower category lookup once the URL has changed again
+    combineLatest([this.route.paramMap, this.route.queryParams])
+      .pipe(
+        switchMap(async ([paramMap, params]) => {
+          const categorySlug = paramMap.get('category');
+          const category: string | null = categorySlug
+            ? await this.productService.getCategoryNameBySlug(categorySlug)
+            : params['category'];
+          return { paramMap, categorySlug, category };
+        }),
+      )
+      .subscribe(({ paramMap, categorySlug, category }) => {
+        // Clear category filter when there is no category in the URL
+        this.selectedCategory.set(category ?? '');
+        if (categorySlug && category) {
+          this.seoService.updateSeo({
+            title: `${category} | Catálogo Forja del Destino`,
+            description: `Lámparas de diseño minimalista impresas en 3D: ${category}.`,
+            type: 'website',
+          });
+        }
+
+        const productSlug = paramMap.get('slug');
+        if (productSlug && productSlug !== this.openedSlug) {
+          this.openedSlug = productSlug;
+          this.openProductBySlug(productSlug);
+        }
+
+        // Apply filters with database query
+        void this.applyFilters();
+      });
   }
 
   /**
@@ -118,55 +285,131 @@ export class ProductList implements OnInit {
    * This replaces the old client-side computed filtering
    */
   async applyFilters(): Promise<void> {
-    const filters = {
-      category: this.selectedCategory() || undefined,
-      minPrice: this.priceRange().min,
-      maxPrice: this.priceRange().max,
-      searchQuery: this.searchQuery() || undefined,
-      inStock: this.showInStockOnly() || undefined,
-    };
-
     const pagination = {
       page: 0, // Reset to first page when filters change
       pageSize: 12,
     };
 
+    const filters = this.currentFilters();
+    void this.productService.loadFacets(filters);
     await this.productService.loadProducts(filters, pagination);
+    this.prefetchNextPage();
+  }
+
+  private currentFilters(): ProductFilters {
+    return {
+      category: this.selectedCategory() || undefined,
+      minPrice: this.priceRange().min,
+      maxPrice: this.priceRange().max,
+      searchQuery: this.searchQuery().trim() || undefined,
+      inStock: this.showInStockOnly() || undefined,
+    };
   }
 
   // Computed values (now using totalCount from database)
   productCount = computed(() => this.totalCount());
 
+  // "~N productos" when the count is a planner estimate
+  resultsLabel = computed(
+    () => `${this.totalCountApproximate() ? '~' : ''}${this.productCount()} productos`,
+  );
+
   // Cart items for checking if product is in cart
   cartItems = this.cartService.items;
 
-  getStarsArray(rating: number): number[] {
-    return Array(5)
-      .fill(0)
-      .map((_, i) => i + 1);
-  }
+  // Quantity per product id: one pass over the cart instead of one per card
+  private cartQuantities = computed(
+    () => new Map(this.cartItems().map((item) => [item.product.id, item.quantity])),
+  );
 
   /**
    * Check if a product is in the cart
    */
   isInCart(productId: number): boolean {
-    return this.cartItems().some((item) => item.product.id === productId);
+    return this.cartQuantities().has(productId);
   }
 
   /**
    * Get quantity of product in cart
    */
   getCartQuantity(productId: number): number {
-    const item = this.cartItems().find((item) => item.product.id === productId);
-    return item?.quantity ?? 0;
+    return this.cartQuantities().get(productId) ?? 0;
+  }
+
+  private cardView(product: Product): ProductCardView {
+    let view = this.cardViews.get(product);
+    if (!view) {
+      view = {
+        product,
+        stars: [1, 2, 3, 4, 5].map((star) =>
+          star <= product.rating
+            ? 'star'
+            : star - 0.5 <= product.rating
+              ? 'star_half'
+              : 'star_border',
+        ),
+        price: this.formatPrice(product.price),
+        originalPrice: product.originalPrice ? this.formatPrice(product.originalPrice) : null,
+      };
+      this.cardViews.set(product, view);
+    }
+    return view;
+  }
+
+  trackRow(index: number, row: ProductCardView[]): number {
+    return row[0]?.product.id ?? index;
+  }
+
+  /**
+   * Switch between paginated grid and infinite scroll (remembered per browser)
+   */
+  async toggleInfiniteScroll(): Promise<void> {
+    this.infiniteScroll.update((enabled) => !enabled);
+    localStorage.setItem(INFINITE_SCROLL_KEY, String(this.infiniteScroll()));
+    await this.applyFilters();
+  }
+
+  /**
+   * Prefetch the next page when the first visible row gets close to the end
+   */
+  onScrolledIndexChange(firstVisibleRow: number): void {
+    const visibleRows = Math.ceil(window.innerHeight / this.rowHeight());
+    const nearEnd = firstVisibleRow + visibleRows >= this.rows().length - PREFETCH_ROWS;
+
+    if (nearEnd && this.hasNextPage() && !this.loadingMore() && !this.loading()) {
+      void this.productService
+        .loadNextPage(this.currentFilters(), { append: true })
+        .then(() => this.prefetchNextPage());
+    }
+  }
+
+  /**
+   * Prefetch the page after the current one while the user looks at this one
+   */
+  private prefetchNextPage(): void {
+    if (!this.hasNextPage() || this.error()) return;
+
+    this.productService.prefetchPage(this.currentFilters(), {
+      page: this.currentPage() + 1,
+      pageSize: this.pageSize(),
+    });
+  }
+
+  /**
+   * Prefetch a card's detail so the modal opens with the full product
+   * Hovered or focused cards go before cards that scrolled into view
+   */
+  prefetchDetail(product: Product, priority: 'high' | 'low'): void {
+    this.productService.prefetchProductDetail(product.slug, priority);
   }
 
   /**
    * Open product detail modal
+   * @param detailed - product already has the full detail (the modal skips fetching it)
    */
-  openProductDetail(product: Product): void {
-    this.dialog.open(ProductDetailModal, {
-      data: { product },
+  openProductDetail(product: Product, detailed = false): MatDialogRef<ProductDetailModal> {
+    return this.dialog.open(ProductDetailModal, {
+      data: { product, detailed },
       width: '1000px',
       maxWidth: '95vw',
       maxHeight: '90vh',
@@ -174,6 +417,38 @@ export class ProductList implements OnInit {
     });
   }
 
+  /**
+   * Open product detail for a /products/:slug URL
+   * Closing the modal goes back to the catalog
+   * (server rendering only emits the product SEO tags; the modal opens after hydration)
+   */
+  async openProductBySlug(slug: string): Promise<void> {
+    const product = await this.productService.getProductBySlug(slug);
+    if (!product) {
+      this.router.navigate(['/products'], { replaceUrl: true });
+      return;
+    }
+
+    this.seoService.updateSeo({
+      title: product.name,
+      description: product.description,
+      image: product.image,
+      type: 'product',
+    });
+    this.seoService.addProductSchema(product);
+
+    if (!this.isBrowser) return;
+
+    this.openProductDetail(product, true)
+      .afterClosed()
+      .subscribe((result) => {
+        // 'navigated': the modal already went somewhere else (e.g. the cart)
+        if (result !== 'navigated') {
+          this.router.navigate(['/products']);
+        }
+      });
+  }
+
   addToCart(product: Product): void {
     this.cartService.addToCart(product);
   }
@@ -183,10 +458,7 @@ export class ProductList implements OnInit {
   }
 
   formatPrice(price: number): string {
-    const formatted = Math.round(price)
-      .toString()
-      .replace(/\B(?=(\d{3})+(?!\d))/g, '.');
-    return `$${formatted}`;
+    return formatClp(price);
   }
 
   async setCategory(category: string): Promise<void> {
@@ -218,10 +490,22 @@ export class ProductList implements OnInit {
     await this.applyFilters();
   }
 
-  async onSearchChange(): Promise<void> {
+  async setPriceBucket(bucket: { min: number; max: number }): Promise<void> {
+    this.priceRange.set({ min: bucket.min, max: bucket.max });
     await this.applyFilters();
   }
 
+  onSearchChange(): void {
+    this.searchTerms.next(this.searchQuery());
+  }
+
+  /**
+   * Suggestion picked: the search keeps its name and the product opens
+   */
+  openSuggestion(suggestion: ProductSuggestion): void {
+    this.router.navigate(['/products', suggestion.slug], { queryParamsHandling: 'preserve' });
+  }
+
   async toggleInStockOnly(): Promise<void> {
     this.showInStockOnly.update((value) => !value);
     await this.applyFilters();
@@ -232,6 +516,7 @@ export class ProductList implements OnInit {
     this.priceRange.set({ min: 0, max: 50000 });
     this.sortBy.set('featured');
     this.searchQuery.set('');
+    this.suggestions.set([]);
     this.showInStockOnly.set(false);
     // Clear URL query params
     this.router.navigate([], {
@@ -243,11 +528,13 @@ export class ProductList implements OnInit {
 
   // Pagination methods
   async loadNextPage(): Promise<void> {
-    await this.productService.loadNextPage();
+    await this.productService.loadNextPage(this.currentFilters());
+    this.prefetchNextPage();
   }
 
   async loadPreviousPage(): Promise<void> {
-    await this.productService.loadPreviousPage();
+    await this.productService.loadPreviousPage(this.currentFilters());
+    this.prefetchNextPage();
   }
 
   async changePageSize(size: number): Promise<void> {
@@ -1,8 +1,11 @@
 /**
  * Application configuration model
- * Loaded at runtime from /assets/config.json or /assets/config.local.json
+ * Loaded at runtime from the inline config in index.html, /assets/config.json
+ * or /assets/config.local.json
  */
 export interface AppConfig {
+  /** Content hash added by scripts/generate-config.sh, used to validate cached copies */
+  version?: string;
   production: boolean;
   supabase: {
     url: string;
@@ -0,0 +1,64 @@
+import { TestBed } from '@angular/core/testing';
+import { CONFIG_CACHE_KEY, ConfigService, INLINE_CONFIG_ID } from './config.service';
+import { AppConfig } from './config.model';
+
+describe('ConfigService', () => {
+  const deployed: AppConfig = {
+    version: 'abc123',
+    production: true,
+    supabase: { url: 'https://prod.supabase.co', anonKey: 'prod-key' },
+    environment: 'production',
+  };
+
+  let service: ConfigService;
+  let fetchSpy: jasmine.Spy;
+
+  beforeEach(() => {
+    localStorage.removeItem(CONFIG_CACHE_KEY);
+    document.getElementById(INLINE_CONFIG_ID)?.remove();
+    fetchSpy = spyOn(window, 'fetch');
+
+    TestBed.configureTestingModule({ providers: [ConfigService] });
+    service = TestBed.inject(ConfigService);
+  });
+
+  afterEach(() => {
+    localStorage.removeItem(CONFIG_CACHE_KEY);
+    document.getElementById(INLINE_CONFIG_ID)?.remove();
+  });
+
+  it('should use the inline config without fetching and cache it', async () => {
+    const script = document.createElement('script');
+    script.id = INLINE_CONFIG_ID;
+    script.type = 'application/json';
+    script.textContent = JSON.stringify(deployed);
+    document.head.appendChild(script);
+
+    const config = await service.loadConfig();
+
+    expect(config.supabase.url).toBe('https://prod.supabase.co');
+    expect(fetchSpy).not.toHaveBeenCalled();
+    expect(JSON.parse(localStorage.getItem(CONFIG_CACHE_KEY)!).version).toBe('abc123');
+  });
+
+  it('should start from the cache and refresh it in the background', async () => {
+    localStorage.setItem(CONFIG_CACHE_KEY, JSON.stringify({ ...deployed, version: 'old' }));
+    fetchSpy.and.resolveTo(new Response(JSON.stringify(deployed)));
+
+    const config = await service.loadConfig();
+
+    expect(config.version).toBe('old');
+    await new Promise((resolve) => setTimeout(resolve));
+    expect(JSON.parse(localStorage.getItem(CONFIG_CACHE_KEY)!).version).toBe('abc123');
+  });
+
+  it('should fall back to the hardcoded config when nothing is available', async () => {
+    fetchSpy.and.resolveTo(new Response('', { status: 404 }));
+
+    const config = await service.loadConfig();
+
+    expect(config.environment).toBe('local');
+    expect(service.isLoaded$()).toBe(true);
+    expect(localStorage.getItem(CONFIG_CACHE_KEY)).toBeNull();
+  });
+});
@@ -1,20 +1,37 @@
-import { Injectable, signal } from '@angular/core';
+import { Injectable, InjectionToken, inject, isDevMode, signal } from '@angular/core';
+import { DOCUMENT } from '@angular/common';
 import { AppConfig } from './config.model';
 
+/**
+ * Configuration provided by the SSR server (app.config.server.ts)
+ * Relative fetches to /assets don't resolve in Node, so the server reads env vars instead
+ */
+export const SERVER_APP_CONFIG = new InjectionToken<AppConfig>('SERVER_APP_CONFIG');
+
+/** localStorage entry with the last configuration seen by this browser */
+export const CONFIG_CACHE_KEY = 'app-config';
+
+/** <script type="application/json"> written into the HTML by scripts/generate-config.sh */
+export const INLINE_CONFIG_ID = 'app-config';
+
 /**
  * ConfigService - Runtime configuration loader
  *
- * Loads configuration from:
- * 1. /assets/config.local.json (local development, gitignored)
- * 2. /assets/config.json (CI/CD with injected values)
- * 3. Fallback to hardcoded values (last resort)
+ * Resolves configuration from, in order:
+ * 1. Inline <script id="app-config"> in index.html (deployed builds, no request)
+ * 2. localStorage cache from a previous visit (revalidated in the background)
+ * 3. A single fetch: /assets/config.local.json in dev mode, /assets/config.json otherwise
+ * 4. Fallback to hardcoded values (last resort)
  *
- * Must be loaded before app bootstrap via APP_INITIALIZER
+ * Must be loaded before app bootstrap via APP_INITIALIZER; with 1 or 2 it
+ * resolves without touching the network.
  */
 @Injectable({
   providedIn: 'root',
 })
 export class ConfigService {
+  private serverConfig = inject(SERVER_APP_CONFIG, { optional: true });
+  private document = inject(DOCUMENT);
   private config = signal<AppConfig | null>(null);
   private loaded = signal<boolean>(false);
 
@@ -26,38 +43,34 @@ export class ConfigService {
       return this.config()!;
     }
 
-    // Priority 1: Try config.local.json (local development)
-    try {
-      const response = await fetch('/assets/config.local.json');
-
-      if (response.ok) {
-        const config = (await response.json()) as AppConfig;
-        console.log('✅ Loaded config.local.json (local development)');
-        this.config.set(config);
-        this.loaded.set(true);
-        return config;
-      }
-    } catch (error) {
-      // config.local.json doesn't exist, continue to config.json
+    if (this.serverConfig) {
+      return this.use(this.serverConfig);
     }
 
-    // Priority 2: Try config.json (production/staging)
-    try {
-      const response = await fetch('/assets/config.json');
+    // Priority 1: Inline config (generated at deploy time)
+    const inline = this.readInlineConfig();
+    if (inline) {
+      this.writeCache(inline);
+      return this.use(inline);
+    }
 
-      if (!response.ok) {
-        throw new Error(`Failed to load config.json: ${response.statusText}`);
-      }
+    // Priority 2: Cached config, checked against the server without waiting for it
+    const cached = this.readCache();
+    if (cached) {
+      console.log(`✅ Using cached config (${cached.environment})`);
+      void this.revalidateCache(cached);
+      return this.use(cached);
+    }
 
-      const config = (await response.json()) as AppConfig;
-      console.log(`✅ Loaded config.json (${config.environment})`);
-      this.config.set(config);
-      this.loaded.set(true);
-      return config;
+    // Priority 3: Fetch
+    try {
+      const config = await this.fetchConfig();
+      this.writeCache(config);
+      return this.use(config);
     } catch (error) {
       console.error('❌ Error loading configuration:', error);
 
-      // Priority 3: Fallback to hardcoded config (last resort)
+      // Priority 4: Fallback to hardcoded config (last resort, never cached)
       const fallbackConfig: AppConfig = {
         production: false,
         supabase: {
@@ -71,9 +84,7 @@ export class ConfigService {
       };
 
       console.warn('⚠️ Using fallback hardcoded configuration');
-      this.config.set(fallbackConfig);
-      this.loaded.set(true);
-      return fallbackConfig;
+      return this.use(fallbackConfig);
     }
   }
 
@@ -94,4 +105,89 @@ export class ConfigService {
   getEnvironment(): string {
     return this.getConfig().environment;
   }
+
+  private use(config: AppConfig): AppConfig {
+    this.config.set(config);
+    this.loaded.set(true);
+    return config;
+  }
+
+  private readInlineConfig(): AppConfig | null {
+    const script = this.document.getElementById(INLINE_CONFIG_ID);
+    if (!script?.textContent) return null;
+
+    try {
+      const config = JSON.parse(script.textContent) as AppConfig;
+      console.log(`✅ Loaded inline config (${config.environment})`);
+      return config;
+    } catch (error) {
+      console.warn('⚠️ Invalid inline config, ignoring it:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Dev mode prefers the gitignored config.local.json; builds only request config.json
+   */
+  private async fetchConfig(): Promise<AppConfig> {
+    if (isDevMode()) {
+      const response = await fetch('/assets/config.local.json').catch(() => null);
+      if (response?.ok) {
+        console.log('✅ Loaded config.local.json (local development)');
+        return (await response.json()) as AppConfig;
+      }
+    }
+
+    const response = await fetch('/assets/config.json', { cache: 'no-cache' });
+    if (!response.ok) {
+      throw new Error(`Failed to load config.json: ${response.statusText}`);
+    }
+
+    const config = (await response.json()) as AppConfig;
+    console.log(`✅ Loaded config.json (${config.environment})`);
+    return config;
+  }
+
+  /**
+   * Refresh the cache for the next visit when the deployed config changed
+   * (the running app keeps the config it booted with)
+   */
+  private async revalidateCache(cached: AppConfig): Promise<void> {
+    try {
+      const fresh = await this.fetchConfig();
+      if (this.versionOf(fresh) !== this.versionOf(cached)) {
+        console.log('🔄 Configuration changed, cache updated for the next load');
+        this.writeCache(fresh);
+      }
+    } catch {
+      // Offline or config unavailable: keep the cached copy
+    }
+  }
+
+  /**
+   * Deployed configs carry a content hash (generate-config.sh); local ones compare by content
+   */
+  private versionOf(config: AppConfig): string {
+    return config.version ?? JSON.stringify(config);
+  }
+
+  private readCache(): AppConfig | null {
+    try {
+      const raw = localStorage.getItem(CONFIG_CACHE_KEY);
+      return raw ? (JSON.parse(raw) as AppConfig) : null;
+    } catch {
+      return null;
+    }
+  }
+
+  private writeCache(config: AppConfig): void {
+    try {
+      const cached = this.readCache();
+      if (!cached || this.versionOf(cached) !== this.versionOf(config)) {
+        localStorage.setItem(CONFIG_CACHE_KEY, JSON.stringify(config));
+      }
+    } catch {
+      // Storage disabled (private mode, quota): every load fetches
+    }
+  }
 }
@@ -0,0 +1,38 @@
+import { Directive, ElementRef, OnDestroy, OnInit, inject, output } from '@angular/core';
+
+// Fire a little before the element scrolls into view
+const VIEWPORT_MARGIN = '200px';
+
+/**
+ * Emits once when the element comes within VIEWPORT_MARGIN of the viewport
+ * Does nothing where IntersectionObserver is missing (server rendering)
+ */
+@Directive({
+  selector: '[appViewportEnter]',
+  standalone: true,
+})
+export class ViewportEnterDirective implements OnInit, OnDestroy {
+  private element = inject<ElementRef<HTMLElement>>(ElementRef);
+  private observer?: IntersectionObserver;
+
+  appViewportEnter = output<void>();
+
+  ngOnInit(): void {
+    if (typeof IntersectionObserver === 'undefined') return;
+
+    this.observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          this.observer?.disconnect();
+          this.appViewportEnter.emit();
+        }
+      },
+      { rootMargin: VIEWPORT_MARGIN },
+    );
+    this.observer.observe(this.element.nativeElement);
+  }
+
+  ngOnDestroy(): void {
+    this.observer?.disconnect();
+  }
+}
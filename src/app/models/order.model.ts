@@ -3,6 +3,23 @@
  */
 export type OrderStatus = 'pending' | 'paid' | 'failed' | 'cancelled' | 'refunded';
 
+/**
+ * Statuses an order never leaves once the payment has been resolved
+ */
+export const TERMINAL_ORDER_STATUSES: readonly OrderStatus[] = [
+  'paid',
+  'failed',
+  'cancelled',
+  'refunded',
+];
+
+/**
+ * Check whether the payment of an order has been resolved
+ */
+export function isTerminalOrderStatus(status: OrderStatus): boolean {
+  return TERMINAL_ORDER_STATUSES.includes(status);
+}
+
 /**
  * Payment methods supported by Flow.cl
  */
@@ -10,6 +10,7 @@ export interface Product {
   price: number;
   originalPrice?: number;
   image: string;
+  primaryImage?: ProductImage; // Image behind `image`, with dimensions and variants when optimized
   images?: ProductImage[]; // Gallery images from database
   category: string;
   tags?: string[]; // Style tags (e.g., "geométrico", "minimalista")
@@ -31,10 +32,86 @@ export interface ProductImage {
   image_url: string;
   alt_text: string | null;
   is_primary: boolean;
+  // Filled by scripts/optimize-images.py
+  width?: number | null;
+  height?: number | null;
+  blurhash?: string | null;
+  variants?: ImageVariants | null;
 }
 
 /**
- * Database response from products_full_public view
+ * Self-hosted AVIF/WebP variants of an image (scripts/optimize-images.py)
+ * File for a width and format: `${base}/${width}.${format}`
+ */
+export interface ImageVariants {
+  base: string;
+  widths: number[];
+  formats: Array<'avif' | 'webp'>;
+}
+
+/**
+ * Search autocomplete entry (search_product_suggestions RPC)
+ */
+export interface ProductSuggestion {
+  id: number;
+  name: string;
+  slug: string;
+  thumbnail: ProductImage | null;
+}
+
+/**
+ * Category with its place in the tree and available product counts
+ * (get_category_tree RPC)
+ */
+export interface CategoryNode {
+  id: number;
+  name: string;
+  slug: string;
+  parentId: number | null;
+  depth: number;
+  /** Products assigned to this category */
+  productCount: number;
+  /** Distinct products in this category and its subcategories */
+  totalProductCount: number;
+  children: CategoryNode[];
+}
+
+/**
+ * Database response from get_category_tree RPC
+ */
+export interface CategoryFromDB {
+  id: number;
+  name: string;
+  slug: string;
+  parent_id: number | null;
+  display_order: number | null;
+  depth: number;
+  product_count: number;
+  total_product_count: number;
+}
+
+/**
+ * Database response from products_list view (catalog cards and listings)
+ */
+export interface ProductListFromDB {
+  id: number;
+  name: string;
+  slug: string;
+  description: string;
+  price: number;
+  original_price: number | null;
+  stock_quantity: number;
+  average_rating: number;
+  review_count: number;
+  is_available: boolean;
+  is_featured: boolean;
+  primary_image: ProductImage | null;
+  category_name: string | null;
+  variant_sizes: string[];
+}
+
+/**
+ * Database response from products_full_public view (product detail)
  */
 export interface ProductFromDB {
   id: number;
@@ -53,11 +130,7 @@ export interface ProductFromDB {
   is_featured: boolean;
   material_name: string | null;
   material_code: string | null;
-  images: Array<{
-    image_url: string;
-    alt_text: string | null;
-    is_primary: boolean;
-  }>;
+  images: ProductImage[];
   categories: Array<{
     category_id: number;
     name: string;
@@ -79,3 +152,36 @@ export interface ProductFromDB {
   created_at: string;
   updated_at: string;
 }
+
+/**
+ * One value of a catalog facet with its product count
+ */
+export interface FacetValue {
+  /** Category / tag / material id, price bucket lower bound, or in_stock / out_of_stock */
+  value: string;
+  label: string;
+  count: number;
+}
+
+/**
+ * Product counts per filter value for a filter set (get_product_facets RPC)
+ * Each facet is counted with every filter except its own
+ */
+export interface ProductFacets {
+  total: number;
+  category: FacetValue[];
+  tag: FacetValue[];
+  material: FacetValue[];
+  price: FacetValue[];
+  stock: FacetValue[];
+}
+
+/**
+ * Database response from get_product_facets RPC
+ */
+export interface FacetRowFromDB {
+  facet: 'total' | 'category' | 'tag' | 'material' | 'price' | 'stock';
+  value: string;
+  label: string;
+  product_count: number;
+}
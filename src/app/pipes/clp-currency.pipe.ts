@@ -1,24 +1,18 @@
 import { Pipe, PipeTransform } from '@angular/core';
+import { formatClp } from './clp-format';
 
 /**
  * Custom pipe for Chilean Peso currency formatting
  * Formats: 24000 → $24.000
+ * Pure: only re-runs when the value changes
  */
 @Pipe({
   name: 'clpCurrency',
   standalone: true,
+  pure: true,
 })
 export class ClpCurrencyPipe implements PipeTransform {
-  transform(value: number): string {
-    if (value === null || value === undefined || isNaN(value)) {
-      return '';
-    }
-
-    // Format with thousands separator (.) and no decimals
-    const formatted = Math.round(value)
-      .toString()
-      .replace(/\B(?=(\d{3})+(?!\d))/g, '.');
-
-    return `$${formatted}`;
+  transform(value: number | null | undefined): string {
+    return formatClp(value);
   }
 }
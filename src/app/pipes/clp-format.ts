@@ -0,0 +1,39 @@
+/**
+ * Chilean Peso formatting shared by ClpCurrencyPipe and components
+ * Formats: 24000 → $24.000 (rounded, no decimals)
+ *
+ * One Intl.NumberFormat for the whole app (building one is far more expensive
+ * than formatting) and a bounded LRU of formatted strings: a catalog shows a
+ * few hundred distinct prices, so repeated renders return the cached string
+ * without allocating. Benchmark: scripts/benchmarks/clp-format-benchmark.mjs
+ */
+const CLP_NUMBER = new Intl.NumberFormat('es-CL', { maximumFractionDigits: 0 });
+
+export const CLP_CACHE_SIZE = 500;
+
+// Two-generation LRU: hits in `recent` are a single Map lookup; values only in
+// `previous` are promoted. When `recent` fills up it becomes `previous` and the
+// old generation is dropped, so at most 2 × CLP_CACHE_SIZE strings are retained
+// and everything used since the last rotation survives it.
+let recent = new Map<number, string>();
+let previous = new Map<number, string>();
+
+export function formatClp(value: number | null | undefined): string {
+  if (value === null || value === undefined || isNaN(value)) {
+    return '';
+  }
+
+  const rounded = Math.round(value);
+  let result = recent.get(rounded);
+  if (result !== undefined) {
+    return result;
+  }
+
+  result = previous.get(rounded) ?? `$${CLP_NUMBER.format(rounded)}`;
+  if (recent.size >= CLP_CACHE_SIZE) {
+    previous = recent;
+    recent = new Map();
+  }
+  recent.set(rounded, result);
+  return result;
+}
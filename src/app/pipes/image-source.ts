@@ -0,0 +1,106 @@
+import { ProductImage } from '../models/product.model';
+
+/**
+ * Image input accepted by the image pipes: a plain URL, or a product_images
+ * row that may carry dimensions and self-hosted variants
+ */
+export type ImageSource = string | ProductImage | null | undefined;
+
+/** srcset widths for CDN-resized images (same as scripts/optimize-images.py) */
+export const IMAGE_WIDTHS = [200, 400, 600, 800, 1200];
+
+/** sizes attribute per layout slot */
+export const IMAGE_SIZES = {
+  card: '(max-width: 480px) 200px, (max-width: 768px) 400px, 600px',
+  thumb: '100px',
+  detail: '(max-width: 768px) 95vw, 600px',
+} as const;
+
+export type ImageSlot = keyof typeof IMAGE_SIZES;
+
+export function imageUrl(source: ImageSource): string {
+  return (typeof source === 'string' ? source : source?.image_url) ?? '';
+}
+
+export function isUnsplash(url: string): boolean {
+  return url.includes('unsplash.com');
+}
+
+/**
+ * URL for one width: self-hosted variant (smallest one covering the width),
+ * Unsplash resize params, or the original URL
+ */
+export function imageUrlForWidth(
+  source: ImageSource,
+  width: number,
+  format: 'avif' | 'webp' = 'webp',
+): string {
+  const url = imageUrl(source);
+  const variants = typeof source === 'object' ? source?.variants : null;
+
+  if (variants?.formats.includes(format) && variants.widths.length > 0) {
+    const fit = variants.widths.find((w) => w >= width) ?? variants.widths.at(-1);
+    return `${variants.base}/${fit}.${format}`;
+  }
+
+  if (isUnsplash(url)) {
+    const separator = url.includes('?') ? '&' : '?';
+    return `${url}${separator}w=${width}&q=80&fm=${format}`;
+  }
+
+  return url;
+}
+
+/**
+ * srcset for every width available in the given format
+ * Empty when the image can only be served at its original size
+ */
+export function imageSrcSet(source: ImageSource, format: 'avif' | 'webp' = 'webp'): string {
+  const url = imageUrl(source);
+  const variants = typeof source === 'object' ? source?.variants : null;
+
+  if (variants?.formats.includes(format)) {
+    return variants.widths.map((w) => `${variants.base}/${w}.${format} ${w}w`).join(', ');
+  }
+
+  if (isUnsplash(url)) {
+    const baseUrl = url.split('?')[0];
+    return IMAGE_WIDTHS.map((w) => `${baseUrl}?w=${w}&q=80&fm=${format} ${w}w`).join(', ');
+  }
+
+  return '';
+}
+
+/**
+ * Intrinsic width/height for a rendered width, keeping the original aspect
+ * ratio when known (square otherwise, like the catalog cards)
+ */
+export function imageDimensions(
+  source: ImageSource,
+  width: number,
+): { width: number; height: number } {
+  const meta = typeof source === 'object' ? source : null;
+  if (meta?.width && meta?.height) {
+    return { width, height: Math.round((width * meta.height) / meta.width) };
+  }
+  return { width, height: width };
+}
+
+const BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~';
+
+/**
+ * Average color of a blurhash (its DC component, characters 2-5) as CSS
+ * Used as the placeholder background: no canvas decoding needed
+ */
+export function blurhashColor(hash: string | null | undefined): string | null {
+  if (!hash || hash.length < 6) return null;
+
+  let value = 0;
+  for (const char of hash.slice(2, 6)) {
+    const digit = BASE83.indexOf(char);
+    if (digit < 0) return null;
+    value = value * 83 + digit;
+  }
+
+  return `rgb(${value >> 16}, ${(value >> 8) & 255}, ${value & 255})`;
+}
@@ -0,0 +1,55 @@
+import { Pipe, PipeTransform } from '@angular/core';
+import {
+  IMAGE_SIZES,
+  ImageSlot,
+  ImageSource,
+  blurhashColor,
+  imageDimensions,
+  imageSrcSet,
+  imageUrlForWidth,
+} from './image-source';
+
+/**
+ * Everything an <img> (or <picture>) needs for one layout slot
+ */
+export interface ResponsiveImage {
+  src: string;
+  srcset: string;
+  avifSrcset: string;
+  sizes: string;
+  width: number;
+  height: number;
+  placeholder: string | null;
+}
+
+/** Rendered width of each slot, used for src and intrinsic dimensions */
+const SLOT_WIDTHS: Record<ImageSlot, number> = {
+  card: 400,
+  thumb: 100,
+  detail: 800,
+};
+
+/**
+ * Pipe to resolve src, srcset (WebP and AVIF), sizes and intrinsic
+ * dimensions for any image source
+ * Dimensions reserve the layout box before the image loads (no CLS)
+ */
+@Pipe({
+  name: 'responsiveImage',
+  standalone: true,
+})
+export class ResponsiveImagePipe implements PipeTransform {
+  transform(source: ImageSource, slot: ImageSlot = 'card'): ResponsiveImage {
+    const width = SLOT_WIDTHS[slot];
+    const meta = typeof source === 'object' ? source : null;
+
+    return {
+      src: imageUrlForWidth(source, width),
+      srcset: imageSrcSet(source, 'webp'),
+      avifSrcset: imageSrcSet(source, 'avif'),
+      sizes: IMAGE_SIZES[slot],
+      ...imageDimensions(source, width),
+      placeholder: blurhashColor(meta?.blurhash),
+    };
+  }
+}
@@ -96,6 +96,39 @@ describe('CartService', () => {
     expect(service).toBeTruthy();
   });
 
+  it('should query the cart on creation when the session was restored', () => {
+    supabaseMock.getCurrentUser.and.returnValue({ id: 'user-123', email: 'ana@example.com' });
+    supabaseMock.isAuthenticated.and.returnValue(true);
+
+    TestBed.runInInjectionContext(() => new CartService());
+
+    expect(supabaseMock.client.from).toHaveBeenCalledWith('cart_items');
+  });
+
+  it('should query the cart again after a failed load', async () => {
+    const user = { id: 'user-123', email: 'ana@example.com' };
+    supabaseMock.getCurrentUser.and.returnValue(user);
+    supabaseMock.isAuthenticated.and.returnValue(true);
+    spyOn(console, 'error');
+
+    const failing: any = {};
+    for (const method of ['select', 'eq', 'order']) {
+      failing[method] = () => failing;
+    }
+    failing.then = (onFulfilled: any) =>
+      Promise.resolve({ data: null, error: new Error('offline') }).then(onFulfilled);
+    const from = supabaseMock.client.from as jasmine.Spy;
+    from.and.returnValue(failing);
+
+    currentUserSubject.next(user);
+    await new Promise((resolve) => setTimeout(resolve));
+    from.calls.reset();
+
+    currentUserSubject.next(user);
+
+    expect(from).toHaveBeenCalledWith('cart_items');
+  });
+
   describe('Signal State', () => {
     it('should initialize with empty cart', () => {
       expect(service.items()).toEqual([]);
@@ -23,6 +23,9 @@ export class CartService {
   private cartItems = signal<CartItem[]>([]);
   private isLoading = signal<boolean>(false);
 
+  // User whose cart is loaded (auth events repeat for the same user)
+  private loadedForUser: string | null = null;
+
   // Computed signals para estado derivado
   items = this.cartItems.asReadonly();
   loading = this.isLoading.asReadonly();
@@ -34,11 +37,20 @@ export class CartService {
   );
 
   constructor() {
+    // Session is restored synchronously: start the cart query now, in parallel
+    // with the catalog, instead of waiting for currentUser$ to emit
+    if (this.supabase.getCurrentUser()) {
+      this.loadCartFromDb();
+    }
+
     // Subscribe to auth changes and load cart
     this.supabase.currentUser$.subscribe((user) => {
       if (user) {
-        this.loadCartFromDb();
+        if (user.id !== this.loadedForUser) {
+          this.loadCartFromDb();
+        }
       } else {
+        this.loadedForUser = null;
         this.cartItems.set([]);
       }
     });
@@ -54,6 +66,7 @@ export class CartService {
         this.cartItems.set([]);
         return;
       }
+      this.loadedForUser = user.id;
 
       const { data, error } = await this.supabase.client
         .from('cart_items')
@@ -64,9 +77,20 @@ export class CartService {
       if (error) throw error;
 
       if (data) {
-        const cartItems: CartItem[] = (data as DbCartItem[])
+        const dbItems = data as DbCartItem[];
+
+        // Products outside the loaded catalog page are fetched by id
+        const missingIds = dbItems
+          .map((dbItem) => dbItem.product_id)
+          .filter((id) => !this.productService.getProductById(id));
+        const fetched =
+          missingIds.length > 0 ? await this.productService.getProductsByIds(missingIds) : [];
+
+        const cartItems: CartItem[] = dbItems
           .map((dbItem) => {
-            const product = this.productService.getProductById(dbItem.product_id);
+            const product =
+              this.productService.getProductById(dbItem.product_id) ??
+              fetched.find((p) => p.id === dbItem.product_id);
             if (product) {
               return {
                 product,
@@ -81,6 +105,8 @@ export class CartService {
       }
     } catch (error) {
       console.error('Error loading cart:', error);
+      // Let the next currentUser$ emission try again
+      this.loadedForUser = null;
     } finally {
       this.isLoading.set(false);
     }
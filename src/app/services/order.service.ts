@@ -223,6 +223,73 @@ export class OrderService {
     }
   }
 
+  /**
+   * Find the order a Flow payment token belongs to
+   * Only returns id and status, enough to decide whether the payment is resolved
+   * @param flowToken Flow payment token
+   * @returns Order id and status, or null if not found (or not visible to the user)
+   */
+  async getOrderStatusByFlowToken(
+    flowToken: string,
+  ): Promise<{ id: number; status: OrderStatus } | null> {
+    try {
+      const { data, error } = await this.supabase.client
+        .from('orders')
+        .select('id, status')
+        .eq('flow_token', flowToken)
+        .maybeSingle();
+
+      if (error) throw error;
+      return data as { id: number; status: OrderStatus } | null;
+    } catch (error) {
+      console.error('Error fetching order by Flow token:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Get only the current status of an order (cheap poll)
+   * @param orderId Order ID
+   * @returns Order status or null if not found
+   */
+  async getOrderStatus(orderId: number): Promise<OrderStatus | null> {
+    try {
+      const { data, error } = await this.supabase.client
+        .from('orders')
+        .select('status')
+        .eq('id', orderId)
+        .maybeSingle();
+
+      if (error) throw error;
+      return (data?.status as OrderStatus) ?? null;
+    } catch (error) {
+      console.error('Error fetching order status:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Subscribe to realtime status changes of an order row
+   * Requires orders in the supabase_realtime publication (scripts/sql/18)
+   * @param orderId Order ID
+   * @param onStatus Called with the new status on every update
+   * @returns Function that removes the subscription
+   */
+  watchOrderStatus(orderId: number, onStatus: (status: OrderStatus) => void): () => void {
+    const channel = this.supabase.client
+      .channel(`order-status-${orderId}`)
+      .on(
+        'postgres_changes',
+        { event: 'UPDATE', schema: 'public', table: 'orders', filter: `id=eq.${orderId}` },
+        (payload) => onStatus((payload.new as OrderFromDB).status),
+      )
+      .subscribe();
+
+    return () => {
+      this.supabase.client.removeChannel(channel);
+    };
+  }
+
   /**
    * Load user's order history with pagination
    * @param page Page number (0-indexed)
@@ -0,0 +1,59 @@
+import { TestBed } from '@angular/core/testing';
+import { PrefetchService } from './prefetch.service';
+
+describe('PrefetchService', () => {
+  let service: PrefetchService;
+  let runIdle: jasmine.Spy;
+
+  const queuedKeys = () => service['queue'].map((entry) => entry.key);
+  const task = () => Promise.resolve(0);
+
+  beforeEach(() => {
+    TestBed.configureTestingModule({
+      providers: [PrefetchService],
+    });
+    service = TestBed.inject(PrefetchService);
+    // Hold every task in the queue until the test runs the idle callback
+    runIdle = spyOn(window, 'requestIdleCallback').and.returnValue(0);
+  });
+
+  it('should run high-priority prefetches first', async () => {
+    const ran: string[] = [];
+    const record = (key: string) => async () => {
+      ran.push(key);
+      return 0;
+    };
+    service.schedule('low', 'test', record('low'));
+    service.schedule('high', 'test', record('high'), 'high');
+
+    runIdle.calls.mostRecent().args[0]();
+    await new Promise((resolve) => setTimeout(resolve));
+
+    expect(ran).toEqual(['high']);
+    expect(queuedKeys()).toEqual(['low']);
+  });
+
+  it('should not queue a key twice', () => {
+    service.schedule('product-1', 'test', task);
+    service.schedule('product-1', 'test', task, 'high');
+
+    expect(queuedKeys()).toEqual(['product-1']);
+  });
+
+  it('should drop the oldest low-priority prefetch when the queue is full', () => {
+    service.schedule('hovered', 'test', task, 'high');
+    for (let i = 0; i < 24; i++) {
+      service.schedule(`card-${i}`, 'test', task);
+    }
+
+    const keys = queuedKeys();
+    expect(keys.length).toBe(24);
+    expect(keys[0]).toBe('hovered');
+    expect(keys).not.toContain('card-0');
+    expect(keys[keys.length - 1]).toBe('card-23');
+
+    // The dropped key can be queued again
+    service.schedule('card-0', 'test', task);
+    expect(queuedKeys()).toContain('card-0');
+  });
+});
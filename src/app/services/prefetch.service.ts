@@ -0,0 +1,140 @@
+import { Injectable, PLATFORM_ID, inject } from '@angular/core';
+import { isPlatformBrowser } from '@angular/common';
+import { SupabaseMonitorService } from './supabase-monitor.service';
+
+/**
+ * Fetches data for a prefetch and stores it where the real load will find it
+ * @returns Bytes downloaded (0 if nothing was fetched, e.g. already cached)
+ */
+export type PrefetchTask = () => Promise<number>;
+
+/**
+ * Network Information API (Chromium only; not in the DOM typings)
+ */
+interface NetworkInformation {
+  saveData?: boolean;
+  effectiveType?: 'slow-2g' | '2g' | '3g' | '4g';
+}
+
+// Bytes prefetches may download per page load, and on a 3g connection
+const PREFETCH_BUDGET_BYTES = 1024 * 1024;
+const PREFETCH_BUDGET_3G_BYTES = 256 * 1024;
+// Pending prefetches beyond this drop the oldest low-priority one
+const MAX_QUEUE_LENGTH = 24;
+// Longest wait for an idle period before running anyway
+const IDLE_TIMEOUT_MS = 2000;
+// requestIdleCallback fallback (Safari)
+const IDLE_FALLBACK_DELAY_MS = 200;
+
+/**
+ * Idle-time prefetch scheduler
+ *
+ * Runs queued prefetches one at a time when the browser is idle, newest
+ * high-priority first (hover before viewport); a key already queued is not
+ * queued again. Tasks skip data that is still cached. Stops when the byte
+ * budget is spent and does nothing with Save-Data on, on 2g connections, or
+ * during server rendering.
+ */
+@Injectable({
+  providedIn: 'root',
+})
+export class PrefetchService {
+  private monitor = inject(SupabaseMonitorService);
+  private isBrowser = isPlatformBrowser(inject(PLATFORM_ID));
+  // High-priority entries first (newest first), then low-priority ones (oldest first)
+  private queue: Array<{
+    key: string;
+    kind: string;
+    task: PrefetchTask;
+    priority: 'high' | 'low';
+  }> = [];
+  private pending = new Set<string>();
+  private spentBytes = 0;
+  private running = false;
+
+  /**
+   * Queue a prefetch
+   * @param key - Identifies the data
+   * @param kind - Groups the hit-rate stats in SupabaseMonitorService
+   * @param priority - high (e.g. hover) runs before low (e.g. in viewport)
+   */
+  schedule(key: string, kind: string, task: PrefetchTask, priority: 'high' | 'low' = 'low'): void {
+    if (!this.allowed() || this.pending.has(key)) return;
+
+    this.pending.add(key);
+    const entry = { key, kind, task, priority };
+    if (priority === 'high') {
+      this.queue.unshift(entry);
+    } else {
+      this.queue.push(entry);
+    }
+    if (this.queue.length > MAX_QUEUE_LENGTH) {
+      // Oldest low-priority entry (e.g. a card scrolled past long ago); the
+      // oldest high-priority one if there are none
+      const oldestLow = this.queue.findIndex((queued) => queued.priority === 'low');
+      const [dropped] = this.queue.splice(oldestLow === -1 ? -1 : oldestLow, 1);
+      this.pending.delete(dropped.key);
+    }
+    this.runWhenIdle();
+  }
+
+  /**
+   * Budget left for this page load, for the current connection
+   */
+  private remainingBytes(): number {
+    const connection = (navigator as Navigator & { connection?: NetworkInformation }).connection;
+    const budget =
+      connection?.effectiveType === '3g' ? PREFETCH_BUDGET_3G_BYTES : PREFETCH_BUDGET_BYTES;
+    return Math.max(budget - this.spentBytes, 0);
+  }
+
+  private allowed(): boolean {
+    if (!this.isBrowser) return false;
+
+    const connection = (navigator as Navigator & { connection?: NetworkInformation }).connection;
+    if (connection?.saveData || connection?.effectiveType?.endsWith('2g')) {
+      return false;
+    }
+    return this.remainingBytes() > 0;
+  }
+
+  private runWhenIdle(): void {
+    if (this.running || this.queue.length === 0) return;
+
+    this.running = true;
+    const run = () => void this.runNext();
+    if (typeof requestIdleCallback === 'function') {
+      requestIdleCallback(run, { timeout: IDLE_TIMEOUT_MS });
+    } else {
+      setTimeout(run, IDLE_FALLBACK_DELAY_MS);
+    }
+  }
+
+  private async runNext(): Promise<void> {
+    const entry = this.queue.shift();
+    if (entry) {
+      this.pending.delete(entry.key);
+    }
+    try {
+      // Conditions may have changed while queued (Save-Data toggled, budget spent)
+      if (entry && this.allowed()) {
+        const bytes = await entry.task();
+        if (bytes > 0) {
+          this.spentBytes += bytes;
+          this.monitor.recordPrefetch(entry.kind, bytes);
+        }
+      }
+    } catch (err) {
+      // A failed prefetch only means the real load goes to the network
+      console.warn('Prefetch failed:', err);
+    } finally {
+      this.running = false;
+      if (this.allowed()) {
+        this.runWhenIdle();
+      } else {
+        this.queue = [];
+        this.pending.clear();
+      }
+    }
+  }
+}
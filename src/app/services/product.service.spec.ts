@@ -1,6 +1,9 @@
 import { TestBed } from '@angular/core/testing';
-import { ProductService } from './product.service';
+import { PLATFORM_ID, Provider, TransferState } from '@angular/core';
+import { CATALOG_SNAPSHOT_KEY, CatalogSnapshot, ProductService } from './product.service';
 import { SupabaseService } from './supabase.service';
+import { SupabaseMonitorService } from './supabase-monitor.service';
+import { PrefetchService, PrefetchTask } from './prefetch.service';
 import { provideConfigMock } from '../testing/test-helpers';
 
 describe('ProductService', () => {
@@ -14,10 +17,12 @@ describe('ProductService', () => {
         select: jasmine.createSpy('select'),
         eq: jasmine.createSpy('eq'),
         order: jasmine.createSpy('order'),
+        abortSignal: jasmine.createSpy('abortSignal'),
       };
 
       chain.select.and.returnValue(chain);
       chain.eq.and.returnValue(chain);
+      chain.abortSignal.and.returnValue(chain);
       chain.order.and.returnValue(Promise.resolve({ data: [], error: null }));
 
       return chain;
@@ -62,3 +67,561 @@ describe('ProductService', () => {
     expect(service.categories()).toEqual([]);
   });
 });
+
+// products_list row (listings)
+const dbListRow = {
+  id: 7,
+  name: 'Lunora',
+  slug: 'lunora',
+  description: 'Lámpara de mesa',
+  price: 25990,
+  original_price: null,
+  stock_quantity: 3,
+  average_rating: 4.5,
+  review_count: 10,
+  is_available: true,
+  is_featured: false,
+  primary_image: null,
+  category_name: 'Lámpara de Mesa',
+  variant_sizes: [],
+};
+
+// products_full_public row (product page and modal)
+const dbProductDetail = {
+  id: 7,
+  name: 'Lunora',
+  slug: 'lunora',
+  description: 'Lámpara de mesa',
+  short_description: null,
+  price: 25990,
+  original_price: null,
+  sku: null,
+  stock_quantity: 3,
+  low_stock_threshold: 5,
+  average_rating: 4.5,
+  review_count: 10,
+  is_available: true,
+  is_featured: false,
+  material_name: null,
+  material_code: null,
+  images: [],
+  categories: [{ category_id: 1, name: 'Lámpara de Mesa', slug: 'lampara-de-mesa' }],
+  tags: [],
+  variants: [],
+  created_at: '2025-01-01T00:00:00Z',
+  updated_at: '2025-01-01T00:00:00Z',
+};
+
+/**
+ * Chainable query builder mock: every filter returns the chain, order() ends a
+ * listing query and single() a detail query. Pass a function as the listing
+ * result to build a new response on each call.
+ */
+function createQueryMock(
+  list: unknown = { data: [dbListRow], error: null, count: 1 },
+  detail: unknown = { data: dbProductDetail, error: null },
+) {
+  const chain: any = {};
+  for (const method of ['select', 'eq', 'gte', 'lte', 'or', 'range', 'abortSignal']) {
+    chain[method] = jasmine.createSpy(method).and.returnValue(chain);
+  }
+  chain.order = jasmine
+    .createSpy('order')
+    .and.callFake(() => Promise.resolve(typeof list === 'function' ? list() : list));
+  chain.single = jasmine.createSpy('single').and.resolveTo(detail);
+  return chain;
+}
+
+interface SetupOptions {
+  query?: any;
+  // Returned by client.rpc()
+  rpc?: unknown;
+  providers?: Provider[];
+  snapshot?: CatalogSnapshot;
+}
+
+/**
+ * Configures TestBed with a Supabase client whose from() returns the query
+ * mock, seeds the prerendered snapshot if given and creates the service.
+ */
+function setupProductService({
+  query = createQueryMock(),
+  rpc,
+  providers = [],
+  snapshot,
+}: SetupOptions = {}) {
+  const client = jasmine.createSpyObj('SupabaseClient', ['from', 'rpc']);
+  client.from.and.returnValue(query);
+  client.rpc.and.returnValue(rpc);
+
+  TestBed.configureTestingModule({
+    providers: [
+      provideConfigMock(),
+      ProductService,
+      { provide: SupabaseService, useValue: { client } },
+      ...providers,
+    ],
+  });
+  if (snapshot) {
+    TestBed.inject(TransferState).set(CATALOG_SNAPSHOT_KEY, snapshot);
+  }
+
+  return { client, query, service: TestBed.inject(ProductService) };
+}
+
+describe('ProductService with prerendered catalog', () => {
+  let service: ProductService;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+
+  beforeEach(() => {
+    ({ service, client: supabaseClientMock } = setupProductService({
+      snapshot: {
+        generatedAt: '2025-01-01T00:00:00Z',
+        listing: {
+          filters: { minPrice: 0, maxPrice: 50000 },
+          pagination: { page: 0, pageSize: 12 },
+          products: [dbListRow],
+          totalCount: 1,
+        },
+        category: { slug: 'lampara-de-mesa', name: 'Lámpara de Mesa' },
+        product: dbProductDetail,
+      },
+    }));
+  });
+
+  it('should not auto-load when the page carries a listing', () => {
+    expect(supabaseClientMock.from).not.toHaveBeenCalled();
+  });
+
+  it('should show the prerendered listing immediately and refresh in background', async () => {
+    const load = service.loadProducts({ maxPrice: 50000, minPrice: 0 }, { page: 0, pageSize: 12 });
+
+    expect(service.products().map((p) => p.slug)).toEqual(['lunora']);
+    expect(service.totalCount()).toBe(1);
+    expect(service.loading()).toBe(false);
+
+    await load;
+    expect(supabaseClientMock.from).toHaveBeenCalledWith('products_list');
+  });
+
+  it('should ignore the listing for other filters', async () => {
+    await service.loadProducts({ searchQuery: 'velora' }, { page: 0, pageSize: 12 });
+
+    expect(supabaseClientMock.from).toHaveBeenCalledTimes(1);
+  });
+
+  it('should resolve the prerendered product and category without querying', async () => {
+    const product = await service.getProductBySlug('lunora');
+    const category = await service.getCategoryNameBySlug('lampara-de-mesa');
+
+    expect(product?.name).toBe('Lunora');
+    expect(category).toBe('Lámpara de Mesa');
+    expect(supabaseClientMock.from).not.toHaveBeenCalled();
+  });
+});
+
+describe('ProductService during server rendering', () => {
+  let service: ProductService;
+  let transferState: TransferState;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+
+  beforeEach(() => {
+    ({ service, client: supabaseClientMock } = setupProductService({
+      providers: [{ provide: PLATFORM_ID, useValue: 'server' }],
+    }));
+    transferState = TestBed.inject(TransferState);
+  });
+
+  it('should only load what the route requests', () => {
+    expect(supabaseClientMock.from).not.toHaveBeenCalled();
+  });
+
+  it('should embed the rendered listing and product for the browser', async () => {
+    await service.loadProducts({ minPrice: 0, maxPrice: 50000 }, { page: 0, pageSize: 12 });
+    await service.getProductBySlug('lunora');
+
+    const snapshot = transferState.get(CATALOG_SNAPSHOT_KEY, null);
+    expect(snapshot?.listing?.pagination).toEqual({ page: 0, pageSize: 12 });
+    expect(snapshot?.listing?.products.map((p) => p.slug)).toEqual(['lunora']);
+    expect(snapshot?.listing?.totalCount).toBe(1);
+    expect(snapshot?.product?.slug).toBe('lunora');
+  });
+});
+
+describe('ProductService infinite scroll', () => {
+  let service: ProductService;
+
+  beforeEach(() => {
+    let nextId = 1;
+    ({ service } = setupProductService({
+      query: createQueryMock(() => ({
+        data: [{ ...dbListRow, id: nextId++ }],
+        error: null,
+        count: 24,
+      })),
+    }));
+  });
+
+  it('should append the next page instead of replacing the loaded products', async () => {
+    await service.loadProducts({}, { page: 0, pageSize: 12 });
+    await service.loadNextPage({}, { append: true });
+
+    // ids: 1 = constructor auto-load, 2 = first page, 3 = appended page
+    expect(service.currentPage()).toBe(1);
+    expect(service.products().map((p) => p.id)).toEqual([2, 3]);
+    expect(service.loadingMore()).toBe(false);
+    expect(service.loading()).toBe(false);
+  });
+});
+
+describe('ProductService overlapping loads', () => {
+  let service: ProductService;
+  let pending: { resolve: (result: unknown) => void; signal: AbortSignal }[];
+
+  beforeEach(() => {
+    pending = [];
+    // Each query stays open until the test resolves it
+    let signal: AbortSignal;
+    const chain = createQueryMock(
+      () => new Promise((resolve) => pending.push({ resolve, signal })),
+    );
+    chain.abortSignal.and.callFake((s: AbortSignal) => {
+      signal = s;
+      return chain;
+    });
+
+    ({ service } = setupProductService({ query: chain }));
+  });
+
+  const respond = (index: number, id: number) =>
+    pending[index].resolve({ data: [{ ...dbListRow, id }], error: null, count: 1 });
+
+  it('should share one query between identical in-flight loads', async () => {
+    const first = service.loadProducts({ searchQuery: 'luna' }, { page: 0, pageSize: 12 });
+    const second = service.loadProducts({ searchQuery: 'luna' }, { page: 0, pageSize: 12 });
+
+    // [0] = constructor auto-load, [1] = shared search
+    expect(pending.length).toBe(2);
+
+    respond(1, 5);
+    await Promise.all([first, second]);
+    expect(service.products().map((p) => p.id)).toEqual([5]);
+  });
+
+  it('should abort a superseded load and ignore its late response', async () => {
+    const older = service.loadProducts({ searchQuery: 'lu' }, { page: 0, pageSize: 12 });
+    const newer = service.loadProducts({ searchQuery: 'luna' }, { page: 0, pageSize: 12 });
+
+    expect(pending[1].signal.aborted).toBe(true);
+    expect(pending[2].signal.aborted).toBe(false);
+
+    respond(2, 9);
+    await newer;
+    respond(1, 3);
+    await older;
+
+    expect(service.products().map((p) => p.id)).toEqual([9]);
+    expect(service.loading()).toBe(false);
+    expect(service.error()).toBeNull();
+  });
+});
+
+describe('ProductService search', () => {
+  let service: ProductService;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+
+  const velora = { ...dbListRow, id: 8, name: 'Velora', slug: 'velora', description: 'Colgante' };
+
+  beforeEach(() => {
+    ({ service, client: supabaseClientMock } = setupProductService({
+      query: createQueryMock({ data: [dbListRow, velora], error: null, count: 2 }),
+      rpc: {
+        abortSignal: jasmine.createSpy('abortSignal').and.resolveTo({
+          data: [{ id: 7, name: 'Lunora', slug: 'lunora', thumbnail: null }],
+          error: null,
+        }),
+      },
+    }));
+  });
+
+  it('should narrow a refined search from the cached complete result', async () => {
+    await service.loadProducts({ searchQuery: 'l' }, { page: 0, pageSize: 12 });
+    const queries = supabaseClientMock.from.calls.count();
+
+    await service.loadProducts({ searchQuery: 'Lun' }, { page: 0, pageSize: 12 });
+
+    expect(supabaseClientMock.from.calls.count()).toBe(queries);
+    expect(service.products().map((p) => p.slug)).toEqual(['lunora']);
+    expect(service.totalCount()).toBe(1);
+  });
+
+  it('should query again when other filters change', async () => {
+    await service.loadProducts({ searchQuery: 'l' }, { page: 0, pageSize: 12 });
+    const queries = supabaseClientMock.from.calls.count();
+
+    await service.loadProducts({ searchQuery: 'lun', inStock: true }, { page: 0, pageSize: 12 });
+
+    expect(supabaseClientMock.from.calls.count()).toBe(queries + 1);
+  });
+
+  it('should load suggestions from the RPC', async () => {
+    const suggestions = await service.searchSuggestions(' lun ');
+
+    expect(supabaseClientMock.rpc).toHaveBeenCalledWith('search_product_suggestions', {
+      p_query: 'lun',
+      p_limit: 8,
+    });
+    expect(suggestions.map((s) => s.slug)).toEqual(['lunora']);
+  });
+
+  it('should skip suggestions for a single character', async () => {
+    expect(await service.searchSuggestions('l')).toEqual([]);
+    expect(supabaseClientMock.rpc).not.toHaveBeenCalled();
+  });
+});
+describe('ProductService category tree', () => {
+  let service: ProductService;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+  let chain: any;
+
+  const category = (id: number, name: string, slug: string, parentId: number | null) => ({
+    id,
+    name,
+    slug,
+    parent_id: parentId,
+    display_order: 0,
+    depth: parentId === null ? 0 : 1,
+    product_count: 1,
+    total_product_count: parentId === null ? 2 : 1,
+  });
+  // Ordered by depth, as get_category_tree returns them
+  const treeRows = [
+    category(1, 'Lámparas', 'lamparas', null),
+    category(3, 'Edición Limitada', 'edicion-limitada', null),
+    category(2, 'Lámpara de Mesa', 'lampara-de-mesa', 1),
+  ];
+
+  beforeEach(() => {
+    ({
+      service,
+      client: supabaseClientMock,
+      query: chain,
+    } = setupProductService({ rpc: Promise.resolve({ data: treeRows, error: null }) }));
+  });
+
+  it('should order the tree depth-first and link children', async () => {
+    const nodes = await service.loadCategoryTree();
+
+    expect(nodes.map((n) => n.slug)).toEqual(['lamparas', 'lampara-de-mesa', 'edicion-limitada']);
+    expect(service.categoryTree().map((n) => n.slug)).toEqual(['lamparas', 'edicion-limitada']);
+    expect(service.categoryTree()[0].children.map((n) => n.id)).toEqual([2]);
+  });
+
+  it('should serve categories from the cached tree', async () => {
+    await service.loadCategoryTree();
+    const names = await service.getAllCategories();
+    const name = await service.getCategoryNameBySlug('lampara-de-mesa');
+
+    expect(names).toEqual(['Edición Limitada', 'Lámpara de Mesa', 'Lámparas']);
+    expect(name).toBe('Lámpara de Mesa');
+    expect(supabaseClientMock.rpc).toHaveBeenCalledTimes(1);
+  });
+
+  it('should load a category with its subcategories from products_in_category', async () => {
+    await service.loadProducts({ category: 'Lámparas' }, { page: 0, pageSize: 12 });
+
+    expect(supabaseClientMock.from).toHaveBeenCalledWith('products_in_category');
+    expect(chain.eq).toHaveBeenCalledWith('in_category_id', 1);
+    expect(service.products().map((p) => p.slug)).toEqual(['lunora']);
+  });
+});
+describe('ProductService facets', () => {
+  let service: ProductService;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+
+  const facetRows = [
+    { facet: 'category', value: '2', label: 'Lámpara de Mesa', product_count: 3 },
+    { facet: 'price', value: '20000', label: '20000 - 29999', product_count: 2 },
+    { facet: 'price', value: '10000', label: '10000 - 19999', product_count: 1 },
+    { facet: 'stock', value: 'in_stock', label: 'En stock', product_count: 2 },
+    { facet: 'total', value: '', label: '', product_count: 3 },
+  ];
+
+  beforeEach(() => {
+    ({ service, client: supabaseClientMock } = setupProductService({
+      query: createQueryMock({ data: [], error: null, count: 0 }),
+      rpc: {
+        abortSignal: jasmine
+          .createSpy('abortSignal')
+          .and.resolveTo({ data: facetRows, error: null }),
+      },
+    }));
+  });
+
+  it('should group the RPC rows by facet', async () => {
+    const facets = await service.loadFacets({ minPrice: 0, maxPrice: 50000 });
+
+    expect(supabaseClientMock.rpc).toHaveBeenCalledWith(
+      'get_product_facets',
+      jasmine.objectContaining({ p_min_price: 0, p_max_price: 50000, p_in_stock: false }),
+    );
+    expect(facets?.total).toBe(3);
+    expect(facets?.price.map((f) => f.value)).toEqual(['10000', '20000']);
+    expect(facets?.category[0].count).toBe(3);
+    expect(service.facets()).toBe(facets);
+  });
+
+  it('should answer a filter set seen before from the cache', async () => {
+    await service.loadFacets({ maxPrice: 50000 });
+    await service.loadFacets({ maxPrice: 50000, inStock: true });
+    const facets = await service.loadFacets({ maxPrice: 50000 });
+
+    expect(supabaseClientMock.rpc).toHaveBeenCalledTimes(2);
+    expect(service.facets()).toBe(facets);
+  });
+});
+describe('ProductService count strategy', () => {
+  let service: ProductService;
+  let chain: any;
+  let response: { data: unknown[]; count: number | null };
+
+  beforeEach(() => {
+    response = { data: [dbListRow], count: 30 };
+    ({ service, query: chain } = setupProductService({
+      query: createQueryMock(() => ({ ...response, error: null })),
+    }));
+  });
+
+  it('should count the first page only and reuse it for the next pages', async () => {
+    const pageSize = 1;
+    await service.loadProducts({ inStock: true }, { page: 0, pageSize });
+    chain.select.calls.reset();
+    response = { data: [dbListRow], count: null };
+
+    await service.loadProducts({ inStock: true }, { page: 1, pageSize });
+
+    expect(chain.select).toHaveBeenCalledWith('*', { count: undefined });
+    expect(service.totalCount()).toBe(30);
+    expect(service.totalCountApproximate()).toBe(false);
+  });
+
+  it('should count again when the filters change', async () => {
+    await service.loadProducts({ inStock: true }, { page: 0, pageSize: 1 });
+    chain.select.calls.reset();
+
+    await service.loadProducts({ inStock: false }, { page: 1, pageSize: 1 });
+
+    expect(chain.select).toHaveBeenCalledWith('*', { count: 'exact' });
+  });
+
+  it('should flag planned counts as approximate until a short page ends the result', async () => {
+    service.setCountStrategy('planned');
+    response = { data: [dbListRow], count: 30 };
+    await service.loadProducts({}, { page: 0, pageSize: 1 });
+
+    expect(chain.select).toHaveBeenCalledWith('*', { count: 'planned' });
+    expect(service.totalCountApproximate()).toBe(true);
+
+    response = { data: [], count: 30 };
+    await service.loadProducts({}, { page: 5, pageSize: 1 });
+
+    expect(service.totalCount()).toBe(5);
+    expect(service.totalCountApproximate()).toBe(false);
+  });
+});
+describe('ProductService list and detail projections', () => {
+  let service: ProductService;
+  let supabaseClientMock: jasmine.SpyObj<any>;
+
+  const image = { image_url: 'https://example.com/lunora.jpg', alt_text: null, is_primary: true };
+
+  const listRow = {
+    ...dbListRow,
+    primary_image: image,
+    original_price: 31990,
+    variant_sizes: ['M'],
+  };
+  const detailRow = {
+    ...dbProductDetail,
+    images: [image],
+    tags: [{ tag_id: 1, name: 'minimalista' }],
+  };
+
+  beforeEach(() => {
+    ({ service, client: supabaseClientMock } = setupProductService({
+      query: createQueryMock(
+        { data: [listRow], error: null, count: 1 },
+        { data: detailRow, error: null },
+      ),
+    }));
+  });
+
+  it('should map list rows to card products', async () => {
+    await service.loadProducts({}, { page: 0, pageSize: 12 });
+
+    const [product] = service.products();
+    expect(supabaseClientMock.from).toHaveBeenCalledWith('products_list');
+    expect(product.image).toBe(image.image_url);
+    expect(product.category).toBe('Lámpara de Mesa');
+    expect(product.variants).toEqual(['M']);
+    expect(product.badge).toBe('-19%');
+    expect(product.images).toBeUndefined();
+  });
+
+  it('should load the full detail from products_full_public', async () => {
+    const product = await service.getProductBySlug('lunora');
+
+    expect(supabaseClientMock.from).toHaveBeenCalledWith('products_full_public');
+    expect(product?.images).toEqual([image]);
+    expect(product?.tags).toEqual(['minimalista']);
+  });
+});
+describe('ProductService prefetch', () => {
+  let service: ProductService;
+  let monitor: SupabaseMonitorService;
+  let chain: any;
+  let tasks: PrefetchTask[];
+
+  beforeEach(() => {
+    // Run queued prefetches on demand instead of at idle time
+    tasks = [];
+    const prefetchMock = {
+      schedule: (_key: string, _kind: string, task: PrefetchTask) => tasks.push(task),
+    };
+
+    ({ service, query: chain } = setupProductService({
+      query: createQueryMock({ data: [dbListRow], error: null, count: 30 }),
+      providers: [{ provide: PrefetchService, useValue: prefetchMock }],
+    }));
+    monitor = TestBed.inject(SupabaseMonitorService);
+    monitor.enable();
+  });
+
+  it('should serve the next page from its prefetch', async () => {
+    await service.loadProducts({}, { page: 0, pageSize: 1 });
+    service.prefetchPage({}, { page: 1, pageSize: 1 });
+    expect(await tasks[0]()).toBeGreaterThan(0);
+    chain.order.calls.reset();
+
+    await service.loadProducts({}, { page: 1, pageSize: 1 });
+
+    expect(chain.order).not.toHaveBeenCalled();
+    expect(service.currentPage()).toBe(1);
+    expect(service.totalCount()).toBe(30);
+    expect(monitor.getPrefetchStats().find((p) => p.kind === 'listing page')?.hits).toBe(1);
+  });
+
+  it('should open a prefetched detail without querying', async () => {
+    service.prefetchProductDetail('lunora', 'high');
+    await tasks[0]();
+
+    const product = await service.getProductBySlug('lunora');
+    await service.getProductBySlug('lunora');
+
+    expect(product?.slug).toBe('lunora');
+    expect(chain.single).toHaveBeenCalledTimes(1);
+    const stats = monitor.getPrefetchStats().find((p) => p.kind === 'product detail');
+    expect(stats?.hits).toBe(1);
+    expect(stats?.misses).toBe(0);
+  });
+});
@@ -1,7 +1,28 @@
-import { Injectable, signal, computed, inject } from '@angular/core';
-import { Product, ProductFromDB } from '../models/product.model';
+import {
+  Injectable,
+  signal,
+  computed,
+  inject,
+  TransferState,
+  makeStateKey,
+  PLATFORM_ID,
+  PendingTasks,
+} from '@angular/core';
+import { isPlatformServer } from '@angular/common';
+import {
+  CategoryFromDB,
+  CategoryNode,
+  FacetRowFromDB,
+  Product,
+  ProductFacets,
+  ProductFromDB,
+  ProductListFromDB,
+  ProductSuggestion,
+} from '../models/product.model';
 import { SupabaseService } from './supabase.service';
-import { SupabaseMonitorService } from './supabase-monitor.service';
+import { SupabaseMonitorService, payloadBytes } from './supabase-monitor.service';
+import { RequestCoordinator, requestKey } from './request-coordinator';
+import { PrefetchService } from './prefetch.service';
 
 /**
  * Filter options for product queries
@@ -23,9 +44,86 @@ export interface PaginationOptions {
   pageSize: number;
 }
 
+/**
+ * How loadProducts() counts the matching rows
+ * - exact: count(*) on every page
+ * - planned: the planner's row estimate (no count; approximate)
+ * - estimated: exact for small results, planned above PostgREST's max rows
+ * - exact-first-page: exact on the first page; later pages of the same
+ *   filters reuse it instead of counting again
+ */
+export type CountStrategy = 'exact' | 'planned' | 'estimated' | 'exact-first-page';
+
+/**
+ * Catalog data embedded in prerendered pages (scripts/prerender-catalog.mjs)
+ * and in server-rendered pages (src/server.ts)
+ * Read from the ng-state script through TransferState on first load
+ */
+export interface CatalogSnapshot {
+  generatedAt: string;
+  /** First page of the listing, for the exact loadProducts() arguments it was rendered with */
+  listing?: {
+    filters: ProductFilters;
+    pagination: PaginationOptions;
+    products: ProductListFromDB[];
+    totalCount: number;
+  };
+  /** Category page: slug from the URL and its display name */
+  category?: { slug: string; name: string };
+  /** Product page (full detail row) */
+  product?: ProductFromDB;
+}
+
+export const CATALOG_SNAPSHOT_KEY = makeStateKey<CatalogSnapshot>('catalog');
+
+// loadProducts() requests: only the latest one may write the products signal
+const LISTING_CHANNEL = 'listing';
+const SUGGESTIONS_CHANNEL = 'suggestions';
+const FACETS_CHANNEL = 'facets';
+
+// Listings read the card projection; the product page and modal read the full row
+const LIST_SOURCE = 'products_list';
+const DETAIL_SOURCE = 'products_full_public';
+
+// Complete first pages kept to answer search refinements locally
+const SEARCH_CACHE_SIZE = 20;
+const SEARCH_CACHE_TTL_MS = 60_000;
+const SUGGESTION_MIN_LENGTH = 2;
+
+// Category tree with product counts (get_category_tree RPC)
+const CATEGORY_TREE_TTL_MS = 5 * 60_000;
+
+// Facet counts per filter set: toggling a filter back is answered locally
+const FACET_CACHE_SIZE = 30;
+const FACET_CACHE_TTL_MS = 60_000;
+/** Width of the price facet buckets (CLP) */
+export const FACET_PRICE_STEP = 10_000;
+
+// Product details (modal and product page), prefetched or already opened
+const DETAIL_CACHE_SIZE = 30;
+const DETAIL_CACHE_TTL_MS = 5 * 60_000;
+// Prefetched listing pages are used once, while still fresh
+const PAGE_PREFETCH_SIZE = 4;
+const PAGE_PREFETCH_TTL_MS = 30_000;
+// Prefetch kinds in SupabaseMonitorService's hit-rate stats
+const DETAIL_PREFETCH_KIND = 'product detail';
+const PAGE_PREFETCH_KIND = 'listing page';
+
+/**
+ * Every row matching a listing query (first page held the whole result)
+ */
+interface CachedResult {
+  /** Filters other than the search text, and the page size */
+  scope: string;
+  query: string;
+  rows: ProductListFromDB[];
+  cachedAt: number;
+}
+
 /**
  * Product service providing lamp catalog from Supabase database
- * Uses products_full_public view for optimized queries
+ * Listings use the products_list view (card columns only); product detail
+ * uses products_full_public
  * All products are design lamps inspired by minimalist aesthetics
  */
 @Injectable({
@@ -34,25 +132,69 @@ export interface PaginationOptions {
 export class ProductService {
   private supabase = inject(SupabaseService);
   private monitor = inject(SupabaseMonitorService);
+  private prefetch = inject(PrefetchService);
+  private transferState = inject(TransferState);
+  private pendingTasks = inject(PendingTasks);
+  private onServer = isPlatformServer(inject(PLATFORM_ID));
+  private requests = new RequestCoordinator();
+  private searchCache: CachedResult[] = [];
+  private categoryTreeLoadedAt = 0;
+  // Filters the current total was counted for (exact-first-page reuses it)
+  private countedFilters: string | null = null;
+  // Insertion order is recency order (oldest first)
+  private facetCache = new Map<string, { facets: ProductFacets; cachedAt: number }>();
+  // By slug, insertion order is recency order; prefetched until first used
+  private detailCache = new Map<
+    string,
+    { product: Product; cachedAt: number; prefetched: boolean }
+  >();
+  // By loadProducts() arguments and count method
+  private prefetchedPages = new Map<
+    string,
+    { data: ProductListFromDB[]; count: number | null; cachedAt: number }
+  >();
+
+  // Prerendered data for the page the app booted on (consumed once per part)
+  private snapshot: CatalogSnapshot | null = this.transferState.get(CATALOG_SNAPSHOT_KEY, null);
 
   // Local state
   private _products = signal<Product[]>([]);
   private _loading = signal(false);
+  private _loadingMore = signal(false);
   private _error = signal<string | null>(null);
   private _totalCount = signal(0);
+  private _totalCountApproximate = signal(false);
+  private _countStrategy = signal<CountStrategy>('exact-first-page');
   private _currentPage = signal(0);
   private _pageSize = signal(12);
+  private _categoryNodes = signal<CategoryNode[]>([]);
+  private _facets = signal<ProductFacets | null>(null);
 
   // Public readonly signals
   readonly products = this._products.asReadonly();
   readonly loading = this._loading.asReadonly();
+  readonly loadingMore = this._loadingMore.asReadonly();
   readonly error = this._error.asReadonly();
   readonly totalCount = this._totalCount.asReadonly();
+  /** totalCount is a planner estimate (show it as "~N") */
+  readonly totalCountApproximate = this._totalCountApproximate.asReadonly();
+  readonly countStrategy = this._countStrategy.asReadonly();
   readonly currentPage = this._currentPage.asReadonly();
   readonly pageSize = this._pageSize.asReadonly();
+  /** Every visible category, parents before their children (depth-first) */
+  readonly categoryNodes = this._categoryNodes.asReadonly();
+  /** Counts for the filter set of the last loadFacets() call */
+  readonly facets = this._facets.asReadonly();
 
   // Computed values
+  readonly categoryTree = computed(() => this._categoryNodes().filter((n) => n.parentId === null));
+
+  // Categories with products in the catalog; until the tree loads, those of the loaded page
   readonly categories = computed(() => {
+    const nodes = this._categoryNodes();
+    if (nodes.length > 0) {
+      return nodes.filter((n) => n.totalProductCount > 0).map((n) => n.name);
+    }
     const cats = new Set(this._products().map((p) => p.category));
     return Array.from(cats);
   });
@@ -66,8 +208,14 @@ export class ProductService {
   readonly hasPreviousPage = computed(() => this._currentPage() > 0);
 
   constructor() {
+    this.transferState.remove(CATALOG_SNAPSHOT_KEY);
+
     // Auto-load products on service initialization
-    this.loadProducts();
+    // (prerendered pages already carry the listing their component will request,
+    // and server rendering only loads what the route asks for)
+    if (!this.snapshot?.listing && !this.onServer) {
+      this.loadProducts();
+    }
   }
 
   /**
@@ -91,119 +239,360 @@ export class ProductService {
    *
    * Ejemplo con paginación:
    *   await productService.loadProducts({}, { page: 0, pageSize: 6 });
+   *
+   * Si la página fue prerenderizada para estos mismos argumentos, se muestran
+   * los datos embebidos y la consulta corre en segundo plano (background: true,
+   * sin spinner) para refrescar precios y stock.
+   *
+   * Con append: true (scroll infinito) la página se agrega a los productos ya
+   * cargados y el progreso se informa en loadingMore en vez de loading.
+   *
+   * Una búsqueda que refina otra cuyo resultado completo cupo en la primera
+   * página ("lun" → "luna") se resuelve filtrando esas filas, sin consulta.
+   *
+   * El filtro de categoría incluye sus subcategorías: se resuelve el id con el
+   * árbol cacheado y se consulta products_in_category.
+   *
+   * El total se cuenta según countStrategy (options.count lo reemplaza para
+   * una llamada). Con planned / estimated, totalCountApproximate queda en true.
+   */
+  async loadProducts(
+    filters: ProductFilters = {},
+    pagination?: PaginationOptions,
+    options: { background?: boolean; append?: boolean; count?: CountStrategy } = {},
+  ): Promise<void> {
+    if (this.applyPrerenderedListing(filters, pagination)) {
+      void this.loadProducts(filters, pagination, { background: true });
+      return;
+    }
+
+    // Identical calls join the request in flight; anything else supersedes it
+    return this.requests.latest(
+      LISTING_CHANNEL,
+      requestKey(filters, pagination, options.append ?? false, options.count),
+      (signal) => this.fetchProducts(filters, pagination, options, signal),
+    );
+  }
+
+  /**
+   * Query a listing page and apply it, unless a newer loadProducts() call
+   * aborted it in the meantime
    */
-  async loadProducts(filters: ProductFilters = {}, pagination?: PaginationOptions): Promise<void> {
-    this._loading.set(true);
+  private async fetchProducts(
+    filters: ProductFilters,
+    pagination: PaginationOptions | undefined,
+    options: { background?: boolean; append?: boolean; count?: CountStrategy },
+    signal: AbortSignal,
+  ): Promise<void> {
+    // Refinement of a search whose whole result set is cached: no query needed
+    if (!options.append && this.applyNarrowedSearch(filters, pagination)) {
+      return;
+    }
+
+    // Reset both flags: the superseded request won't clear its own
+    this._loadingMore.set(!!options.append);
+    this._loading.set(!options.append && !options.background);
     this._error.set(null);
 
+    const done = this.trackOnServer();
     const startTime = performance.now();
+    let source = LIST_SOURCE;
     let queryDescription = 'Load products';
     let success = false;
     let resultCount = 0;
     let errorMessage: string | undefined;
+    let payload: unknown;
 
     try {
-      // Build query
-      let query = this.supabase.client
-        .from('products_full_public')
-        .select('*', { count: 'exact' })
-        .eq('is_available', true);
+      const category = filters.category ? await this.findCategory(filters.category) : undefined;
+      if (signal.aborted) return;
 
-      // Build query description for monitoring
-      const filterParts: string[] = [];
-
-      // NOTE: Category filtering is done client-side after loading
-      // because Supabase JSON operators are complex and error-prone.
-      // We load all products matching other filters, then filter by category in memory.
+      // Later pages of already counted filters can skip the count
+      const countedFilters = requestKey(filters);
+      const countMethod = this.countMethodFor(
+        filters,
+        pagination,
+        options.count ?? this._countStrategy(),
+      );
+      const listing = this.buildListingQuery(filters, pagination, category, countMethod);
+      source = listing.source;
+      queryDescription += ` (${listing.filterParts.join(', ')})`;
 
-      if (filters.minPrice !== undefined) {
-        query = query.gte('price', filters.minPrice);
-        filterParts.push(`minPrice=${filters.minPrice}`);
+      // Page prefetched while the user was on the previous one (prefetchPage)
+      const prefetched = this.takePrefetchedPage(requestKey(filters, pagination, countMethod));
+      if ((pagination?.page ?? 0) > 0) {
+        this.monitor.recordPrefetchLookup(PAGE_PREFETCH_KIND, !!prefetched);
       }
-
-      if (filters.maxPrice !== undefined) {
-        query = query.lte('price', filters.maxPrice);
-        filterParts.push(`maxPrice=${filters.maxPrice}`);
+      if (prefetched) {
+        queryDescription += ' [prefetched]';
       }
 
-      if (filters.searchQuery) {
-        query = query.or(
-          `name.ilike.%${filters.searchQuery}%,description.ilike.%${filters.searchQuery}%`,
-        );
-        filterParts.push(`search="${filters.searchQuery}"`);
-      }
+      // Execute query with default ordering
+      const { data, error, count } =
+        prefetched ?? (await listing.query.abortSignal(signal).order('id'));
 
-      if (filters.isFeatured !== undefined) {
-        query = query.eq('is_featured', filters.isFeatured);
-        filterParts.push(`featured=${filters.isFeatured}`);
-      }
+      // Superseded: the newer request owns the products signal
+      if (signal.aborted) return;
+      if (error) throw error;
 
-      if (filters.inStock) {
-        query = query.gt('stock_quantity', 0);
-        filterParts.push('inStock=true');
-      }
+      payload = data;
+      let rows = data as ProductListFromDB[];
+      let products = rows.map((row) => this.mapListRowToProduct(row));
 
-      // Apply pagination
-      if (pagination) {
-        const { page, pageSize } = pagination;
-        const from = page * pageSize;
-        const to = from + pageSize - 1;
-        query = query.range(from, to);
-        this._currentPage.set(page);
-        this._pageSize.set(pageSize);
-        filterParts.push(`page=${page}, pageSize=${pageSize}`);
+      // Category missing from the tree (e.g. it failed to load): filter in memory
+      if (filters.category && !category) {
+        rows = rows.filter((_, i) => products[i].category === filters.category);
+        products = products.filter((p) => p.category === filters.category);
       }
 
-      // Update query description
-      if (filterParts.length > 0) {
-        queryDescription += ` (${filterParts.join(', ')})`;
+      let totalCount = count ?? products.length;
+      let approximate = countMethod === 'planned' || countMethod === 'estimated';
+      if (!countMethod) {
+        totalCount = this._totalCount();
+        approximate = this._totalCountApproximate();
+      }
+      // A short page is the last one: it fixes an estimate that was off
+      const fetched = data?.length ?? 0;
+      if (approximate && pagination && fetched < pagination.pageSize) {
+        totalCount = pagination.page * pagination.pageSize + fetched;
+        approximate = false;
       }
 
-      // Execute query with default ordering
-      const { data, error, count } = await query.order('id');
-
-      if (error) throw error;
-
-      let products = (data as ProductFromDB[]).map((dbProduct) =>
-        this.mapDbProductToProduct(dbProduct),
-      );
+      // The first page holds every matching row: refinements can filter it locally
+      const complete = !approximate && count !== null && fetched >= count;
+      if (complete && !options.append && (pagination?.page ?? 0) === 0) {
+        this.rememberResult(filters, pagination, rows);
+      }
 
-      // Apply client-side category filter if specified
-      if (filters.category) {
-        products = products.filter((p) => p.category === filters.category);
+      if (this.onServer && pagination) {
+        this.recordForHydration({
+          listing: { filters, pagination, products: rows, totalCount },
+        });
       }
 
-      this._products.set(products);
-      this._totalCount.set(count ?? products.length);
+      if (options.append) {
+        this._products.update((loaded) => [...loaded, ...products]);
+      } else {
+        this._products.set(products);
+      }
+      if (pagination) {
+        this._currentPage.set(pagination.page);
+        this._pageSize.set(pagination.pageSize);
+      }
+      this._totalCount.set(totalCount);
+      this._totalCountApproximate.set(approximate);
+      this.countedFilters = countedFilters;
       resultCount = products.length;
       success = true;
     } catch (err) {
+      if (signal.aborted) return;
+
       errorMessage = err instanceof Error ? err.message : 'Failed to load products';
-      this._error.set(errorMessage);
+      // A failed background refresh keeps the prerendered products on screen
+      if (!options.background) {
+        this._error.set(errorMessage);
+      }
       console.error('Error loading products:', err);
     } finally {
-      const duration = performance.now() - startTime;
-      this._loading.set(false);
+      done();
 
-      // Record metrics
-      this.monitor.recordQuery(
-        'products_full_public',
-        queryDescription,
-        duration,
-        success,
-        resultCount,
-        errorMessage,
+      if (!signal.aborted) {
+        const duration = performance.now() - startTime;
+        if (options.append) {
+          this._loadingMore.set(false);
+        } else {
+          this._loading.set(false);
+        }
+
+        // Record metrics
+        this.monitor.recordQuery(
+          source,
+          queryDescription,
+          duration,
+          success,
+          resultCount,
+          errorMessage,
+          payload,
+        );
+      }
+    }
+  }
+
+  /**
+   * Count method for a listing page: undefined when the page reuses the
+   * count of its filters (exact-first-page)
+   */
+  private countMethodFor(
+    filters: ProductFilters,
+    pagination: PaginationOptions | undefined,
+    strategy: CountStrategy,
+  ): 'exact' | 'planned' | 'estimated' | undefined {
+    if (strategy === 'planned' || strategy === 'estimated') {
+      return strategy;
+    }
+    const reuseCount =
+      strategy === 'exact-first-page' &&
+      (pagination?.page ?? 0) > 0 &&
+      this.countedFilters === requestKey(filters);
+    return reuseCount ? undefined : 'exact';
+  }
+
+  /**
+   * Listing query for loadProducts() arguments, without ordering
+   * @returns The query, the view it reads and its filters for monitoring
+   */
+  private buildListingQuery(
+    filters: ProductFilters,
+    pagination: PaginationOptions | undefined,
+    category: CategoryNode | undefined,
+    countMethod: 'exact' | 'planned' | 'estimated' | undefined,
+  ) {
+    const source = category ? 'products_in_category' : LIST_SOURCE;
+    let query = this.supabase.client
+      .from(source)
+      .select('*', { count: countMethod })
+      .eq('is_available', true);
+
+    // Build query description for monitoring
+    const filterParts: string[] = [`count=${countMethod ?? 'reused'}`];
+
+    // Category and its subcategories: one indexed join over category_closure
+    if (category) {
+      query = query.eq('in_category_id', category.id);
+      filterParts.push(`category=${category.slug}`);
+    }
+
+    if (filters.minPrice !== undefined) {
+      query = query.gte('price', filters.minPrice);
+      filterParts.push(`minPrice=${filters.minPrice}`);
+    }
+
+    if (filters.maxPrice !== undefined) {
+      query = query.lte('price', filters.maxPrice);
+      filterParts.push(`maxPrice=${filters.maxPrice}`);
+    }
+
+    if (filters.searchQuery) {
+      query = query.or(
+        `name.ilike.%${filters.searchQuery}%,description.ilike.%${filters.searchQuery}%`,
       );
+      filterParts.push(`search="${filters.searchQuery}"`);
+    }
+
+    if (filters.isFeatured !== undefined) {
+      query = query.eq('is_featured', filters.isFeatured);
+      filterParts.push(`featured=${filters.isFeatured}`);
+    }
+
+    if (filters.inStock) {
+      query = query.gt('stock_quantity', 0);
+      filterParts.push('inStock=true');
     }
+
+    // Apply pagination
+    if (pagination) {
+      const { page, pageSize } = pagination;
+      const from = page * pageSize;
+      const to = from + pageSize - 1;
+      query = query.range(from, to);
+      filterParts.push(`page=${page}, pageSize=${pageSize}`);
+    }
+
+    return { query, source, filterParts };
+  }
+
+  /**
+   * Queue a listing page for idle-time prefetch: the next loadProducts() call
+   * with the same arguments uses it instead of querying
+   */
+  prefetchPage(filters: ProductFilters, pagination: PaginationOptions): void {
+    this.prefetch.schedule(requestKey('page', filters, pagination), PAGE_PREFETCH_KIND, () =>
+      this.fetchPageAhead(filters, pagination),
+    );
+  }
+
+  /**
+   * @returns Bytes downloaded
+   */
+  private async fetchPageAhead(
+    filters: ProductFilters,
+    pagination: PaginationOptions,
+  ): Promise<number> {
+    const category = filters.category ? await this.findCategory(filters.category) : undefined;
+    // Unknown category: loadProducts filters that page in memory; not worth prefetching
+    if (filters.category && !category) return 0;
+
+    const countMethod = this.countMethodFor(filters, pagination, this._countStrategy());
+    const key = requestKey(filters, pagination, countMethod);
+    if (this.prefetchedPages.has(key)) return 0;
+
+    const startTime = performance.now();
+    const { query, source, filterParts } = this.buildListingQuery(
+      filters,
+      pagination,
+      category,
+      countMethod,
+    );
+    const { data, error, count } = await query.order('id');
+    if (error) throw error;
+
+    this.prefetchedPages.set(key, {
+      data: data as ProductListFromDB[],
+      count,
+      cachedAt: Date.now(),
+    });
+    if (this.prefetchedPages.size > PAGE_PREFETCH_SIZE) {
+      this.prefetchedPages.delete(this.prefetchedPages.keys().next().value!);
+    }
+
+    this.monitor.recordQuery(
+      source,
+      `Prefetch products (${filterParts.join(', ')})`,
+      performance.now() - startTime,
+      true,
+      data.length,
+      undefined,
+      data,
+    );
+    return payloadBytes(data);
+  }
+
+  /**
+   * Prefetched page for a loadProducts() key, if still fresh (used once)
+   */
+  private takePrefetchedPage(
+    key: string,
+  ): { data: ProductListFromDB[]; error: null; count: number | null } | null {
+    const entry = this.prefetchedPages.get(key);
+    this.prefetchedPages.delete(key);
+    if (!entry || Date.now() - entry.cachedAt >= PAGE_PREFETCH_TTL_MS) {
+      return null;
+    }
+    return { data: entry.data, error: null, count: entry.count };
+  }
+
+  /**
+   * Count strategy for the following loadProducts() calls
+   */
+  setCountStrategy(strategy: CountStrategy): void {
+    this._countStrategy.set(strategy);
   }
 
   /**
    * Load next page of products
+   * With append: true the page is added to the loaded products (infinite scroll)
    */
-  async loadNextPage(filters: ProductFilters = {}): Promise<void> {
+  async loadNextPage(
+    filters: ProductFilters = {},
+    options: { append?: boolean } = {},
+  ): Promise<void> {
     if (this.hasNextPage()) {
       const nextPage = this._currentPage() + 1;
-      await this.loadProducts(filters, { page: nextPage, pageSize: this._pageSize() });
+      await this.loadProducts(
+        filters,
+        { page: nextPage, pageSize: this._pageSize() },
+        { append: options.append },
+      );
     }
   }
 
@@ -233,49 +622,306 @@ export class ProductService {
   }
 
   /**
-   * Get product by slug (SEO-friendly)
+   * Get products by ID regardless of the loaded page (e.g. items restored in the cart)
    */
-  async getProductBySlug(slug: string): Promise<Product | null> {
+  async getProductsByIds(ids: number[]): Promise<Product[]> {
+    const startTime = performance.now();
     try {
       const { data, error } = await this.supabase.client
-        .from('products_full_public')
+        .from(LIST_SOURCE)
         .select('*')
-        .eq('slug', slug)
-        .eq('is_available', true)
-        .single();
+        .in('id', ids)
+        .eq('is_available', true);
 
       if (error) throw error;
-      if (!data) return null;
 
-      return this.mapDbProductToProduct(data as ProductFromDB);
+      this.monitor.recordQuery(
+        LIST_SOURCE,
+        `Products by id (${ids.length})`,
+        performance.now() - startTime,
+        true,
+        data?.length ?? 0,
+        undefined,
+        data,
+      );
+      return (data as ProductListFromDB[]).map((row) => this.mapListRowToProduct(row));
     } catch (err) {
-      console.error('Error loading product by slug:', err);
-      return null;
+      console.error('Error loading products by id:', err);
+      return [];
     }
   }
 
   /**
-   * Get all available categories from database
+   * Get product with its full detail (gallery, tags, material, variants) by slug
+   * Used by the product page and by ProductDetailModal when it opens
+   */
+  async getProductBySlug(slug: string): Promise<Product | null> {
+    const prerendered = this.snapshot?.product;
+    if (prerendered?.slug === slug) {
+      this.snapshot = { ...this.snapshot!, product: undefined };
+      return this.mapDetailRowToProduct(prerendered);
+    }
+
+    const cached = this.detailCache.get(slug);
+    if (cached && Date.now() - cached.cachedAt < DETAIL_CACHE_TTL_MS) {
+      if (cached.prefetched) {
+        this.monitor.recordPrefetchLookup(DETAIL_PREFETCH_KIND, true);
+        cached.prefetched = false;
+      }
+      return cached.product;
+    }
+
+    if (!this.onServer) {
+      this.monitor.recordPrefetchLookup(DETAIL_PREFETCH_KIND, false);
+    }
+    const detail = await this.fetchProductDetail(slug, false);
+    return detail?.product ?? null;
+  }
+
+  /**
+   * Queue a product's detail for idle-time prefetch, so opening it doesn't
+   * wait for the network
+   * @param priority - high for a hovered or focused card, low for one in the viewport
+   */
+  prefetchProductDetail(slug: string, priority: 'high' | 'low' = 'low'): void {
+    this.prefetch.schedule(
+      requestKey('product', slug),
+      DETAIL_PREFETCH_KIND,
+      () => this.fetchDetailAhead(slug),
+      priority,
+    );
+  }
+
+  /**
+   * @returns Bytes downloaded
+   */
+  private async fetchDetailAhead(slug: string): Promise<number> {
+    const cached = this.detailCache.get(slug);
+    if (cached && Date.now() - cached.cachedAt < DETAIL_CACHE_TTL_MS) {
+      return 0;
+    }
+
+    const detail = await this.fetchProductDetail(slug, true);
+    return detail ? payloadBytes(detail.row) : 0;
+  }
+
+  private fetchProductDetail(
+    slug: string,
+    prefetch: boolean,
+  ): Promise<{ product: Product; row: ProductFromDB } | null> {
+    // Overlapping route emissions (or the page and its modal) can ask for the same product
+    return this.requests.shared(requestKey('product', slug), async () => {
+      const done = this.trackOnServer();
+      const startTime = performance.now();
+      try {
+        const { data, error } = await this.supabase.client
+          .from(DETAIL_SOURCE)
+          .select('*')
+          .eq('slug', slug)
+          .eq('is_available', true)
+          .single();
+
+        if (error) throw error;
+        if (!data) return null;
+
+        const row = data as ProductFromDB;
+        if (this.onServer) {
+          this.recordForHydration({ product: row });
+        }
+
+        this.monitor.recordQuery(
+          DETAIL_SOURCE,
+          `${prefetch ? 'Prefetch product' : 'Product'} detail ("${slug}")`,
+          performance.now() - startTime,
+          true,
+          1,
+          undefined,
+          data,
+        );
+
+        const product = this.mapDetailRowToProduct(row);
+        this.detailCache.delete(slug);
+        this.detailCache.set(slug, { product, cachedAt: Date.now(), prefetched: prefetch });
+        if (this.detailCache.size > DETAIL_CACHE_SIZE) {
+          this.detailCache.delete(this.detailCache.keys().next().value!);
+        }
+        return { product, row };
+      } catch (err) {
+        console.error('Error loading product by slug:', err);
+        return null;
+      } finally {
+        done();
+      }
+    });
+  }
+
+  /**
+   * Get category display name from its URL slug
+   */
+  async getCategoryNameBySlug(slug: string): Promise<string | null> {
+    if (this.snapshot?.category?.slug === slug) {
+      return this.snapshot.category.name;
+    }
+
+    const cached = this._categoryNodes().find((n) => n.slug === slug);
+    if (cached) {
+      if (this.onServer) {
+        this.recordForHydration({ category: { slug, name: cached.name } });
+      }
+      return cached.name;
+    }
+
+    return this.requests.shared(requestKey('category', slug), async () => {
+      const done = this.trackOnServer();
+      try {
+        const { data, error } = await this.supabase.client
+          .from('categories')
+          .select('name')
+          .eq('slug', slug)
+          .eq('is_active', true)
+          .maybeSingle();
+
+        if (error) throw error;
+
+        if (this.onServer && data) {
+          this.recordForHydration({ category: { slug, name: data.name } });
+        }
+
+        return data?.name ?? null;
+      } catch (err) {
+        console.error('Error loading category by slug:', err);
+        return null;
+      } finally {
+        done();
+      }
+    });
+  }
+
+  /**
+   * Get all active category names, sorted by name (from the cached category tree)
    */
   async getAllCategories(): Promise<string[]> {
-    try {
-      const { data, error } = await this.supabase.client
-        .from('categories')
-        .select('name')
-        .eq('is_active', true)
-        .order('name');
+    const nodes = await this.loadCategoryTree();
+    return nodes.map((n) => n.name).sort((a, b) => a.localeCompare(b, 'es'));
+  }
 
-      if (error) throw error;
+  /**
+   * Load the category tree with product counts (get_category_tree RPC)
+   * Cached for CATEGORY_TREE_TTL_MS; on error the previous tree is kept
+   * @returns Every visible category, parents before their children
+   */
+  async loadCategoryTree(): Promise<CategoryNode[]> {
+    if (
+      this.categoryTreeLoadedAt > 0 &&
+      Date.now() - this.categoryTreeLoadedAt < CATEGORY_TREE_TTL_MS
+    ) {
+      return this._categoryNodes();
+    }
 
-      return data?.map((cat) => cat.name) ?? [];
-    } catch (err) {
-      console.error('Error loading categories:', err);
-      return [];
+    return this.requests.shared(requestKey('categoryTree'), async () => {
+      const done = this.trackOnServer();
+      const startTime = performance.now();
+      try {
+        const { data, error } = await this.supabase.client.rpc('get_category_tree');
+
+        if (error) throw error;
+
+        const nodes = buildCategoryTree((data ?? []) as CategoryFromDB[]);
+        this._categoryNodes.set(nodes);
+        this.categoryTreeLoadedAt = Date.now();
+        this.monitor.recordQuery(
+          'get_category_tree',
+          'Category tree',
+          performance.now() - startTime,
+          true,
+          nodes.length,
+          undefined,
+          data,
+        );
+        return nodes;
+      } catch (err) {
+        console.error('Error loading category tree:', err);
+        return this._categoryNodes();
+      } finally {
+        done();
+      }
+    });
+  }
+
+  /**
+   * Product counts per category, tag, material, price bucket and stock status
+   * for a filter set, from one get_product_facets call
+   * Results are cached per filter set; a newer call aborts the previous one
+   */
+  async loadFacets(filters: ProductFilters): Promise<ProductFacets | null> {
+    const key = requestKey(filters);
+    const cached = this.facetCache.get(key);
+    if (cached && Date.now() - cached.cachedAt < FACET_CACHE_TTL_MS) {
+      this.facetCache.delete(key);
+      this.facetCache.set(key, cached);
+      this._facets.set(cached.facets);
+      return cached.facets;
     }
+
+    return this.requests.latest(FACETS_CHANNEL, key, async (signal) => {
+      const startTime = performance.now();
+      try {
+        // Unknown category (tree failed to load): counts without it
+        const category = filters.category ? await this.findCategory(filters.category) : undefined;
+        if (signal.aborted) return null;
+
+        const { data, error } = await this.supabase.client
+          .rpc('get_product_facets', {
+            p_category_id: category?.id ?? null,
+            p_min_price: filters.minPrice ?? null,
+            p_max_price: filters.maxPrice ?? null,
+            p_search: filters.searchQuery ?? null,
+            p_in_stock: filters.inStock ?? false,
+            p_featured: filters.isFeatured ?? null,
+            p_price_step: FACET_PRICE_STEP,
+          })
+          .abortSignal(signal);
+
+        if (signal.aborted) return null;
+        if (error) throw error;
+
+        const facets = groupFacets((data ?? []) as FacetRowFromDB[]);
+        this.facetCache.delete(key);
+        this.facetCache.set(key, { facets, cachedAt: Date.now() });
+        if (this.facetCache.size > FACET_CACHE_SIZE) {
+          this.facetCache.delete(this.facetCache.keys().next().value!);
+        }
+        this._facets.set(facets);
+
+        this.monitor.recordQuery(
+          'get_product_facets',
+          `Facets (${key})`,
+          performance.now() - startTime,
+          true,
+          data?.length ?? 0,
+          undefined,
+          data,
+        );
+        return facets;
+      } catch (err) {
+        if (!signal.aborted) {
+          console.error('Error loading facets:', err);
+        }
+        return null;
+      }
+    });
   }
 
   /**
-   * Get all available categories (from currently loaded products)
+   * Category by display name, from the cached tree
+   */
+  private async findCategory(name: string): Promise<CategoryNode | undefined> {
+    const nodes = await this.loadCategoryTree();
+    return nodes.find((n) => n.name === name);
+  }
+
+  /**
+   * Get categories with products (from the category tree, or the loaded products until it loads)
    */
   getCategories(): string[] {
     return this.categories();
@@ -308,12 +954,218 @@ export class ProductService {
   }
 
   /**
-   * Map database product to frontend Product interface
+   * Type-ahead suggestions (id, name, slug, thumbnail) from the
+   * search_product_suggestions RPC instead of full product rows
+   * A newer call aborts the previous one, which then resolves to []
+   */
+  async searchSuggestions(query: string, limit = 8): Promise<ProductSuggestion[]> {
+    const term = query.trim();
+    if (term.length < SUGGESTION_MIN_LENGTH) {
+      return [];
+    }
+
+    return this.requests.latest(SUGGESTIONS_CHANNEL, requestKey(term, limit), async (signal) => {
+      const startTime = performance.now();
+      try {
+        const { data, error } = await this.supabase.client
+          .rpc('search_product_suggestions', { p_query: term, p_limit: limit })
+          .abortSignal(signal);
+
+        if (signal.aborted) return [];
+        if (error) throw error;
+
+        const suggestions = (data ?? []) as ProductSuggestion[];
+        this.monitor.recordQuery(
+          'search_product_suggestions',
+          `Suggestions ("${term}")`,
+          performance.now() - startTime,
+          true,
+          suggestions.length,
+          undefined,
+          data,
+        );
+        return suggestions;
+      } catch (err) {
+        if (!signal.aborted) {
+          console.error('Error loading search suggestions:', err);
+        }
+        return [];
+      }
+    });
+  }
+
+  /**
+   * Show the prerendered listing if it was rendered for these exact arguments
+   * @returns true if the snapshot was applied
+   */
+  private applyPrerenderedListing(
+    filters: ProductFilters,
+    pagination?: PaginationOptions,
+  ): boolean {
+    const listing = this.snapshot?.listing;
+    const sameArguments = (a?: object, b?: object) =>
+      JSON.stringify(a, Object.keys(a ?? {}).sort()) ===
+      JSON.stringify(b, Object.keys(b ?? {}).sort());
+
+    if (
+      !listing ||
+      !sameArguments(listing.filters, filters) ||
+      !sameArguments(listing.pagination, pagination)
+    ) {
+      return false;
+    }
+
+    this.snapshot = { ...this.snapshot!, listing: undefined };
+
+    const products = listing.products.map((row) => this.mapListRowToProduct(row));
+    this._products.set(products);
+    this._totalCount.set(listing.totalCount);
+    this._totalCountApproximate.set(false);
+    this.countedFilters = requestKey(listing.filters);
+    this._currentPage.set(listing.pagination.page);
+    this._pageSize.set(listing.pagination.pageSize);
+    this._loading.set(false);
+
+    this.monitor.recordQuery(
+      LIST_SOURCE,
+      `Load products (prerendered ${this.snapshot.generatedAt})`,
+      0,
+      true,
+      products.length,
+    );
+    return true;
+  }
+
+  /**
+   * Serve a search from a cached complete result of a shorter query it contains
+   * ("lun" → "luna"): every row matching the longer text is among those rows
+   * @returns true if the narrowed result was applied
    */
-  private mapDbProductToProduct(dbProduct: ProductFromDB): Product {
+  private applyNarrowedSearch(filters: ProductFilters, pagination?: PaginationOptions): boolean {
+    const query = filters.searchQuery?.toLowerCase();
+    // % and _ are ILIKE wildcards in the database query; leave those to the server
+    if (!query || (pagination?.page ?? 0) !== 0 || /[%_]/.test(query)) {
+      return false;
+    }
+
+    const scope = this.searchScope(filters, pagination);
+    const now = Date.now();
+    this.searchCache = this.searchCache.filter((e) => now - e.cachedAt < SEARCH_CACHE_TTL_MS);
+
+    // Longest cached query first: fewest rows to filter
+    const cached = this.searchCache
+      .filter((e) => e.scope === scope && e.query.length < query.length && query.includes(e.query))
+      .sort((a, b) => b.query.length - a.query.length)[0];
+    if (!cached) {
+      return false;
+    }
+
+    const rows = cached.rows.filter(
+      (row) =>
+        row.name.toLowerCase().includes(query) || row.description.toLowerCase().includes(query),
+    );
+    const products = rows.map((row) => this.mapListRowToProduct(row));
+    this._products.set(products);
+    this._totalCount.set(products.length);
+    this._totalCountApproximate.set(false);
+    this.countedFilters = requestKey(filters);
+    if (pagination) {
+      this._currentPage.set(pagination.page);
+      this._pageSize.set(pagination.pageSize);
+    }
+    this._loading.set(false);
+    this._loadingMore.set(false);
+    this._error.set(null);
+
+    // The narrowed rows are complete too, so "luna" can narrow to "lunar"
+    this.rememberResult(filters, pagination, rows, cached.cachedAt);
+
+    this.monitor.recordQuery(
+      LIST_SOURCE,
+      `Load products (search="${filters.searchQuery}", narrowed from "${cached.query}")`,
+      0,
+      true,
+      products.length,
+    );
+    return true;
+  }
+
+  private rememberResult(
+    filters: ProductFilters,
+    pagination: PaginationOptions | undefined,
+    rows: ProductListFromDB[],
+    cachedAt = Date.now(),
+  ): void {
+    const entry: CachedResult = {
+      scope: this.searchScope(filters, pagination),
+      query: filters.searchQuery?.toLowerCase() ?? '',
+      rows,
+      cachedAt,
+    };
+    this.searchCache = [
+      entry,
+      ...this.searchCache.filter((e) => e.scope !== entry.scope || e.query !== entry.query),
+    ].slice(0, SEARCH_CACHE_SIZE);
+  }
+
+  private searchScope(filters: ProductFilters, pagination?: PaginationOptions): string {
+    return requestKey({ ...filters, searchQuery: undefined }, pagination?.pageSize);
+  }
+
+  /**
+   * Keep server rendering open until a query settles
+   * (supabase-js fetches aren't tracked by the HTTP client)
+   * @returns Callback that releases the render
+   */
+  private trackOnServer(): () => void {
+    return this.onServer ? this.pendingTasks.add() : () => {};
+  }
+
+  /**
+   * Add data fetched during server rendering to the page's ng-state script,
+   * in the same shape the prerender script writes
+   */
+  private recordForHydration(part: Partial<CatalogSnapshot>): void {
+    const current = this.transferState.get(CATALOG_SNAPSHOT_KEY, null) ?? {
+      generatedAt: new Date().toISOString(),
+    };
+    this.transferState.set(CATALOG_SNAPSHOT_KEY, { ...current, ...part });
+  }
+
+  /**
+   * Map a products_list row (catalog card) to the frontend Product interface
+   * Gallery, tags, material and SKU are left out until the detail is loaded
+   */
+  private mapListRowToProduct(row: ProductListFromDB): Product {
+    const primaryImage = row.primary_image ?? undefined;
+
+    return {
+      id: row.id,
+      name: row.name,
+      slug: row.slug,
+      description: row.description,
+      price: row.price,
+      originalPrice: row.original_price ?? undefined,
+      image: primaryImage?.image_url || '',
+      primaryImage,
+      category: row.category_name || 'Sin categoría',
+      rating: row.average_rating,
+      reviewCount: row.review_count,
+      variants: row.variant_sizes.length > 0 ? row.variant_sizes : undefined,
+      badge: productBadge(row.price, row.original_price, row.is_featured),
+      stockQuantity: row.stock_quantity,
+      isAvailable: row.is_available,
+      isFeatured: row.is_featured,
+    };
+  }
+
+  /**
+   * Map a products_full_public row (product detail) to the frontend Product interface
+   */
+  private mapDetailRowToProduct(dbProduct: ProductFromDB): Product {
     // Get primary image or first available
-    const primaryImage = dbProduct.images.find((img) => img.is_primary);
-    const imageUrl = primaryImage?.image_url || dbProduct.images[0]?.image_url || '';
+    const primaryImage = dbProduct.images.find((img) => img.is_primary) ?? dbProduct.images[0];
+    const imageUrl = primaryImage?.image_url || '';
 
     // Get first category name
     const categoryName = dbProduct.categories[0]?.name || 'Sin categoría';
@@ -326,17 +1178,6 @@ export class ProductService {
       .map((v) => v.size)
       .filter((s): s is string => s !== null);
 
-    // Calculate badge (discount percentage)
-    let badge: string | undefined;
-    if (dbProduct.original_price && dbProduct.original_price > dbProduct.price) {
-      const discount = Math.round(
-        ((dbProduct.original_price - dbProduct.price) / dbProduct.original_price) * 100,
-      );
-      badge = `-${discount}%`;
-    } else if (dbProduct.is_featured) {
-      badge = 'Destacado';
-    }
-
     return {
       id: dbProduct.id,
       name: dbProduct.name,
@@ -345,13 +1186,14 @@ export class ProductService {
       price: dbProduct.price,
       originalPrice: dbProduct.original_price ?? undefined,
       image: imageUrl,
+      primaryImage,
       images: dbProduct.images.length > 0 ? dbProduct.images : undefined, // Gallery images
       category: categoryName,
       tags: tagNames.length > 0 ? tagNames : undefined,
       rating: dbProduct.average_rating,
       reviewCount: dbProduct.review_count,
       variants: variantSizes.length > 0 ? variantSizes : undefined,
-      badge,
+      badge: productBadge(dbProduct.price, dbProduct.original_price, dbProduct.is_featured),
       material: dbProduct.material_code ?? undefined,
       sku: dbProduct.sku ?? undefined,
       stockQuantity: dbProduct.stock_quantity,
@@ -360,3 +1202,77 @@ export class ProductService {
     };
   }
 }
+
+/**
+ * Card badge: discount percentage, or "Destacado" for featured products
+ */
+function productBadge(
+  price: number,
+  originalPrice: number | null,
+  isFeatured: boolean,
+): string | undefined {
+  if (originalPrice && originalPrice > price) {
+    return `-${Math.round(((originalPrice - price) / originalPrice) * 100)}%`;
+  }
+  return isFeatured ? 'Destacado' : undefined;
+}
+
+/**
+ * Split get_product_facets rows by facet (rows arrive sorted by count)
+ */
+function groupFacets(rows: FacetRowFromDB[]): ProductFacets {
+  const facets: ProductFacets = {
+    total: 0,
+    category: [],
+    tag: [],
+    material: [],
+    price: [],
+    stock: [],
+  };
+  for (const row of rows) {
+    if (row.facet === 'total') {
+      facets.total = row.product_count;
+    } else {
+      facets[row.facet].push({ value: row.value, label: row.label, count: row.product_count });
+    }
+  }
+  facets.price.sort((a, b) => Number(a.value) - Number(b.value));
+  return facets;
+}
+
+/**
+ * Link get_category_tree rows (ordered by depth) into nodes with children
+ * @returns All nodes, depth-first: each parent followed by its subtree
+ */
+function buildCategoryTree(rows: CategoryFromDB[]): CategoryNode[] {
+  const byId = new Map<number, CategoryNode>();
+  const roots: CategoryNode[] = [];
+
+  for (const row of rows) {
+    const node: CategoryNode = {
+      id: row.id,
+      name: row.name,
+      slug: row.slug,
+      parentId: row.parent_id,
+      depth: row.depth,
+      productCount: row.product_count,
+      totalProductCount: row.total_product_count,
+      children: [],
+    };
+    byId.set(node.id, node);
+    const parent = row.parent_id !== null ? byId.get(row.parent_id) : undefined;
+    if (parent) {
+      parent.children.push(node);
+    } else {
+      roots.push(node);
+    }
+  }
+
+  const ordered: CategoryNode[] = [];
+  const visit = (node: CategoryNode) => {
+    ordered.push(node);
+    node.children.forEach(visit);
+  };
+  roots.forEach(visit);
+  return ordered;
+}
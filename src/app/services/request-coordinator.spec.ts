@@ -0,0 +1,61 @@
+import { RequestCoordinator, requestKey } from './request-coordinator';
+
+describe('RequestCoordinator', () => {
+  let coordinator: RequestCoordinator;
+
+  beforeEach(() => {
+    coordinator = new RequestCoordinator();
+  });
+
+  it('should build the same key regardless of property order', () => {
+    expect(requestKey({ minPrice: 0, maxPrice: 10 }, { page: 0 })).toBe(
+      requestKey({ maxPrice: 10, minPrice: 0, category: undefined }, { page: 0 }),
+    );
+    expect(requestKey({ minPrice: 0 })).not.toBe(requestKey({ minPrice: 1 }));
+  });
+
+  it('should join an identical request on the same channel', async () => {
+    const task = jasmine.createSpy('task').and.resolveTo('rows');
+
+    const [a, b] = await Promise.all([
+      coordinator.latest('listing', 'k1', task),
+      coordinator.latest('listing', 'k1', task),
+    ]);
+
+    expect(task).toHaveBeenCalledTimes(1);
+    expect(a).toBe('rows');
+    expect(b).toBe('rows');
+  });
+
+  it('should abort the previous request when the key changes', () => {
+    const signals: AbortSignal[] = [];
+    const task = (signal: AbortSignal) => {
+      signals.push(signal);
+      return new Promise<void>(() => undefined);
+    };
+
+    void coordinator.latest('listing', 'k1', task);
+    void coordinator.latest('listing', 'k2', task);
+
+    expect(signals[0].aborted).toBe(true);
+    expect(signals[1].aborted).toBe(false);
+  });
+
+  it('should run a new request once the previous one settled', async () => {
+    const task = jasmine.createSpy('task').and.resolveTo(null);
+
+    await coordinator.latest('listing', 'k1', task);
+    await coordinator.latest('listing', 'k1', task);
+
+    expect(task).toHaveBeenCalledTimes(2);
+  });
+
+  it('should share identical reads while in flight only', async () => {
+    const task = jasmine.createSpy('task').and.resolveTo('lunora');
+
+    await Promise.all([coordinator.shared('p', task), coordinator.shared('p', task)]);
+    await coordinator.shared('p', task);
+
+    expect(task).toHaveBeenCalledTimes(2);
+  });
+});
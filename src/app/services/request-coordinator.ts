@@ -0,0 +1,62 @@
+/**
+ * Coordinates overlapping Supabase reads
+ *
+ * - latest(): one request per channel (e.g. the product listing). A request
+ *   with the same key as the one in flight joins it; a different key aborts the
+ *   previous one, so only the newest request's task sees a live signal.
+ * - shared(): identical in-flight reads (same key) share one promise.
+ *
+ * Tasks apply their results themselves and must check signal.aborted after
+ * every await: the check and the state update run in the same tick, so a
+ * superseded response can never overwrite a newer one.
+ */
+export class RequestCoordinator {
+  private channels = new Map<
+    string,
+    { key: string; controller: AbortController; promise: Promise<unknown> }
+  >();
+  private inFlight = new Map<string, Promise<unknown>>();
+
+  latest<T>(
+    channel: string,
+    key: string,
+    task: (signal: AbortSignal) => Promise<T>,
+  ): Promise<T> {
+    const active = this.channels.get(channel);
+    if (active?.key === key) {
+      return active.promise as Promise<T>;
+    }
+    active?.controller.abort();
+
+    const controller = new AbortController();
+    const promise: Promise<T> = task(controller.signal).finally(() => {
+      if (this.channels.get(channel)?.promise === promise) {
+        this.channels.delete(channel);
+      }
+    });
+    this.channels.set(channel, { key, controller, promise });
+    return promise;
+  }
+
+  shared<T>(key: string, task: () => Promise<T>): Promise<T> {
+    const active = this.inFlight.get(key);
+    if (active) {
+      return active as Promise<T>;
+    }
+
+    const promise = task().finally(() => this.inFlight.delete(key));
+    this.inFlight.set(key, promise);
+    return promise;
+  }
+}
+
+/**
+ * Stable key for query arguments: object keys sorted, undefined values dropped
+ */
+export function requestKey(...parts: unknown[]): string {
+  return JSON.stringify(parts, (_, value) =>
+    value && typeof value === 'object' && !Array.isArray(value)
+      ? Object.fromEntries(Object.entries(value).sort(([a], [b]) => a.localeCompare(b)))
+      : value,
+  );
+}
@@ -1,4 +1,5 @@
 import { Injectable, inject } from '@angular/core';
+import { DOCUMENT } from '@angular/common';
 import { Meta, Title } from '@angular/platform-browser';
 import { SeoConfig, SchemaConfig } from '../models/seo-config.model';
 
@@ -12,6 +13,8 @@ import { SeoConfig, SchemaConfig } from '../models/seo-config.model';
 export class SeoService {
   private meta = inject(Meta);
   private title = inject(Title);
+  // Injected so it also works during server rendering
+  private document = inject(DOCUMENT);
 
   private readonly defaultConfig: SeoConfig = {
     title: 'Forja del Destino - Lámparas de Diseño Minimalista | Impresas en 3D Chile',
@@ -116,16 +119,16 @@ export class SeoService {
    */
   updateCanonicalUrl(url: string): void {
     // Remove existing canonical link if any
-    const existingCanonical = document.querySelector('link[rel="canonical"]');
+    const existingCanonical = this.document.querySelector('link[rel="canonical"]');
     if (existingCanonical) {
       existingCanonical.remove();
     }
 
     // Create and append new canonical link
-    const link = document.createElement('link');
+    const link = this.document.createElement('link');
     link.setAttribute('rel', 'canonical');
     link.setAttribute('href', url);
-    document.head.appendChild(link);
+    this.document.head.appendChild(link);
   }
 
   /**
@@ -133,23 +136,25 @@ export class SeoService {
    */
   addStructuredData(schema: SchemaConfig): void {
     // Remove existing structured data with same type
-    const existingScript = document.querySelector(`script[data-schema-type="${schema['@type']}"]`);
+    const existingScript = this.document.querySelector(
+      `script[data-schema-type="${schema['@type']}"]`,
+    );
     if (existingScript) {
       existingScript.remove();
     }
 
-    const script = document.createElement('script');
+    const script = this.document.createElement('script');
     script.setAttribute('type', 'application/ld+json');
     script.setAttribute('data-schema-type', schema['@type']);
     script.textContent = JSON.stringify(schema);
-    document.head.appendChild(script);
+    this.document.head.appendChild(script);
   }
 
   /**
    * Remove structured data by type
    */
   removeStructuredData(type: string): void {
-    const existingScript = document.querySelector(`script[data-schema-type="${type}"]`);
+    const existingScript = this.document.querySelector(`script[data-schema-type="${type}"]`);
     if (existingScript) {
       existingScript.remove();
     }
@@ -184,6 +189,7 @@ export class SeoService {
    */
   addProductSchema(product: {
     id: number;
+    slug: string;
     name: string;
     description: string;
     price: number;
@@ -204,7 +210,7 @@ export class SeoService {
       },
       offers: {
         '@type': 'Offer',
-        url: `https://lumina.cl/products/${product.id}`,
+        url: `https://lumina.cl/products/${product.slug}`,
         price: product.price.toString(),
         priceCurrency: 'CLP',
         priceValidUntil: new Date(Date.now() + 365 * 24 * 60 * 60 * 1000)
@@ -0,0 +1,37 @@
+import { TestBed } from '@angular/core/testing';
+import { PLATFORM_ID } from '@angular/core';
+import { ServiceWorkerService } from './service-worker.service';
+
+describe('ServiceWorkerService', () => {
+  let service: ServiceWorkerService;
+
+  beforeEach(() => {
+    TestBed.configureTestingModule({
+      providers: [ServiceWorkerService],
+    });
+    service = TestBed.inject(ServiceWorkerService);
+  });
+
+  it('should not register in dev mode', () => {
+    const register = spyOn(navigator.serviceWorker, 'register');
+
+    service.register();
+
+    expect(register).not.toHaveBeenCalled();
+  });
+
+  it('should report no metrics without a controlling worker', async () => {
+    expect(await service.refreshMetrics()).toBeNull();
+    expect(service.cacheMetrics()).toBeNull();
+  });
+});
+
+describe('ServiceWorkerService during server rendering', () => {
+  it('should report no metrics', async () => {
+    TestBed.configureTestingModule({
+      providers: [ServiceWorkerService, { provide: PLATFORM_ID, useValue: 'server' }],
+    });
+
+    expect(await TestBed.inject(ServiceWorkerService).refreshMetrics()).toBeNull();
+  });
+});
@@ -0,0 +1,94 @@
+import { Injectable, PLATFORM_ID, inject, isDevMode, signal } from '@angular/core';
+import { isPlatformBrowser } from '@angular/common';
+
+/**
+ * Counters of one service worker cache tier (public/sw.js)
+ */
+export interface CacheTierMetrics {
+  hits: number;
+  misses: number;
+  entries: number;
+  /** Only the LRU tiers (pages, data, images) track these */
+  revalidations?: number;
+  evictions?: number;
+  bytes?: number;
+  maxBytes?: number;
+}
+
+/**
+ * Cache metrics reported by the service worker since it last started
+ */
+export interface ServiceWorkerCacheMetrics {
+  /** Build hash of the precached shell */
+  version: string;
+  tiers: {
+    shell: CacheTierMetrics;
+    /** Prerendered catalog pages; hits are offline fallbacks, misses network responses */
+    pages: CacheTierMetrics;
+    data: CacheTierMetrics;
+    images: CacheTierMetrics;
+  };
+  /** Requests left to the network (cart, orders, payments, auth) */
+  networkOnly: number;
+}
+
+// The worker may be busy or restarting; don't wait longer than this
+const METRICS_TIMEOUT_MS = 2000;
+
+/**
+ * Registers the storefront service worker (public/sw.js) and reads its
+ * cache metrics
+ * Production browser builds only: dev builds serve sw.js without a manifest
+ */
+@Injectable({
+  providedIn: 'root',
+})
+export class ServiceWorkerService {
+  private isBrowser = isPlatformBrowser(inject(PLATFORM_ID));
+  private _cacheMetrics = signal<ServiceWorkerCacheMetrics | null>(null);
+
+  readonly cacheMetrics = this._cacheMetrics.asReadonly();
+
+  /**
+   * Register the worker once the page has loaded, so installing it (and
+   * precaching the shell) doesn't compete with the first render
+   */
+  register(): void {
+    if (!this.isBrowser || isDevMode() || !('serviceWorker' in navigator)) return;
+
+    const register = () =>
+      navigator.serviceWorker.register('/sw.js').catch((error) => {
+        console.warn('Service worker registration failed:', error);
+      });
+    if (document.readyState === 'complete') {
+      void register();
+    } else {
+      window.addEventListener('load', () => void register(), { once: true });
+    }
+  }
+
+  /**
+   * Ask the active worker for its cache metrics
+   * @returns null when no worker controls the page or it didn't answer in time
+   */
+  async refreshMetrics(): Promise<ServiceWorkerCacheMetrics | null> {
+    const worker = this.isBrowser ? navigator.serviceWorker?.controller : null;
+    if (!worker) return null;
+
+    const channel = new MessageChannel();
+    const metrics = await new Promise<ServiceWorkerCacheMetrics | null>((resolve) => {
+      const timeout = setTimeout(() => resolve(null), METRICS_TIMEOUT_MS);
+      channel.port1.onmessage = (event) => {
+        clearTimeout(timeout);
+        resolve(event.data as ServiceWorkerCacheMetrics);
+      };
+      worker.postMessage({ type: 'CACHE_METRICS' }, [channel.port2]);
+    });
+    channel.port1.close();
+
+    if (metrics) {
+      this._cacheMetrics.set(metrics);
+    }
+    return metrics;
+  }
+}
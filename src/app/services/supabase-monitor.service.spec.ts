@@ -56,6 +56,31 @@ describe('SupabaseMonitorService', () => {
     expect(stats.fastestQuery?.duration).toBe(50);
   });
 
+  it('should record the JSON size of the payload', () => {
+    service.enable();
+    service.recordQuery('products_list', 'Query 1', 100, true, 1, undefined, [{ name: 'Luña' }]);
+    service.recordQuery('products_list', 'Query 2', 100, true, 0);
+
+    // [{"name":"Luña"}] is 17 characters, ñ takes 2 bytes in UTF-8
+    expect(service.metrics()[0].payloadBytes).toBe(18);
+    expect(service.metrics()[1].payloadBytes).toBeUndefined();
+    expect(service.getStats().totalPayloadBytes).toBe(18);
+  });
+
+  it('should compute the prefetch hit rate per kind', () => {
+    service.enable();
+    service.recordPrefetch('detail', 2048);
+    service.recordPrefetch('detail', 1024);
+    service.recordPrefetchLookup('detail', true);
+    service.recordPrefetchLookup('detail', true);
+    service.recordPrefetchLookup('detail', true);
+    service.recordPrefetchLookup('detail', false);
+
+    expect(service.getPrefetchStats()).toEqual([
+      { kind: 'detail', prefetched: 2, prefetchedBytes: 3072, hits: 3, misses: 1, hitRate: 0.75 },
+    ]);
+  });
+
   it('should filter metrics by table', () => {
     service.enable();
     service.recordQuery('products', 'Query 1', 100, true);
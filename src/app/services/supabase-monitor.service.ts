@@ -11,6 +11,7 @@ export interface QueryMetrics {
   success: boolean;
   errorMessage?: string;
   resultCount?: number;
+  payloadBytes?: number; // size of the response rows serialized as JSON
 }
 
 /**
@@ -23,6 +24,30 @@ export interface PerformanceStats {
   averageDuration: number;
   slowestQuery: QueryMetrics | null;
   fastestQuery: QueryMetrics | null;
+  totalPayloadBytes: number;
+}
+
+/**
+ * Prefetch effectiveness for one kind of data (e.g. product detail, next page)
+ */
+export interface PrefetchStats {
+  kind: string;
+  /** Prefetches completed, and the bytes they downloaded */
+  prefetched: number;
+  prefetchedBytes: number;
+  /** Loads the user asked for, served from a prefetch (hits) or the network (misses) */
+  hits: number;
+  misses: number;
+  hitRate: number;
+}
+
+const textEncoder = new TextEncoder();
+
+/**
+ * Size of a response serialized as JSON, in bytes
+ */
+export function payloadBytes(payload: unknown): number {
+  return textEncoder.encode(JSON.stringify(payload) ?? '').length;
 }
 
 /**
@@ -37,6 +62,10 @@ export class SupabaseMonitorService {
   private _metrics = signal<QueryMetrics[]>([]);
   private _enabled = signal(false);
   private maxMetricsCount = 100; // Keep last 100 queries
+  private prefetchCounters = new Map<
+    string,
+    { prefetched: number; prefetchedBytes: number; hits: number; misses: number }
+  >();
 
   // Public readonly signals
   readonly metrics = this._metrics.asReadonly();
@@ -60,6 +89,8 @@ export class SupabaseMonitorService {
 
   /**
    * Record a query execution
+   * @param payload - Rows returned; their JSON size is recorded as payloadBytes
+   * (only measured while monitoring is enabled)
    */
   recordQuery(
     table: string,
@@ -68,6 +99,7 @@ export class SupabaseMonitorService {
     success: boolean,
     resultCount?: number,
     errorMessage?: string,
+    payload?: unknown,
   ): void {
     if (!this._enabled()) return;
 
@@ -79,6 +111,7 @@ export class SupabaseMonitorService {
       success,
       resultCount,
       errorMessage,
+      payloadBytes: payload === undefined ? undefined : payloadBytes(payload),
     };
 
     // Add to metrics array
@@ -113,6 +146,7 @@ export class SupabaseMonitorService {
         averageDuration: 0,
         slowestQuery: null,
         fastestQuery: null,
+        totalPayloadBytes: 0,
       };
     }
 
@@ -124,6 +158,8 @@ export class SupabaseMonitorService {
     const fastestQuery = sortedByDuration[0];
     const slowestQuery = sortedByDuration[sortedByDuration.length - 1];
 
+    const totalPayloadBytes = metrics.reduce((sum, m) => sum + (m.payloadBytes ?? 0), 0);
+
     return {
       totalQueries,
       successfulQueries,
@@ -131,14 +167,60 @@ export class SupabaseMonitorService {
       averageDuration,
       slowestQuery,
       fastestQuery,
+      totalPayloadBytes,
     };
   }
 
+  /**
+   * Record a completed prefetch
+   */
+  recordPrefetch(kind: string, bytes: number): void {
+    if (!this._enabled()) return;
+
+    const counters = this.prefetchCountersFor(kind);
+    counters.prefetched++;
+    counters.prefetchedBytes += bytes;
+  }
+
+  /**
+   * Record a load the user asked for: hit if a prefetch had already fetched it
+   */
+  recordPrefetchLookup(kind: string, hit: boolean): void {
+    if (!this._enabled()) return;
+
+    const counters = this.prefetchCountersFor(kind);
+    if (hit) {
+      counters.hits++;
+    } else {
+      counters.misses++;
+    }
+  }
+
+  /**
+   * Prefetch hit rate per kind of data
+   */
+  getPrefetchStats(): PrefetchStats[] {
+    return [...this.prefetchCounters].map(([kind, counters]) => {
+      const lookups = counters.hits + counters.misses;
+      return { kind, ...counters, hitRate: lookups > 0 ? counters.hits / lookups : 0 };
+    });
+  }
+
+  private prefetchCountersFor(kind: string) {
+    let counters = this.prefetchCounters.get(kind);
+    if (!counters) {
+      counters = { prefetched: 0, prefetchedBytes: 0, hits: 0, misses: 0 };
+      this.prefetchCounters.set(kind, counters);
+    }
+    return counters;
+  }
+
   /**
    * Clear all recorded metrics
    */
   clear(): void {
     this._metrics.set([]);
+    this.prefetchCounters.clear();
     console.log('📊 Performance metrics cleared');
   }
 
@@ -161,6 +243,7 @@ export class SupabaseMonitorService {
     console.log(`Successful: ${stats.successfulQueries}`);
     console.log(`Failed: ${stats.failedQueries}`);
     console.log(`Average Duration: ${stats.averageDuration.toFixed(2)}ms`);
+    console.log(`Payload: ${(stats.totalPayloadBytes / 1024).toFixed(1)} KB`);
 
     if (stats.slowestQuery) {
       console.log(`\n🐌 Slowest Query (${stats.slowestQuery.duration}ms):`);
@@ -182,7 +265,26 @@ export class SupabaseMonitorService {
         const tableMetrics = this.getMetricsByTable(table);
         const avgDuration =
           tableMetrics.reduce((sum, m) => sum + m.duration, 0) / tableMetrics.length;
-        console.log(`   ${table}: ${tableMetrics.length} queries, avg ${avgDuration.toFixed(2)}ms`);
+        const measured = tableMetrics.filter((m) => m.payloadBytes !== undefined);
+        const avgPayload = measured.length
+          ? measured.reduce((sum, m) => sum + m.payloadBytes!, 0) / measured.length
+          : null;
+        console.log(
+          `   ${table}: ${tableMetrics.length} queries, avg ${avgDuration.toFixed(2)}ms` +
+            (avgPayload !== null ? `, avg ${(avgPayload / 1024).toFixed(1)} KB` : ''),
+        );
+      });
+    }
+
+    const prefetchStats = this.getPrefetchStats();
+    if (prefetchStats.length > 0) {
+      console.log('\n🔮 Prefetch:');
+      prefetchStats.forEach((p) => {
+        const kb = (p.prefetchedBytes / 1024).toFixed(1);
+        console.log(
+          `   ${p.kind}: ${p.prefetched} prefetched (${kb} KB), ` +
+            `${p.hits} hits / ${p.misses} misses (${(p.hitRate * 100).toFixed(0)}% hit rate)`,
+        );
       });
     }
   }
@@ -58,4 +58,43 @@ describe('SupabaseService', () => {
       expect(service.getCurrentUser()).toBeNull();
     });
   });
+
+  describe('Session restore', () => {
+    // Default supabase-js storage key for https://test.supabase.co (MockConfigService)
+    const storageKey = 'sb-test-auth-token';
+
+    afterEach(() => localStorage.removeItem(storageKey));
+
+    it('should set the persisted user synchronously on creation', () => {
+      localStorage.setItem(
+        storageKey,
+        JSON.stringify({
+          access_token: 'token',
+          refresh_token: 'refresh',
+          expires_at: Math.floor(Date.now() / 1000) + 3600,
+          user: { id: 'user-123', email: 'ana@example.com' },
+        }),
+      );
+
+      const restored = TestBed.runInInjectionContext(() => new SupabaseService());
+
+      expect(restored.currentUser()).toEqual({ id: 'user-123', email: 'ana@example.com' });
+      expect(restored.isAuthenticated()).toBe(true);
+    });
+
+    it('should ignore an expired session without refresh token', () => {
+      localStorage.setItem(
+        storageKey,
+        JSON.stringify({
+          access_token: 'token',
+          expires_at: Math.floor(Date.now() / 1000) - 60,
+          user: { id: 'user-123', email: 'ana@example.com' },
+        }),
+      );
+
+      const restored = TestBed.runInInjectionContext(() => new SupabaseService());
+
+      expect(restored.currentUser()).toBeNull();
+    });
+  });
 });
@@ -1,5 +1,6 @@
-import { Injectable, signal, computed, inject } from '@angular/core';
-import { createClient, SupabaseClient, User } from '@supabase/supabase-js';
+import { Injectable, signal, computed, inject, PLATFORM_ID } from '@angular/core';
+import { isPlatformServer } from '@angular/common';
+import { createClient, Session, SupabaseClient, User } from '@supabase/supabase-js';
 import { toObservable } from '@angular/core/rxjs-interop';
 import { Observable } from 'rxjs';
 import { ConfigService } from '../core/config.service';
@@ -32,25 +33,88 @@ export class SupabaseService {
     // Use runtime configuration from ConfigService
     const config = this.configService.getConfig();
 
-    this.supabase = createClient(config.supabase.url, config.supabase.anonKey);
+    // On the server there's no session to restore, and the token refresh timer
+    // would keep the render from ever becoming stable
+    const onServer = isPlatformServer(inject(PLATFORM_ID));
+    this.supabase = createClient(
+      config.supabase.url,
+      config.supabase.anonKey,
+      onServer
+        ? { auth: { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false } }
+        : undefined,
+    );
 
-    // Check for existing session
-    this.supabase.auth.getSession().then(({ data }) => {
-      if (data.session?.user) {
-        this._currentUser.set(this.mapUser(data.session.user));
-      }
-    });
+    if (onServer) return;
+
+    // Fast path: user known before the first render (cart badge, auth guard),
+    // confirmed against Supabase in the background
+    this._currentUser.set(this.readPersistedUser(config.supabase.url));
+    void this.revalidateSession();
 
     // Listen for auth changes
     this.supabase.auth.onAuthStateChange((event, session) => {
-      if (session?.user) {
-        this._currentUser.set(this.mapUser(session.user));
-      } else {
-        this._currentUser.set(null);
-      }
+      this.setUser(session?.user ? this.mapUser(session.user) : null);
     });
   }
 
+  /**
+   * Read the session supabase-js persisted in localStorage (same default storage key)
+   * without waiting for auth.getSession()
+   */
+  private readPersistedUser(url: string): AuthUser | null {
+    try {
+      const storageKey = `sb-${new URL(url).hostname.split('.')[0]}-auth-token`;
+      const raw = localStorage.getItem(storageKey);
+      if (!raw) return null;
+
+      const session = JSON.parse(raw) as Partial<Session>;
+      const expired = (session.expires_at ?? 0) * 1000 <= Date.now();
+
+      // An expired access token is fine while there's a refresh token to renew it
+      if (!session.user || (expired && !session.refresh_token)) return null;
+
+      return this.mapUser(session.user);
+    } catch {
+      return null;
+    }
+  }
+
+  /**
+   * Confirm the restored session: getSession() renews an expired token and
+   * getUser() asks the server, which catches sessions revoked elsewhere
+   */
+  private async revalidateSession(): Promise<void> {
+    try {
+      const { data } = await this.supabase.auth.getSession();
+      if (!data.session) {
+        this.setUser(null);
+        return;
+      }
+
+      this.setUser(this.mapUser(data.session.user));
+
+      const { error } = await this.supabase.auth.getUser();
+      if (error?.status === 401 || error?.status === 403) {
+        // Signs out locally; onAuthStateChange clears the user
+        await this.supabase.auth.signOut({ scope: 'local' });
+      }
+    } catch (error) {
+      // Offline: keep the restored user, supabase-js retries the refresh later
+      console.warn('⚠️ Could not revalidate session:', error);
+    }
+  }
+
+  /**
+   * Only emit when the user actually changes: every auth event carries a new
+   * user object, which would reload the cart for the same user
+   */
+  private setUser(user: AuthUser | null): void {
+    const current = this._currentUser();
+    if (current?.id !== user?.id || current?.email !== user?.email) {
+      this._currentUser.set(user);
+    }
+  }
+
   private mapUser(user: User): AuthUser {
     return {
       id: user.id,
@@ -0,0 +1,178 @@
+import {
+  AngularNodeAppEngine,
+  createNodeRequestHandler,
+  isMainModule,
+  writeResponseToNodeResponse,
+} from '@angular/ssr/node';
+import { createClient } from '@supabase/supabase-js';
+import express from 'express';
+import { join } from 'node:path';
+import { SsrHtmlCache } from './ssr-html-cache';
+
+/**
+ * SSR server for the storefront (npm run build:ssr && npm run serve:ssr)
+ *
+ * - Static assets from the browser build
+ * - Catalog routes (/products, /products/category/:category, /products/:slug)
+ *   rendered by Angular with products in transfer state, cached per URL
+ * - Cache entries dropped on product/category changes (Supabase realtime)
+ *
+ * Environment:
+ *   SUPABASE_URL, SUPABASE_KEY            Supabase project (anon key for rendering)
+ *   SUPABASE_SERVICE_ROLE_KEY             Optional, to also hear about hidden products
+ *   SSR_CACHE_MAX_ENTRIES (500), SSR_CACHE_TTL_MS (300000)
+ *   SSR_CACHE_PURGE_TOKEN                 Enables POST /__ssr-cache/purge
+ *   PORT (4000)
+ */
+
+const browserDistFolder = join(import.meta.dirname, '../browser');
+
+const app = express();
+const angularApp = new AngularNodeAppEngine();
+
+const htmlCache = new SsrHtmlCache(
+  parseInt(process.env['SSR_CACHE_MAX_ENTRIES'] || '500'),
+  parseInt(process.env['SSR_CACHE_TTL_MS'] || '300000'),
+);
+
+const CATALOG_PATH = /^\/products(\/|$)/;
+
+// Headers recomputed by express when sending the cached body
+const SKIPPED_HEADERS = new Set(['content-length', 'transfer-encoding']);
+
+/**
+ * Drop cached pages when the catalog changes
+ * products keeps REPLICA IDENTITY FULL (script 22) so renames also drop the old slug
+ */
+function watchCatalogChanges(): void {
+  const url = process.env['SUPABASE_URL'];
+  const key = process.env['SUPABASE_SERVICE_ROLE_KEY'] || process.env['SUPABASE_KEY'];
+
+  if (!url || !key) {
+    console.warn('⚠️ SSR cache: missing Supabase credentials, entries expire by TTL only');
+    return;
+  }
+
+  const supabase = createClient(url, key, {
+    auth: { persistSession: false, autoRefreshToken: false },
+  });
+
+  const clearAll = (table: string) => {
+    const removed = htmlCache.clear();
+    console.log(`🧹 SSR cache: ${table} changed, ${removed} pages dropped`);
+  };
+
+  supabase
+    .channel('ssr-cache-invalidation')
+    .on('postgres_changes', { event: '*', schema: 'public', table: 'products' }, (payload) => {
+      const slugs = [payload.new, payload.old]
+        .map((row) => (row as { slug?: string } | null)?.slug)
+        .filter((slug): slug is string => !!slug);
+      const removed = htmlCache.invalidateProducts(slugs);
+      console.log(`🧹 SSR cache: product ${slugs.join(', ')} changed, ${removed} pages dropped`);
+    })
+    // Relation changes don't carry the product slug: drop everything
+    .on('postgres_changes', { event: '*', schema: 'public', table: 'categories' }, () =>
+      clearAll('categories'),
+    )
+    .on('postgres_changes', { event: '*', schema: 'public', table: 'product_images' }, () =>
+      clearAll('product_images'),
+    )
+    .on('postgres_changes', { event: '*', schema: 'public', table: 'product_categories' }, () =>
+      clearAll('product_categories'),
+    )
+    .subscribe();
+}
+
+app.post('/__ssr-cache/purge', (req, res) => {
+  const token = process.env['SSR_CACHE_PURGE_TOKEN'];
+  if (!token || req.get('x-purge-token') !== token) {
+    res.status(404).end();
+    return;
+  }
+
+  const removed = htmlCache.clear();
+  res.json({ removed, ...htmlCache.stats() });
+});
+
+/**
+ * Serve static files from /browser
+ */
+app.use(
+  express.static(browserDistFolder, {
+    maxAge: '1y',
+    index: false,
+    redirect: false,
+  }),
+);
+
+/**
+ * Render with Angular; catalog pages go through the per-URL cache
+ */
+app.use(async (req, res, next) => {
+  const cacheable = req.method === 'GET' && CATALOG_PATH.test(req.path);
+
+  try {
+    if (cacheable) {
+      const cached = htmlCache.get(req.originalUrl);
+      if (cached) {
+        res.status(cached.status);
+        cached.headers.forEach(([name, value]) => res.setHeader(name, value));
+        res.setHeader('X-SSR-Cache', 'HIT');
+        res.send(cached.html);
+        return;
+      }
+    }
+
+    const response = await angularApp.handle(req);
+    if (!response) {
+      next();
+      return;
+    }
+
+    if (cacheable && response.ok && response.headers.get('content-type')?.includes('text/html')) {
+      const html = await response.text();
+      const headers: [string, string][] = [];
+      response.headers.forEach((value, name) => {
+        if (!SKIPPED_HEADERS.has(name)) headers.push([name, value]);
+      });
+
+      htmlCache.set(req.originalUrl, {
+        html,
+        status: response.status,
+        headers,
+        storedAt: Date.now(),
+      });
+
+      res.status(response.status);
+      headers.forEach(([name, value]) => res.setHeader(name, value));
+      res.setHeader('X-SSR-Cache', 'MISS');
+      res.send(html);
+      return;
+    }
+
+    await writeResponseToNodeResponse(response, res);
+  } catch (error) {
+    next(error);
+  }
+});
+
+/**
+ * Start the server if this module is the main entry point
+ */
+if (isMainModule(import.meta.url)) {
+  const port = process.env['PORT'] || 4000;
+  watchCatalogChanges();
+  app.listen(port, (error) => {
+    if (error) {
+      throw error;
+    }
+
+    console.log(`🚀 SSR server listening on http://localhost:${port}`);
+  });
+}
+
+/**
+ * Request handler used by the Angular CLI (dev-server and during build)
+ */
+export const reqHandler = createNodeRequestHandler(app);
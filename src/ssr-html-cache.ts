@@ -0,0 +1,90 @@
+/**
+ * Per-URL cache of server-rendered catalog HTML
+ *
+ * Bounded by entry count (least recently used goes first) and by age.
+ * server.ts drops entries when products or categories change, so the TTL
+ * only covers changes it is not notified about.
+ */
+export interface CachedPage {
+  html: string;
+  status: number;
+  headers: [string, string][];
+  storedAt: number;
+}
+
+export class SsrHtmlCache {
+  // Map keeps insertion order: re-inserting on read makes the first key the LRU one
+  private pages = new Map<string, CachedPage>();
+  private hits = 0;
+  private misses = 0;
+
+  constructor(
+    private readonly maxEntries: number,
+    private readonly ttlMs: number,
+  ) {}
+
+  get(url: string): CachedPage | null {
+    const page = this.pages.get(url);
+
+    if (!page || Date.now() - page.storedAt > this.ttlMs) {
+      this.pages.delete(url);
+      this.misses++;
+      return null;
+    }
+
+    this.pages.delete(url);
+    this.pages.set(url, page);
+    this.hits++;
+    return page;
+  }
+
+  set(url: string, page: CachedPage): void {
+    this.pages.delete(url);
+    this.pages.set(url, page);
+
+    while (this.pages.size > this.maxEntries) {
+      this.pages.delete(this.pages.keys().next().value!);
+    }
+  }
+
+  /**
+   * Drop every listing page (/products, categories, filtered views) and the
+   * detail pages of the given product slugs
+   * @returns Number of entries removed
+   */
+  invalidateProducts(slugs: string[]): number {
+    const productPaths = new Set(slugs.map((slug) => `/products/${slug}`));
+    let removed = 0;
+
+    for (const url of [...this.pages.keys()]) {
+      const path = url.split('?')[0];
+      const isListing = path === '/products' || path.startsWith('/products/category/');
+      if (isListing || productPaths.has(path)) {
+        this.pages.delete(url);
+        removed++;
+      }
+    }
+
+    return removed;
+  }
+
+  /**
+   * Drop everything
+   * @returns Number of entries removed
+   */
+  clear(): number {
+    const removed = this.pages.size;
+    this.pages.clear();
+    return removed;
+  }
+
+  stats(): { entries: number; hits: number; misses: number; hitRate: number } {
+    const lookups = this.hits + this.misses;
+    return {
+      entries: this.pages.size,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups > 0 ? this.hits / lookups : 0,
+    };
+  }
+}